@@ -0,0 +1,35 @@
+"""
+基准脚本共用的事件生成工具。
+
+以 `SimulatedDaqSystem`（非实时模式、固定随机种子）采集指定数量的事件，
+供各基准在计时前预先生成输入。
+"""
+
+from typing import Any, Callable, Optional
+import threading
+
+from pyemg_cometa.simulated import SimulatedDaqSystem
+
+
+def generate_args(num_sensors: int, num_events: int, period: Any,
+                  convert: Optional[Callable[[Any], Any]] = None, **options: Any) -> list:
+  """采集前 `num_events` 个事件的参数（给定 `convert` 时保存其转换结果）。
+
+  `options` 原样传给 `SimulatedDaqSystem`；给出 `num_fsw_sensors` 时同时启用 FSW 传感器。
+  """
+  daq = SimulatedDaqSystem(num_sensors=num_sensors, realtime=False, seed=0, **options)
+  if options.get('num_fsw_sensors'):
+    daq.enable_fsw_sensors()
+  events = []
+  done = threading.Event()
+
+  def on_data_available(sender, args):
+    if len(events) < num_events:
+      events.append(args if convert is None else convert(args))
+    else:
+      done.set()
+  daq.add_on_data_available_handler(on_data_available)
+  daq.start_capturing(period)
+  done.wait()
+  daq.stop_capturing()
+  return events
@@ -0,0 +1,67 @@
+"""
+自适应事件周期控制器演示与基准。
+
+以实时模式的 `SimulatedDaqSystem` 为数据源，处理回调的耗时可调：每事件固定开销
+（毫秒）+ 每 EMG 样本开销（微秒），以忙等待模拟 CPU 负载。按阶段依次改变负载，
+`EventPeriodController`（AUTO 模式）应在轻负载时缩短到最短周期、重负载时延长周期，
+打印每次决策与各阶段结束时的周期与利用率。
+
+阶段格式为 `固定毫秒:每样本微秒:秒数`，例如默认的 `0.2:0:8 7:0:10 0.2:0:10`。
+
+用法：`python benchmarks/bench_adaptive_period.py [--sensors 8] [--phases 0.2:0:8 7:0:10 0.2:0:10] [--start MS_100]`
+"""
+
+import argparse
+import time
+
+from pyemg_cometa.adaptive import EventPeriodController, PeriodModeEnum
+from pyemg_cometa.constants import DataAvailableEventPeriodEnum
+from pyemg_cometa.simulated import SimulatedDaqSystem
+
+
+class LoadedHandler:
+  """耗时可调的处理回调。"""
+  def __init__(self) -> None:
+    self.fixed_s = 0.0
+    self.per_sample_s = 0.0
+
+  def __call__(self, sender, args) -> None:
+    n = args.get_emg_samples_as_numpy().shape[1]
+    deadline = time.perf_counter() + self.fixed_s + self.per_sample_s * n
+    while time.perf_counter() < deadline:
+      pass
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--sensors', type=int, default=8)
+  parser.add_argument('--phases', nargs='+', default=['0.2:0:8', '7:0:10', '0.2:0:10'])
+  parser.add_argument('--start', default='MS_100', choices=[p.name for p in DataAvailableEventPeriodEnum])
+  parser.add_argument('--window', type=float, default=0.5)
+  parser.add_argument('--hold', type=float, default=1.5)
+  parser.add_argument('--cooldown', type=float, default=5.0)
+  args = parser.parse_args()
+
+  daq = SimulatedDaqSystem(num_sensors=args.sensors, seed=0)
+  controller = EventPeriodController(daq, mode=PeriodModeEnum.AUTO, window_s=args.window, hold_s=args.hold, cooldown_s=args.cooldown,
+                                     on_decision=lambda d: print("  %-7s -> %-7s  %s" % (d.old_period.name, d.new_period.name, d.reason)))
+  handler = LoadedHandler()
+  controller.add_handler(handler)
+  controller.start_capturing(DataAvailableEventPeriodEnum[args.start])
+  try:
+    for phase in args.phases:
+      fixed_ms, per_sample_us, seconds = (float(x) for x in phase.split(':'))
+      handler.fixed_s, handler.per_sample_s = fixed_ms / 1e3, per_sample_us / 1e6
+      print("phase: %.2f ms + %.2f us/sample for %.0f s" % (fixed_ms, per_sample_us, seconds))
+      time.sleep(seconds)
+      metrics = controller.get_metrics()
+      print("  end of phase: period %s ms, utilization %.2f (peak %.2f)"
+            % (metrics['period_ms'], metrics['utilization'], metrics['peak_utilization']))
+  finally:
+    controller.stop_capturing()
+    controller.close()
+  print("%d decisions, %d restarts" % (len(controller.get_decisions()), controller.get_metrics()['restarts']))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,214 @@
+"""
+数据路径基准矩阵（传感器数 × IMU 模式 × 事件周期）。
+
+事件源为 `SimulatedDaqSystem`（非实时模式）生成的事件参数，另以 `NestedEventArgs`
+将同一数据包装为嵌套 Python 序列，模拟 .NET 交错数组走 `arrays.to_numpy_*` 逐行
+转换的路径。对每个组合测量：
+- 逐个 getter 的原始调用与 `*_as_numpy()` 转换耗时；
+- `recorder.extract_streams()` 的整体提取耗时与每事件分配的峰值内存（tracemalloc）；
+- `frame.FrameBuilder`（按 IMU 模式跳过不存在的模态、复用缓冲区）生成列式帧的耗时；
+- 回调分发开销（空回调经处理函数列表分发的每事件耗时）；
+- 可持续吞吐：单线程下提取速度相对所需事件率的余量。
+
+结果写为 JSON（`--output`），可用 `--compare` 与另一次运行对比，超过阈值的变慢项
+以非零退出码报告，便于在提交之间发现性能回退。
+
+用法：
+`python benchmarks/bench_data_path.py [--sensors 1 4 8 16] [--imu RAW_DATA MIXED_6DOF_142HZ]
+[--periods MS_100 MS_10] [--events 200] [--output results.json] [--compare baseline.json --threshold 0.2]`
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from pyemg_cometa.arrays import to_numpy_1d, to_numpy_2d, to_numpy_3d
+from pyemg_cometa.constants import EVENT_PERIODS_MS, DataAvailableEventPeriodEnum, ImuAcqTypeEnum
+from pyemg_cometa.frame import FrameBuilder
+from pyemg_cometa.recorder import STREAMS, extract_streams
+
+from _common import generate_args
+
+
+GETTERS = ('emg', 'orientation', 'accelerometer', 'gyroscope', 'magnetometer', 'fsw', 'sync')
+
+
+class NestedEventArgs:
+  """以嵌套列表/元组提供样本的事件参数，模拟 .NET 交错数组的逐元素访问路径。"""
+  def __init__(self, args) -> None:
+    self._args = args
+    self._scan_number = args.scan_number()
+    self._samples = {}
+    for name in GETTERS:
+      block = getattr(args, 'get_%s_samples_as_numpy' % name)()
+      self._samples[name] = [[tuple(s) for s in row] for row in block.tolist()] if block.ndim == 3 else block.tolist()
+    sensor_states = args.get_sensor_states()
+    self._sensor_states = sensor_states.tolist() if isinstance(sensor_states, np.ndarray) else sensor_states
+
+  def scan_number(self) -> int:
+    return self._scan_number
+
+  def get_sensor_states(self):
+    return self._sensor_states
+
+  def __getattr__(self, name: str):
+    for stream in GETTERS:
+      if name == 'get_%s_samples' % stream:
+        return lambda: self._samples[stream]
+      if name == 'get_%s_samples_as_numpy' % stream:
+        samples = self._samples[stream]
+        if stream in ('orientation', 'accelerometer', 'gyroscope', 'magnetometer'):
+          width = 4 if stream == 'orientation' else 3
+          return lambda dtype=np.float32, out=None: to_numpy_3d(samples, width, dtype, out)
+        if stream == 'sync':
+          return lambda dtype=np.float32, out=None: to_numpy_1d(samples, dtype, out)
+        return lambda dtype=(np.int32 if stream == 'fsw' else np.float32), out=None: to_numpy_2d(samples, dtype, out)
+    if name.startswith('_'):
+      raise AttributeError(name)
+    return getattr(self._args, name) # 触发、丢包等标量 getter
+
+
+def time_per_event(func, events: list, repeat: int) -> float:
+  """`repeat` 次遍历中最快一次的每事件耗时（秒）。"""
+  best = float('inf')
+  for _ in range(repeat):
+    t0 = time.perf_counter()
+    for args in events:
+      func(args)
+    best = min(best, (time.perf_counter() - t0) / len(events))
+  return best
+
+
+def measure_allocations(events: list) -> int:
+  """`extract_streams()` 每事件的峰值分配字节数（取中位数）。"""
+  peaks = []
+  for args in events[:min(len(events), 20)]:
+    tracemalloc.start()
+    try:
+      extract_streams(args)
+      peaks.append(tracemalloc.get_traced_memory()[1])
+    finally:
+      tracemalloc.stop()
+  return int(np.median(peaks))
+
+
+def measure_dispatch(events: list, num_handlers: int, repeat: int) -> float:
+  """经处理函数列表分发给 `num_handlers` 个空回调的每事件耗时（秒）。"""
+  handlers = [lambda sender, args: None for _ in range(num_handlers)]
+
+  def dispatch(args):
+    for callback in list(handlers):
+      callback(None, args)
+  return time_per_event(dispatch, events, repeat)
+
+
+def run_case(num_sensors: int, imu_acq_type: ImuAcqTypeEnum, period: DataAvailableEventPeriodEnum,
+             num_events: int, repeat: int, flavour: str) -> dict:
+  events = generate_args(num_sensors, num_events, period, imu_acq_type=imu_acq_type, num_fsw_sensors=1)
+  if flavour == 'nested':
+    events = [NestedEventArgs(args) for args in events]
+  result = {
+    'sensors': num_sensors,
+    'imu_acq_type': imu_acq_type.name,
+    'period': period.name,
+    'args': flavour,
+    'getters_us': {},
+    'as_numpy_us': {},
+  }
+  for name in GETTERS:
+    raw = getattr(events[0], 'get_%s_samples' % name)()
+    if raw is None or len(raw) == 0:
+      continue
+    result['getters_us'][name] = 1e6 * time_per_event(lambda args: getattr(args, 'get_%s_samples' % name)(), events, repeat)
+    result['as_numpy_us'][name] = 1e6 * time_per_event(lambda args: getattr(args, 'get_%s_samples_as_numpy' % name)(), events, repeat)
+  extract = time_per_event(extract_streams, events, repeat)
+  blocks = extract_streams(events[0])
+  event_bytes = sum(block.nbytes for block in blocks.values())
+  required_rate = 1000.0 / EVENT_PERIODS_MS[period]
+  result['extract_streams_us'] = 1e6 * extract
+  result['frame_build_us'] = 1e6 * time_per_event(FrameBuilder(imu_acq_type, reuse=True).build, events, repeat)
+  result['dispatch_4_handlers_us'] = 1e6 * measure_dispatch(events, 4, repeat)
+  result['alloc_peak_bytes'] = measure_allocations(events)
+  result['event_bytes'] = event_bytes
+  result['max_events_per_s'] = 1.0 / extract
+  result['throughput_mb_s'] = event_bytes / extract / 1e6
+  result['headroom'] = (1.0 / extract) / required_rate
+  return result
+
+
+def case_key(result: dict) -> str:
+  return '%s/%s/%s/%s' % (result['args'], result['sensors'], result['imu_acq_type'], result['period'])
+
+
+def get_metadata() -> dict:
+  try:
+    commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    commit = None
+  return {
+    'commit': commit,
+    'python': sys.version.split()[0],
+    'numpy': np.__version__,
+    'platform': platform.platform(),
+    'machine': platform.machine(),
+    'created': time.time(),
+  }
+
+
+def compare(results: list, baseline_path: str, threshold: float) -> int:
+  """与基线比较 `extract_streams_us`，返回变慢超过阈值的组合数。"""
+  with open(baseline_path) as f:
+    baseline = {case_key(r): r for r in json.load(f)['results']}
+  regressions = 0
+  print("\n%-48s %12s %12s %8s" % ('case', 'baseline us', 'current us', 'change'))
+  for result in results:
+    key = case_key(result)
+    if key not in baseline:
+      continue
+    before = baseline[key]['extract_streams_us']
+    after = result['extract_streams_us']
+    change = after / before - 1.0
+    flag = '  REGRESSION' if change > threshold else ''
+    regressions += change > threshold
+    print("%-48s %12.1f %12.1f %+7.1f%%%s" % (key, before, after, 100 * change, flag))
+  return regressions
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--sensors', type=int, nargs='+', default=[1, 4, 8, 16])
+  parser.add_argument('--imu', nargs='+', default=['RAW_DATA', 'FUSED_9DOF_142HZ', 'MIXED_6DOF_142HZ'])
+  parser.add_argument('--periods', nargs='+', default=[p.name for p in DataAvailableEventPeriodEnum])
+  parser.add_argument('--args', nargs='+', default=['ndarray', 'nested'], choices=['ndarray', 'nested'])
+  parser.add_argument('--events', type=int, default=200)
+  parser.add_argument('--repeat', type=int, default=3)
+  parser.add_argument('--output')
+  parser.add_argument('--compare')
+  parser.add_argument('--threshold', type=float, default=0.2)
+  args = parser.parse_args()
+
+  results = []
+  print("%-48s %10s %10s %10s %12s %10s %9s" % ('case', 'extract us', 'frame us', 'dispatch', 'alloc KiB', 'MB/s', 'headroom'))
+  for flavour in args.args:
+    for num_sensors in args.sensors:
+      for imu in args.imu:
+        for period in args.periods:
+          result = run_case(num_sensors, ImuAcqTypeEnum[imu], DataAvailableEventPeriodEnum[period], args.events, args.repeat, flavour)
+          results.append(result)
+          print("%-48s %10.1f %10.1f %10.2f %12.1f %10.1f %8.0fx" % (case_key(result), result['extract_streams_us'], result['frame_build_us'],
+                                                                     result['dispatch_4_handlers_us'], result['alloc_peak_bytes'] / 1024,
+                                                                     result['throughput_mb_s'], result['headroom']))
+  if args.output:
+    with open(args.output, 'w') as f:
+      json.dump({'metadata': get_metadata(), 'streams': list(STREAMS), 'results': results}, f, indent=2)
+  if args.compare:
+    sys.exit(1 if compare(results, args.compare, args.threshold) else 0)
+
+
+if __name__ == '__main__':
+  main()
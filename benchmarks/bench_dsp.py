@@ -0,0 +1,46 @@
+"""
+实时 EMG 处理流水线的单块耗时基准。
+
+对每种事件周期（块长 = 周期 × 2000 Hz），以 `SimulatedDaqSystem` 生成的 EMG
+块连续驱动默认流水线（带通 + 陷波 + 包络 + 滑动 RMS），报告单块处理耗时的
+中位数、p99 与最大值，并与事件周期比较。
+
+用法：`python benchmarks/bench_dsp.py [--sensors 16] [--seconds 30]`
+"""
+
+import argparse
+import time
+import numpy as np
+
+from pyemg_cometa.constants import EVENT_PERIODS_MS, DataAvailableEventPeriodEnum
+from pyemg_cometa.dsp import BandPassStage, DspPipeline, EnvelopeStage, MovingRmsStage, NotchStage
+
+from _common import generate_args
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--sensors', type=int, default=16)
+  parser.add_argument('--seconds', type=float, default=30.0)
+  args = parser.parse_args()
+
+  print("%-8s %8s %10s %10s %10s %8s" % ('period', 'samples', 'median ms', 'p99 ms', 'max ms', 'budget'))
+  for period in DataAvailableEventPeriodEnum:
+    num_events = int(args.seconds * 1000 / EVENT_PERIODS_MS[period])
+    blocks = generate_args(args.sensors, num_events, period, lambda a: a.get_emg_samples_as_numpy())
+    pipeline = DspPipeline([BandPassStage(), NotchStage(), EnvelopeStage(), MovingRmsStage(50)])
+    pipeline.process(blocks[0]) # 预热（系数设计、状态初始化）
+    timings = np.empty(len(blocks))
+    for i, block in enumerate(blocks):
+      t0 = time.perf_counter()
+      pipeline.process(block)
+      timings[i] = time.perf_counter() - t0
+    timings *= 1e3
+    period_ms = EVENT_PERIODS_MS[period]
+    print("%-8s %8d %10.3f %10.3f %10.3f %7.1f%%" % (period.name, blocks[0].shape[1], np.median(timings),
+                                                     np.percentile(timings, 99), timings.max(),
+                                                     100 * np.percentile(timings, 99) / period_ms))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,88 @@
+"""
+HDF5/Zarr 导出编解码器基准。
+
+使用 `SimulatedDaqSystem`（非实时模式）预先生成若干秒的事件，然后分别以
+不同后端与编解码器导出，比较写入吞吐（MB/s，按未压缩字节计）与文件大小。
+
+用法：`python benchmarks/bench_export_codecs.py [--seconds 60] [--sensors 16] [--imu RAW_DATA]`
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from pyemg_cometa.export import Hdf5Exporter, ZarrExporter
+from pyemg_cometa.recorder import extract_streams
+
+from _common import generate_args
+
+
+class _CaptureConfiguration:
+  """最小采集配置（仅供导出器推导采样率）。"""
+  def __init__(self, imu_acq_type: str) -> None:
+    self._imu_acq_type = imu_acq_type
+
+  def get_sampling_rate(self) -> str:
+    return 'HZ_2000'
+
+  def get_imq_acq_type(self) -> str:
+    return self._imu_acq_type
+
+  def get_external_trigger_status(self) -> bool:
+    return False
+
+  def get_trigger_level(self) -> int:
+    return 0
+
+
+def dir_size(path: str) -> int:
+  if os.path.isfile(path):
+    return os.path.getsize(path)
+  return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--seconds', type=float, default=60.0)
+  parser.add_argument('--sensors', type=int, default=16)
+  parser.add_argument('--imu', default='RAW_DATA')
+  parser.add_argument('--period', default='MS_10')
+  parser.add_argument('--events-per-chunk', type=int, default=100)
+  args = parser.parse_args()
+
+  num_events = int(args.seconds * 1000 / int(args.period.split('_')[1]))
+  events = generate_args(args.sensors, num_events, args.period, extract_streams, imu_acq_type=args.imu)
+  raw_bytes = sum(block.nbytes for blocks in events for block in blocks.values())
+  print("%d events, %.1f MB uncompressed" % (len(events), raw_bytes / 1e6))
+  print("%-6s %-8s %10s %10s %8s" % ('format', 'codec', 'MB/s', 'size MB', 'ratio'))
+
+  tmp = tempfile.mkdtemp()
+  try:
+    for backend, cls, codecs in (('hdf5', Hdf5Exporter, ('lz4', 'zstd', 'blosclz', 'gzip', 'lzf', None)),
+                                 ('zarr', ZarrExporter, ('lz4', 'zstd', 'blosclz', 'gzip', None))):
+      for codec in codecs:
+        path = os.path.join(tmp, '%s-%s' % (backend, codec))
+        try:
+          exporter = cls(path,
+                         capture_configuration=_CaptureConfiguration(args.imu),
+                         event_period=args.period,
+                         events_per_chunk=args.events_per_chunk,
+                         codec=codec)
+        except ImportError as e:
+          print("%-6s %-8s skipped: %s" % (backend, codec, e))
+          continue
+        t0 = time.perf_counter()
+        for blocks in events:
+          exporter.append(blocks)
+        exporter.close()
+        elapsed = time.perf_counter() - t0
+        size = dir_size(path)
+        print("%-6s %-8s %10.1f %10.2f %8.2f" % (backend, codec, raw_bytes / 1e6 / elapsed, size / 1e6, raw_bytes / size))
+  finally:
+    shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+  main()
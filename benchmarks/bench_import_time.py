@@ -0,0 +1,108 @@
+"""
+导入耗时基准。
+
+在全新子进程中分别测量：
+- lazy：仅导入 `pyemg_cometa.constants`（不应启动 CLR），以及导入后首次转换为
+  .NET 枚举值 / 加载程序集的代价；
+- eager（基线）：按原先的方式在导入时执行 `clr.AddReference` 并导入全部 SDK
+  命名空间，再导入 `constants`。
+
+两种模式都运行时，最后报告导入 `constants` 的耗时对比。
+
+用法：`python benchmarks/bench_import_time.py [--repeat N] [--mode lazy|eager|both]`
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# 原先每个包装模块导入时执行的操作：加载全部程序集并通配导入各 SDK 命名空间。
+EAGER_PRELUDE = ("import importlib, pyemg_cometa._dotnet as d; d.load_assemblies(); "
+                 "[importlib.import_module(n) for n in d.NAMESPACES]; ")
+
+# 用例名 -> (模式, 导入语句, 首次使用语句)
+CASES = {
+  'import constants': ('lazy',
+    "import pyemg_cometa.constants",
+    ""),
+  'import constants + first .NET conversion': ('lazy',
+    "import pyemg_cometa.constants as c",
+    "c.DeviceStateEnum.IDLE.to_net()"),
+  'load assemblies': ('lazy',
+    "import pyemg_cometa._dotnet as d",
+    "d.load_assemblies()"),
+  'eager import constants (baseline)': ('eager',
+    EAGER_PRELUDE + "import pyemg_cometa.constants",
+    ""),
+}
+
+SCRIPT = """
+import json, sys, time
+error = None
+t0 = time.perf_counter()
+try:
+  {import_stmt}
+except Exception as e:
+  error = repr(e)
+t1 = time.perf_counter()
+if error is None:
+  try:
+    {use_stmt}
+  except Exception as e:
+    error = repr(e)
+t2 = time.perf_counter()
+print(json.dumps({{'import_s': t1 - t0, 'use_s': t2 - t1, 'clr_loaded': 'clr' in sys.modules, 'error': error}}))
+"""
+
+
+def run_case(import_stmt: str, use_stmt: str) -> dict:
+  env = dict(os.environ, PYTHONPATH=os.path.abspath(SRC_DIR) + os.pathsep + os.environ.get('PYTHONPATH', ''))
+  code = SCRIPT.format(import_stmt=import_stmt, use_stmt=use_stmt or 'pass')
+  out = subprocess.run([sys.executable, '-c', code], env=env, check=True, capture_output=True, text=True).stdout
+  return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--repeat', type=int, default=10)
+  parser.add_argument('--mode', choices=['lazy', 'eager', 'both'], default='both')
+  parser.add_argument('--json', action='store_true', help="以 JSON 输出结果")
+  args = parser.parse_args()
+
+  results = {}
+  for name, (mode, import_stmt, use_stmt) in CASES.items():
+    if args.mode not in (mode, 'both'):
+      continue
+    runs = [run_case(import_stmt, use_stmt) for _ in range(args.repeat)]
+    results[name] = {
+      'import_ms_median': 1e3 * statistics.median(r['import_s'] for r in runs),
+      'use_ms_median': 1e3 * statistics.median(r['use_s'] for r in runs),
+      'clr_loaded': runs[-1]['clr_loaded'],
+      'error': runs[-1]['error'],
+    }
+
+  if args.json:
+    print(json.dumps(results, indent=2))
+    return
+  for name, r in results.items():
+    line = "%-40s import %8.2f ms   first use %8.2f ms   clr loaded: %s" % (name, r['import_ms_median'], r['use_ms_median'], r['clr_loaded'])
+    if r['error']:
+      line += "   (%s)" % r['error']
+    print(line)
+  lazy, eager = results.get('import constants'), results.get('eager import constants (baseline)')
+  if lazy is not None and eager is not None:
+    if eager['error']:
+      print("eager baseline unavailable: %s" % eager['error'])
+    else:
+      print("import constants: eager %.2f ms -> lazy %.2f ms (%.1fx faster)"
+            % (eager['import_ms_median'], lazy['import_ms_median'], eager['import_ms_median'] / lazy['import_ms_median']))
+
+
+if __name__ == '__main__':
+  main()
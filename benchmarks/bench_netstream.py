@@ -0,0 +1,116 @@
+"""
+网络数据流回环基准。
+
+预先用 `SimulatedDaqSystem`（非实时模式）生成事件参数，在本机启动 `StreamServer`
+（TCP/UDP/Unix 套接字），由 `StreamClient` 在另一线程接收。事件以指定事件周期定速
+（`--as-fast-as-possible` 时不限速）送入 `StreamServer.on_data_available`，报告：
+- 回调线程上的每事件发布耗时（提取 + 编码 + 入队），并与逐事件 JSON 编码对比；
+- 客户端收到的帧率与吞吐、缺失帧数；
+- 端到端延迟（帧头时间戳到客户端解码完成）的中位数、p99 与最大值。
+
+用法：`python benchmarks/bench_netstream.py [--sensors 16] [--events 3000] [--transports tcp udp unix] [--as-fast-as-possible]`
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+
+from pyemg_cometa.constants import EVENT_PERIODS_MS, DataAvailableEventPeriodEnum, ImuAcqTypeEnum
+from pyemg_cometa.netstream import StreamClient, StreamServer, TransportEnum
+from pyemg_cometa.recorder import extract_raw_streams
+
+from _common import generate_args
+
+
+def json_encode(args) -> bytes:
+  blocks = extract_raw_streams(args)
+  return json.dumps({'scan_number': args.scan_number(), 'streams': {name: block.tolist() for name, block in blocks.items()}}).encode()
+
+
+def run_transport(transport: str, events: list, period_s: float) -> dict:
+  if transport == TransportEnum.UNIX:
+    address = os.path.join(tempfile.mkdtemp(), 'stream.sock')
+  else:
+    address = ('127.0.0.1', 0)
+  server = StreamServer(address=address, transport=transport, queue_size=1024)
+  client = StreamClient(server.get_address(), transport)
+  while server.get_num_subscribers() == 0:
+    time.sleep(0.01)
+  latencies = []
+  received = [0, 0, 0.0] # [帧数, 字节数, 最后一帧的接收时刻]
+
+  def receive():
+    while True:
+      try:
+        frame = client.recv(timeout=1.0)
+      except (ConnectionError, OSError):
+        return
+      if frame is None:
+        return
+      latencies.append(time.time() - frame.timestamp)
+      received[0] += 1
+      received[1] += sum(block.nbytes for block in frame.streams.values())
+      received[2] = time.perf_counter()
+  thread = threading.Thread(target=receive)
+  thread.start()
+
+  publish = []
+  t_start = time.perf_counter()
+  next_t = t_start
+  for args in events:
+    if period_s:
+      next_t += period_s
+      while time.perf_counter() < next_t:
+        time.sleep(max(0.0, next_t - time.perf_counter() - 0.0005))
+    t0 = time.perf_counter()
+    server.on_data_available(server, args)
+    publish.append(time.perf_counter() - t0)
+  thread.join()
+  elapsed = received[2] - t_start
+  stats = server.get_stats()
+  server.close()
+  client.close()
+  latencies = np.asarray(latencies) * 1e3
+  return {
+    'publish_us': np.median(publish) * 1e6,
+    'frames_per_s': received[0] / elapsed,
+    'mb_per_s': received[1] / elapsed / 1e6,
+    'frame_bytes': stats['bytes'] / max(stats['frames'], 1),
+    'missed': len(events) - received[0],
+    'latency_ms': (np.median(latencies), np.percentile(latencies, 99), latencies.max()) if len(latencies) else (np.nan,) * 3,
+  }
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--sensors', type=int, default=16)
+  parser.add_argument('--events', type=int, default=3000)
+  parser.add_argument('--period', default='MS_10', choices=[p.name for p in DataAvailableEventPeriodEnum])
+  parser.add_argument('--transports', nargs='+', default=[TransportEnum.TCP, TransportEnum.UDP, TransportEnum.UNIX])
+  parser.add_argument('--as-fast-as-possible', action='store_true')
+  args = parser.parse_args()
+
+  period = DataAvailableEventPeriodEnum[args.period]
+  events = generate_args(args.sensors, args.events, period, imu_acq_type=ImuAcqTypeEnum.MIXED_6DOF_142HZ)
+  json_us = np.median([_timed(json_encode, a) for a in events[:200]]) * 1e6
+  print("JSON encoding (baseline): %8.1f us/event" % json_us)
+  period_s = 0.0 if args.as_fast_as_possible else EVENT_PERIODS_MS[period] / 1e3
+  print("%-6s %12s %10s %10s %10s %8s %22s" % ('', 'publish us', 'frames/s', 'MB/s', 'frame B', 'missed', 'latency ms p50/p99/max'))
+  for transport in args.transports:
+    result = run_transport(transport, events, period_s)
+    print("%-6s %12.1f %10.0f %10.1f %10.0f %8d %8.3f/%6.3f/%6.3f" % ((transport, result['publish_us'], result['frames_per_s'], result['mb_per_s'],
+                                                                     result['frame_bytes'], result['missed']) + tuple(result['latency_ms'])))
+
+
+def _timed(func, *args) -> float:
+  t0 = time.perf_counter()
+  func(*args)
+  return time.perf_counter() - t0
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,54 @@
+"""
+遥测开销基准。
+
+预先用 `SimulatedDaqSystem`（非实时模式）生成事件参数，然后分别以裸回调、
+以及 `Telemetry.attach()` + `Telemetry.wrap()` 包装后的回调重放，比较每事件耗时，
+并将新增开销换算为事件周期的百分比。
+
+用法：`python benchmarks/bench_telemetry.py [--sensors 16] [--events 5000] [--sample-every 1]`
+"""
+
+import argparse
+import time
+
+from pyemg_cometa.constants import EVENT_PERIODS_MS, DataAvailableEventPeriodEnum
+from pyemg_cometa.telemetry import Telemetry
+
+from _common import generate_args
+
+
+def handler(sender, args):
+  args.get_emg_samples_as_numpy()
+
+
+def replay(events: list, callbacks: list) -> float:
+  t0 = time.perf_counter()
+  for args in events:
+    for callback in callbacks:
+      callback(None, args)
+  return (time.perf_counter() - t0) / len(events)
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--sensors', type=int, default=16)
+  parser.add_argument('--events', type=int, default=5000)
+  parser.add_argument('--sample-every', type=int, default=1)
+  parser.add_argument('--repeat', type=int, default=5)
+  args = parser.parse_args()
+
+  period = DataAvailableEventPeriodEnum.MS_10
+  events = generate_args(args.sensors, args.events, period, packet_loss=0.01)
+  telemetry = Telemetry(period, sample_every=args.sample_every)
+  instrumented = [telemetry.on_data_available, telemetry.wrap(handler)]
+  bare = min(replay(events, [handler]) for _ in range(args.repeat))
+  with_telemetry = min(replay(events, instrumented) for _ in range(args.repeat))
+  overhead = with_telemetry - bare
+  print("bare handler:        %8.2f us/event" % (bare * 1e6))
+  print("with telemetry:      %8.2f us/event" % (with_telemetry * 1e6))
+  print("overhead:            %8.2f us/event (%.3f%% of the %d ms event period)"
+        % (overhead * 1e6, 100 * overhead / (EVENT_PERIODS_MS[period] / 1e3), EVENT_PERIODS_MS[period]))
+
+
+if __name__ == '__main__':
+  main()
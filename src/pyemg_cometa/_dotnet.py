@@ -0,0 +1,108 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+.NET 程序集的一次性延迟加载。
+
+所有模块通过 `get_net_type()` 获取 SDK 类型，而不是各自在导入时执行
+`clr.AddReference` 与通配符导入。CLR 仅在首次真正需要 .NET 类型时启动，
+且程序集只加载一次（线程安全）。
+"""
+
+from typing import Any, Dict, Optional, Tuple
+import importlib
+import os
+import threading
+
+
+LIB_DIR = os.path.join(os.path.dirname(__file__), 'lib')
+ASSEMBLIES = ('Waveplus.DaqSys', 'Waveplus.DaqSysInterface', 'CyUSB')
+
+# 类型查找顺序：与原先通配符导入的覆盖顺序一致（后导入者优先）。
+NAMESPACES = (
+  'CyUSB',
+  'Waveplus.DaqSys.Exceptions',
+  'Waveplus.DaqSys.Definitions',
+  'Waveplus.DaqSysInterface',
+  'Waveplus.DaqSys',
+)
+
+_lock = threading.Lock()
+_loaded = False
+_types = {} # type: Dict[Tuple[Optional[str], str], Any]
+_sdk_version = None # type: Optional[str]
+
+
+def is_loaded() -> bool:
+  """CLR 与 SDK 程序集是否已加载。"""
+  return _loaded
+
+
+def load_assemblies() -> None:
+  """启动 CLR 并加载随包分发的 SDK 程序集（仅执行一次）。"""
+  global _loaded
+  if _loaded:
+    return
+  with _lock:
+    if _loaded:
+      return
+    import clr
+    for name in ASSEMBLIES:
+      clr.AddReference(os.path.join(LIB_DIR, name)) # type: ignore
+    _loaded = True
+
+
+def get_net_type(name: str, namespace: Optional[str] = None) -> Any:
+  """按名称获取 SDK 中的 .NET 类型，结果缓存。
+
+  未指定 `namespace` 时按 `NAMESPACES` 顺序查找。
+  """
+  key = (namespace, name)
+  net_type = _types.get(key)
+  if net_type is not None:
+    return net_type
+  load_assemblies()
+  for candidate in ((namespace,) if namespace is not None else NAMESPACES):
+    module = importlib.import_module(candidate)
+    net_type = getattr(module, name, None)
+    if net_type is not None:
+      _types[key] = net_type
+      return net_type
+  raise ImportError("Cannot find .NET type %r in %s" % (name, namespace or ', '.join(NAMESPACES)))
+
+
+def get_sdk_version() -> str:
+  """随包分发的 SDK 主程序集（`Waveplus.DaqSys`）版本号；无法读取时返回 'unknown'。"""
+  global _sdk_version
+  if _sdk_version is None:
+    try:
+      load_assemblies()
+      from System.Reflection import AssemblyName # type: ignore
+      _sdk_version = str(AssemblyName.GetAssemblyName(os.path.join(LIB_DIR, ASSEMBLIES[0] + '.dll')).Version)
+    except Exception:
+      _sdk_version = 'unknown'
+  return _sdk_version
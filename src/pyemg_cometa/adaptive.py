@@ -0,0 +1,323 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+自适应事件周期与背压控制。
+
+`start_capturing()` 的事件周期（`MS_10`/`MS_25`/`MS_50`/`MS_100`）是延迟与每事件
+固定开销之间的静态取舍，CPU 负载变化时很难选对。`EventPeriodController` 观察：
+- 处理回调的执行时间（通过 `add_handler()` 注册的回调按事件累计）；
+- 队列深度（`add_queue_probe()` 注册的探针，如记录器或后台通道的积压）；
+- `get_transfer_rate()` 与 USB 丢包计数。
+
+每个观察窗口结束时评估一次，以“仍可持续的最短周期”为目标给出建议；
+`mode=PeriodModeEnum.AUTO` 时在独立线程上执行一次受控的停止/重新开始采集。
+决策保存在 `get_decisions()` 中（可选追加写入 JSON Lines 文件），指标可通过
+`get_metrics()` 或 `register_gauges(telemetry)` 导出。
+
+缩短周期时采用保守估计：假定每事件耗时全部为固定开销（不随周期缩短而减少），
+预测利用率按周期比例放大；某周期被判定不可持续后在 `cooldown_s` 内不再尝试，避免来回切换。
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import json
+import threading
+import time
+import numpy as np
+
+from .constants import EVENT_PERIODS_MS, DataAvailableEventPeriodEnum
+
+
+class PeriodModeEnum:
+  RECOMMEND = 'recommend' # 只记录建议
+  AUTO = 'auto'           # 自动停止并以新周期重新开始采集
+
+
+class PeriodDecision(NamedTuple):
+  """一次周期调整决策。"""
+  timestamp: float
+  old_period: DataAvailableEventPeriodEnum
+  new_period: DataAvailableEventPeriodEnum
+  reason: str
+  utilization: float
+  peak_utilization: float
+  queue_fill: float
+  applied: bool
+
+  def to_dict(self) -> Dict[str, Any]:
+    d = self._asdict()
+    d['old_period'] = self.old_period.name
+    d['new_period'] = self.new_period.name
+    return d
+
+
+class EventPeriodController:
+  """观察处理负载并选择事件周期的控制器。
+
+  参数：
+  - daq: `CometaDaqSystem` 或 `SimulatedDaqSystem`。
+  - mode: `PeriodModeEnum.RECOMMEND` 或 `PeriodModeEnum.AUTO`。
+  - high_water: 平均利用率（每事件处理耗时 / 周期）超过此值即延长周期。
+  - target: 缩短周期后预测利用率需低于此值。
+  - peak_percentile: 峰值利用率所用的百分位；峰值超过 1（事件处理跟不上）也会延长周期。
+  - queue_high / queue_low: 队列填充率的延长/允许缩短阈值。
+  - window_s: 评估窗口；hold_s: 缩短周期前条件需持续的时间；cooldown_s: 不可持续周期的屏蔽时间。
+  """
+  def __init__(self,
+               daq: Any,
+               mode: str = PeriodModeEnum.RECOMMEND,
+               high_water: float = 0.7,
+               target: float = 0.5,
+               peak_percentile: float = 95.0,
+               queue_high: float = 0.5,
+               queue_low: float = 0.1,
+               window_s: float = 2.0,
+               hold_s: float = 10.0,
+               cooldown_s: float = 60.0,
+               on_decision: Optional[Callable[[PeriodDecision], None]] = None,
+               log_path: Optional[str] = None) -> None:
+    if mode not in (PeriodModeEnum.RECOMMEND, PeriodModeEnum.AUTO):
+      raise ValueError("Unknown mode %r" % mode)
+    if target >= high_water:
+      raise ValueError("`target` must be below `high_water` to avoid oscillation")
+    self._daq = daq
+    self._mode = mode
+    self._high_water = high_water
+    self._target = target
+    self._peak_percentile = peak_percentile
+    self._queue_high = queue_high
+    self._queue_low = queue_low
+    self._window_s = window_s
+    self._hold_s = hold_s
+    self._cooldown_s = cooldown_s
+    self._on_decision = on_decision
+    self._log_path = log_path
+    # 周期从短到长排列。
+    self._periods = sorted(EVENT_PERIODS_MS, key=EVENT_PERIODS_MS.get)
+    self._period: Optional[DataAvailableEventPeriodEnum] = None
+    self._handlers: Dict[Callable, Callable] = {}
+    self._queue_probes: Dict[str, Any] = {}
+    self._blocked_until: Dict[DataAvailableEventPeriodEnum, float] = {}
+    self._decisions: List[PeriodDecision] = []
+    self._recommendation: Optional[DataAvailableEventPeriodEnum] = None
+    self._lock = threading.Lock()
+    self._restarting = False
+    self._num_restarts = 0
+    self._in_event = False
+    self._event_ns = 0
+    self._costs_ns: List[int] = []
+    self._window_start = 0.0
+    self._calm_since: Optional[float] = None
+    self._transfer_rate = 0
+    self._usb_lost: Optional[int] = None
+    self._usb_lost_in_window = 0
+    self._last = {'utilization': 0.0, 'peak_utilization': 0.0, 'queue_fill': 0.0}
+    daq.add_on_data_available_handler(self._on_event_start)
+
+  # 注册 -------------------------------------------------------------------
+
+  def add_handler(self, handler: Callable[[Any, Any], None]) -> None:
+    """在 `daq` 上注册处理回调，并将其执行时间计入负载。"""
+    def timed(sender: Any, args: Any) -> None:
+      t0 = time.perf_counter_ns()
+      try:
+        handler(sender, args)
+      finally:
+        self._event_ns += time.perf_counter_ns() - t0
+    self._handlers[handler] = timed
+    self._daq.add_on_data_available_handler(timed)
+
+  def remove_handler(self, handler: Callable[[Any, Any], None]) -> None:
+    """注销处理回调。"""
+    self._daq.remove_on_data_available_handler(self._handlers.pop(handler))
+
+  def add_queue_probe(self, name: str, depth: Callable[[], int], capacity: int) -> None:
+    """注册队列深度探针；填充率 = depth() / capacity。"""
+    self._queue_probes[name] = (depth, capacity)
+
+  def close(self) -> None:
+    """移除控制器注册的所有回调。"""
+    for handler in list(self._handlers):
+      self.remove_handler(handler)
+    self._daq.remove_on_data_available_handler(self._on_event_start)
+
+  # 采集 -------------------------------------------------------------------
+
+  def start_capturing(self, event_period: Any = None) -> None:
+    """以给定周期（默认为最长周期）开始采集并开始观察。"""
+    period = self._periods[-1] if event_period is None else DataAvailableEventPeriodEnum.coerce(event_period)
+    self._reset_window(period)
+    self._daq.start_capturing(period)
+
+  def stop_capturing(self) -> None:
+    """停止采集。"""
+    self._daq.stop_capturing()
+
+  def get_period(self) -> Optional[DataAvailableEventPeriodEnum]:
+    """当前事件周期。"""
+    return self._period
+
+  def get_recommendation(self) -> Optional[DataAvailableEventPeriodEnum]:
+    """最近一次建议的周期（尚无建议时为 None）。"""
+    return self._recommendation
+
+  def _reset_window(self, period: DataAvailableEventPeriodEnum) -> None:
+    self._period = period
+    self._in_event = False
+    self._event_ns = 0
+    self._costs_ns = []
+    self._window_start = time.perf_counter()
+    self._calm_since = None
+    self._usb_lost = None
+    self._usb_lost_in_window = 0
+
+  # 观察与决策 -------------------------------------------------------------
+
+  def _on_event_start(self, sender: Any, args: Any) -> None:
+    """每个事件最先执行：结算上一事件的处理耗时，并在窗口结束时评估。"""
+    if self._in_event:
+      self._costs_ns.append(self._event_ns)
+    self._in_event = True
+    self._event_ns = 0
+    self._transfer_rate = args.get_transfer_rate()
+    usb_lost = args.get_usb_lost_packets()
+    if self._usb_lost is not None and usb_lost > self._usb_lost:
+      self._usb_lost_in_window += usb_lost - self._usb_lost
+    self._usb_lost = usb_lost
+    now = time.perf_counter()
+    if now - self._window_start >= self._window_s and self._costs_ns and not self._restarting:
+      self._evaluate(now)
+
+  def get_queue_fill(self) -> float:
+    """各队列填充率的最大值。"""
+    fill = 0.0
+    for depth, capacity in self._queue_probes.values():
+      fill = max(fill, depth() / capacity if capacity else 0.0)
+    return fill
+
+  def _evaluate(self, now: float) -> None:
+    period = self._period
+    period_ns = EVENT_PERIODS_MS[period] * 1e6
+    costs = np.asarray(self._costs_ns, dtype=np.float64)
+    utilization = float(costs.mean() / period_ns)
+    peak = float(np.percentile(costs, self._peak_percentile) / period_ns)
+    queue_fill = self.get_queue_fill()
+    usb_lost = self._usb_lost_in_window
+    self._last = {'utilization': utilization, 'peak_utilization': peak, 'queue_fill': queue_fill}
+    self._costs_ns = []
+    self._usb_lost_in_window = 0
+    self._window_start = now
+    i = self._periods.index(period)
+
+    reason = None
+    if utilization > self._high_water:
+      reason = 'utilization %.2f > %.2f' % (utilization, self._high_water)
+    elif peak > 1.0:
+      reason = 'p%g handler time exceeds the period (%.2f)' % (self._peak_percentile, peak)
+    elif queue_fill > self._queue_high:
+      reason = 'queue fill %.2f > %.2f' % (queue_fill, self._queue_high)
+    elif usb_lost:
+      reason = '%d USB packets lost' % usb_lost
+    if reason is not None:
+      self._calm_since = None
+      self._blocked_until[period] = now + self._cooldown_s
+      if i + 1 < len(self._periods):
+        self._decide(period, self._periods[i + 1], reason, now)
+      return
+
+    recommended = self._recommendation
+    if self._mode == PeriodModeEnum.RECOMMEND and recommended is not None and EVENT_PERIODS_MS[recommended] > EVENT_PERIODS_MS[period]:
+      # NOTE: 建议模式下周期不变，负载回落后撤回此前的延长建议（即建议回到当前周期）。
+      old, shorter, ratio = recommended, period, 1.0
+    elif i == 0:
+      return
+    else:
+      old, shorter = period, self._periods[i - 1]
+      ratio = EVENT_PERIODS_MS[period] / EVENT_PERIODS_MS[shorter]
+    calm = (utilization * ratio < self._target and peak * ratio < self._high_water
+            and queue_fill < self._queue_low and self._blocked_until.get(shorter, 0.0) <= now)
+    if not calm:
+      self._calm_since = None
+      return
+    if self._calm_since is None:
+      self._calm_since = now
+    if now - self._calm_since >= self._hold_s:
+      self._decide(old, shorter, 'predicted utilization %.2f < %.2f at %d ms' % (utilization * ratio, self._target, EVENT_PERIODS_MS[shorter]), now)
+
+  def _decide(self, old: DataAvailableEventPeriodEnum, new: DataAvailableEventPeriodEnum, reason: str, now: float) -> None:
+    applied = self._mode == PeriodModeEnum.AUTO
+    if not applied and new == self._recommendation:
+      self._calm_since = None
+      return # 建议模式下周期不变，相同的建议只记录一次
+    decision = PeriodDecision(time.time(), old, new, reason, self._last['utilization'], self._last['peak_utilization'],
+                              self._last['queue_fill'], applied)
+    self._decisions.append(decision)
+    self._recommendation = new
+    self._calm_since = None
+    if self._log_path is not None:
+      with open(self._log_path, 'a') as f:
+        f.write(json.dumps(decision.to_dict()) + '\n')
+    if self._on_decision is not None:
+      self._on_decision(decision)
+    if applied:
+      # NOTE: 不能在 SDK 回调线程中停止采集，重启在独立线程上进行。
+      self._restarting = True
+      threading.Thread(target=self._restart, args=(new,), name='EventPeriodController', daemon=True).start()
+
+  def _restart(self, period: DataAvailableEventPeriodEnum) -> None:
+    try:
+      with self._lock:
+        self._daq.stop_capturing()
+        self._reset_window(period)
+        self._daq.start_capturing(period)
+        self._num_restarts += 1
+    finally:
+      self._restarting = False
+
+  # 指标 -------------------------------------------------------------------
+
+  def get_decisions(self) -> List[PeriodDecision]:
+    """全部决策记录。"""
+    return list(self._decisions)
+
+  def get_metrics(self) -> Dict[str, Any]:
+    """当前周期、最近窗口的利用率与队列填充率、传输速率及决策/重启次数。"""
+    return {
+      'period_ms': EVENT_PERIODS_MS[self._period] if self._period is not None else None,
+      'recommended_period_ms': EVENT_PERIODS_MS[self._recommendation] if self._recommendation is not None else None,
+      'utilization': self._last['utilization'],
+      'peak_utilization': self._last['peak_utilization'],
+      'queue_fill': self._last['queue_fill'],
+      'transfer_rate': self._transfer_rate,
+      'decisions': len(self._decisions),
+      'restarts': self._num_restarts,
+    }
+
+  def register_gauges(self, telemetry: Any, prefix: str = 'event_period') -> None:
+    """将主要指标注册为 `Telemetry` 的仪表。"""
+    for key in ('period_ms', 'utilization', 'peak_utilization', 'queue_fill', 'transfer_rate', 'decisions', 'restarts'):
+      telemetry.register_gauge('%s_%s' % (prefix, key), lambda key=key: self.get_metrics()[key] or 0)
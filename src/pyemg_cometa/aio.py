@@ -0,0 +1,282 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+asyncio 接口。
+
+`AsyncDaqSystem` 包装 `CometaDaqSystem`（或 `SimulatedDaqSystem`），使同一个事件
+循环即可驱动设备、网络服务与存储：
+- `async with AsyncDaqSystem(daq) as adaq:` 注册/注销事件处理函数，退出时停止采集；
+- 阻塞的 SDK 命令（`start_capturing`、`check_impedance`、
+  `detect_accelerometer_offset` 等）在执行器线程中运行；
+- 数据帧与设备状态以异步迭代器交付（`async for frame in adaq.frames()`），
+  SDK 线程与事件循环之间通过有界队列桥接。
+
+NOTE: 数据帧在 SDK 线程中完成拷贝（`extract_raw_streams`），事件参数不会跨线程传递。
+"""
+
+from typing import Any, AsyncIterator, Callable, Dict, NamedTuple, Optional, Set
+from concurrent.futures import Executor
+from collections import deque
+import asyncio
+import functools
+import threading
+import time
+import numpy as np
+
+from .constants import DataAvailableEventPeriodEnum, DeviceStateEnum
+from .recorder import extract_raw_streams
+from .ring_buffer import OverflowPolicyEnum
+
+
+class AsyncFrame(NamedTuple):
+  """一次 `DataAvailable` 事件的数据拷贝。`streams` 保持 SDK 的 [通道][样本] 布局。"""
+  scan_number: int
+  timestamp: float
+  streams: Dict[str, np.ndarray]
+
+
+class _AsyncStream:
+  """由任意线程写入、在事件循环中异步读取的有界队列。
+
+  队列写满时：DROP_OLDEST 丢弃最旧的元素；BLOCK 阻塞写入方至多
+  `block_timeout` 秒，仍无空间则丢弃最旧的元素。两种情况均计入 `num_dropped`。
+  """
+  def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int, overflow_policy: str, block_timeout: float) -> None:
+    if overflow_policy not in (OverflowPolicyEnum.DROP_OLDEST, OverflowPolicyEnum.BLOCK):
+      raise ValueError("Unsupported overflow policy for async streams: %r" % (overflow_policy,))
+    self._loop = loop
+    self._maxsize = maxsize
+    self._overflow_policy = overflow_policy
+    self._block_timeout = block_timeout
+    self._items = deque() # type: deque
+    self._cond = threading.Condition()
+    self._event = asyncio.Event()
+    self._waiting = False
+    self._closed = False
+    self.num_dropped = 0
+
+  def put(self, item: Any) -> None:
+    """写入一个元素（线程安全，可在 SDK 线程中调用）。"""
+    with self._cond:
+      if self._closed:
+        return
+      if len(self._items) >= self._maxsize and self._overflow_policy == OverflowPolicyEnum.BLOCK:
+        self._cond.wait_for(lambda: len(self._items) < self._maxsize or self._closed, self._block_timeout)
+      if len(self._items) >= self._maxsize:
+        self._items.popleft()
+        self.num_dropped += 1
+      self._items.append(item)
+      wake = self._waiting
+      self._waiting = False
+    if wake:
+      self._loop.call_soon_threadsafe(self._event.set)
+
+  def close(self) -> None:
+    """关闭队列：已排队的元素仍可读出，之后迭代结束。"""
+    with self._cond:
+      self._closed = True
+      self._cond.notify_all()
+    if not self._loop.is_closed():
+      self._loop.call_soon_threadsafe(self._event.set)
+
+  def qsize(self) -> int:
+    return len(self._items)
+
+  def __aiter__(self) -> '_AsyncStream':
+    return self
+
+  async def __anext__(self) -> Any:
+    while True:
+      with self._cond:
+        if self._items:
+          item = self._items.popleft()
+          self._cond.notify()
+          return item
+        if self._closed:
+          raise StopAsyncIteration
+        self._event.clear()
+        self._waiting = True
+      await self._event.wait()
+
+
+class AsyncDaqSystem:
+  """`CometaDaqSystem` 的 asyncio 包装。
+
+  参数：
+  - daq: 已创建的设备对象；为 None 时在进入 `async with` 时通过
+    `backend.create_daq_system(**daq_kwargs)` 创建，并在退出时 `dispose()`。
+  - executor: 运行阻塞命令的执行器，默认使用事件循环的默认执行器。
+  - queue_size: 每个 `frames()`/`states()` 迭代器的队列长度（帧数）。
+  - overflow_policy: `OverflowPolicyEnum.DROP_OLDEST` 或 `OverflowPolicyEnum.BLOCK`。
+  - block_timeout: BLOCK 策略下 SDK 线程的最长等待时间（秒），应小于事件周期。
+  """
+  def __init__(self,
+               daq: Any = None,
+               executor: Optional[Executor] = None,
+               queue_size: int = 64,
+               overflow_policy: str = OverflowPolicyEnum.DROP_OLDEST,
+               block_timeout: float = 0.005,
+               **daq_kwargs: Any) -> None:
+    self._daq = daq
+    self._owns_daq = daq is None
+    self._daq_kwargs = daq_kwargs
+    self._executor = executor
+    self._queue_size = queue_size
+    self._overflow_policy = overflow_policy
+    self._block_timeout = block_timeout
+    self._loop = None # type: Optional[asyncio.AbstractEventLoop]
+    self._frame_streams = set() # type: Set[_AsyncStream]
+    self._state_streams = set() # type: Set[_AsyncStream]
+    self._capturing = False
+    self._num_dropped = 0
+
+  @property
+  def daq(self) -> Any:
+    """被包装的同步设备对象。"""
+    return self._daq
+
+  async def __aenter__(self) -> 'AsyncDaqSystem':
+    await self.open()
+    return self
+
+  async def __aexit__(self, exc_type, exc, tb) -> None:
+    await self.close()
+
+  async def open(self) -> None:
+    """创建设备（如需要）并注册事件处理函数。"""
+    self._loop = asyncio.get_running_loop()
+    if self._daq is None:
+      from .backend import create_daq_system
+      self._daq = await self.run_in_executor(functools.partial(create_daq_system, **self._daq_kwargs))
+    self._daq.add_on_data_available_handler(self._on_data_available)
+    self._daq.add_on_state_changed_handler(self._on_state_changed)
+
+  async def close(self) -> None:
+    """停止采集、注销事件处理函数并结束所有异步迭代器。"""
+    if self._daq is None:
+      return
+    try:
+      if self._capturing:
+        await self.stop()
+    finally:
+      self._daq.remove_on_data_available_handler(self._on_data_available)
+      self._daq.remove_on_state_changed_handler(self._on_state_changed)
+      for stream in list(self._frame_streams) + list(self._state_streams):
+        stream.close()
+      if self._owns_daq:
+        await self.run_in_executor(self._daq.dispose)
+        self._daq = None
+
+  async def run_in_executor(self, func: Callable[..., Any], *args: Any) -> Any:
+    """在执行器线程中运行阻塞调用。"""
+    loop = self._loop or asyncio.get_running_loop()
+    return await loop.run_in_executor(self._executor, func, *args)
+
+  async def call(self, method: str, *args: Any) -> Any:
+    """在执行器线程中调用设备对象的任意方法，如 `await adaq.call('turn_led_on', 0)`。"""
+    return await self.run_in_executor(getattr(self._daq, method), *args)
+
+  async def start(self, event_period: DataAvailableEventPeriodEnum = DataAvailableEventPeriodEnum.MS_100) -> None:
+    """开始采集。"""
+    await self.run_in_executor(self._daq.start_capturing, event_period)
+    self._capturing = True
+
+  async def stop(self) -> None:
+    """停止采集。"""
+    self._capturing = False
+    await self.run_in_executor(self._daq.stop_capturing)
+
+  async def get_state(self) -> DeviceStateEnum:
+    return await self.run_in_executor(self._daq.get_state)
+
+  async def set_capture_configuration(self, capture_config: Any) -> None:
+    await self.run_in_executor(self._daq.set_capture_configuration, capture_config)
+
+  async def get_capture_configuration(self) -> Any:
+    return await self.run_in_executor(self._daq.get_capture_configuration)
+
+  async def set_sensor_configuration(self, sensor_config: Any, sensor_id: int) -> None:
+    await self.run_in_executor(self._daq.set_sensor_configuration, sensor_config, sensor_id)
+
+  async def get_sensor_configuration(self, sensor_id: int) -> Any:
+    return await self.run_in_executor(self._daq.get_sensor_configuration, sensor_id)
+
+  async def check_impedance(self, sensor_id: int) -> Any:
+    return await self.run_in_executor(self._daq.check_impedance, sensor_id)
+
+  async def detect_accelerometer_offset(self, sensor_id: int) -> None:
+    await self.run_in_executor(self._daq.detect_accelerometer_offset, sensor_id)
+
+  async def generate_start_trigger(self) -> None:
+    await self.run_in_executor(self._daq.generate_start_trigger)
+
+  async def generate_stop_trigger(self) -> None:
+    await self.run_in_executor(self._daq.generate_stop_trigger)
+
+  def _new_stream(self, streams: Set[_AsyncStream], queue_size: Optional[int]) -> _AsyncStream:
+    if self._loop is None:
+      raise RuntimeError("AsyncDaqSystem is not open; use 'async with'")
+    stream = _AsyncStream(self._loop, queue_size or self._queue_size, self._overflow_policy, self._block_timeout)
+    streams.add(stream)
+    return stream
+
+  async def _iterate(self, streams: Set[_AsyncStream], stream: _AsyncStream) -> AsyncIterator[Any]:
+    try:
+      async for item in stream:
+        yield item
+    finally:
+      streams.discard(stream)
+      stream.close()
+      self._num_dropped += stream.num_dropped
+
+  def frames(self, queue_size: Optional[int] = None) -> AsyncIterator[AsyncFrame]:
+    """返回数据帧的异步迭代器。迭代器创建后才开始排队，可同时存在多个。"""
+    stream = self._new_stream(self._frame_streams, queue_size)
+    return self._iterate(self._frame_streams, stream)
+
+  def states(self, queue_size: Optional[int] = None) -> AsyncIterator[DeviceStateEnum]:
+    """返回设备状态变化的异步迭代器。"""
+    stream = self._new_stream(self._state_streams, queue_size)
+    return self._iterate(self._state_streams, stream)
+
+  def get_num_dropped(self) -> int:
+    """因队列已满而丢弃的帧/状态总数。"""
+    return self._num_dropped + sum(s.num_dropped for s in self._frame_streams | self._state_streams)
+
+  def _on_data_available(self, sender: Any, args: Any) -> None:
+    streams = list(self._frame_streams)
+    if not streams:
+      return
+    frame = AsyncFrame(args.scan_number(), time.monotonic(), extract_raw_streams(args))
+    for stream in streams:
+      stream.put(frame)
+
+  def _on_state_changed(self, sender: Any, args: Any) -> None:
+    state = args.get_state()
+    for stream in list(self._state_streams):
+      stream.put(state)
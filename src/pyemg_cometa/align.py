@@ -0,0 +1,279 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+跨模态时间对齐。
+
+EMG、FSW 与同步通道以 2 kHz 采样，IMU 各数据流按 `ImuAcqTypeEnum` 以 284/142/71 Hz
+（MIXED 模式下磁力计约 47 Hz）采样，每个事件内的样本数还会因小数累计而变化。
+`StreamAligner` 以 `scan_number()`（事件首个 EMG 样本的扫描序号）为主时钟：
+- 为每个数据流维护单调递增的样本序号，样本 k 的时间戳为 k / 采样率（秒，
+  相对扫描 0）；丢失事件时按扫描序号重新同步，序号出现跳变而非错位；
+- 触发扫描 `start_trigger_scan()`/`stop_trigger_scan()` 换算到同一时间轴；
+- `resample()`/`join()` 将低速数据流向量化地插值到任意时间网格；
+- `get_index_map()` 提供按采样率比值预计算的周期性索引表，
+  把一个数据流的样本序号直接映射为另一个数据流的样本序号，连接开销为一次查表。
+
+数据块采用 `recorder.extract_streams()` 的样本主序布局。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from fractions import Fraction
+import functools
+import math
+import numpy as np
+
+from .constants import (
+  DataAvailableEventPeriodEnum,
+  ImuAcqTypeEnum,
+  SamplingRateEnum,
+  get_event_period_ms,
+  get_modality_rates,
+)
+from .recorder import describe_capture_configuration, extract_streams
+
+
+class IndexMap:
+  """两个固定采样率数据流之间的样本序号映射。
+
+  采样率之比化为既约分数 p/q 后，目标序号每 q 个样本映射模式重复一次（源序号前进 p），
+  因此只需预计算长度为 q 的表。`__call__` 返回时间不晚于目标样本的最近源样本序号；
+  `nearest()` 返回时间最接近的源样本序号。
+  """
+  def __init__(self, src_rate: float, dst_rate: float) -> None:
+    if src_rate <= 0 or dst_rate <= 0:
+      raise ValueError("Sampling rates must be positive")
+    ratio = Fraction(src_rate).limit_denominator(10000) / Fraction(dst_rate).limit_denominator(10000)
+    self.src_rate = src_rate
+    self.dst_rate = dst_rate
+    self._p = ratio.numerator
+    self._q = ratio.denominator
+    k = np.arange(self._q, dtype=np.int64)
+    self._floor = (k * self._p) // self._q
+    self._round = (2 * k * self._p + self._q) // (2 * self._q)
+
+  def __call__(self, dst_indices: Any) -> np.ndarray:
+    dst_indices = np.asarray(dst_indices, dtype=np.int64)
+    period, offset = np.divmod(dst_indices, self._q)
+    return period * self._p + self._floor[offset]
+
+  def nearest(self, dst_indices: Any) -> np.ndarray:
+    dst_indices = np.asarray(dst_indices, dtype=np.int64)
+    period, offset = np.divmod(dst_indices, self._q)
+    return period * self._p + self._round[offset]
+
+
+@functools.lru_cache(maxsize=None)
+def get_index_map(src_rate: float, dst_rate: float) -> IndexMap:
+  """返回缓存的 `IndexMap`。"""
+  return IndexMap(src_rate, dst_rate)
+
+
+class _StreamHistory:
+  """单个数据流最近若干样本及其序号（线性缓冲区，写满时整体左移一半）。"""
+  def __init__(self, rate: float, capacity: int) -> None:
+    self.rate = rate
+    self.capacity = max(capacity, 1)
+    self.next_index = 0
+    self.data = None # type: Optional[np.ndarray]
+    self.index = np.empty(self.capacity, dtype=np.int64)
+    self.size = 0
+
+  def append(self, start_index: int, block: np.ndarray) -> None:
+    n = block.shape[0]
+    if self.data is None or self.data.shape[1:] != block.shape[1:] or self.data.dtype != block.dtype:
+      self.data = np.empty((self.capacity,) + block.shape[1:], dtype=block.dtype)
+      self.size = 0
+    if n >= self.capacity:
+      block = block[-self.capacity:]
+      start_index += n - self.capacity
+      n = self.capacity
+      self.size = 0
+    elif self.size + n > self.capacity:
+      keep = min(self.size, self.capacity // 2, self.capacity - n)
+      self.data[:keep] = self.data[self.size - keep:self.size]
+      self.index[:keep] = self.index[self.size - keep:self.size]
+      self.size = keep
+    self.data[self.size:self.size + n] = block
+    self.index[self.size:self.size + n] = np.arange(start_index, start_index + n)
+    self.size += n
+    self.next_index = start_index + n
+
+
+class StreamAligner:
+  """以扫描序号为主时钟的多数据流对齐器。
+
+  参数：
+  - imu_acq_type / sampling_rate: 用于推导各数据流采样率（见 `constants.get_modality_rates`）。
+  - event_period: 事件周期，用于推导 `sensor_states`（每事件一个样本）的速率。
+  - history_s: 每个数据流保留的历史时长（秒），供 `resample()`/`join()` 使用。
+  """
+  def __init__(self,
+               imu_acq_type: Any = ImuAcqTypeEnum.RAW_DATA,
+               sampling_rate: Any = SamplingRateEnum.HZ_2000,
+               event_period: Any = DataAvailableEventPeriodEnum.MS_100,
+               history_s: float = 10.0) -> None:
+    rates = get_modality_rates(imu_acq_type, sampling_rate)
+    self._emg_rate = rates['emg']
+    rates['fsw'] = rates['sync'] = rates['emg']
+    rates['sensor_states'] = 1000.0 / get_event_period_ms(event_period)
+    self._rates = {name: rate for name, rate in rates.items() if rate > 0}
+    # 缓冲区写满时保留一半，因此容量取历史时长的两倍。
+    self._streams = {name: _StreamHistory(rate, 2 * int(math.ceil(history_s * rate)) + 2) for name, rate in self._rates.items()}
+    self._start_trigger_scans = [] # type: List[int]
+    self._stop_trigger_scans = [] # type: List[int]
+    self._last_scan = None # type: Optional[int]
+    self._num_resyncs = 0
+
+  @classmethod
+  def from_capture_configuration(cls, capture_configuration: Any, event_period: Any, **kwargs: Any) -> 'StreamAligner':
+    """根据采集配置（`CometaCaptureConfiguration` 或快照）创建。"""
+    capture = describe_capture_configuration(capture_configuration)
+    return cls(capture['imu_acq_type'], capture['sampling_rate'], event_period, **kwargs)
+
+  def get_rate(self, name: str) -> float:
+    """数据流的采样率（Hz）。"""
+    return self._rates[name]
+
+  def get_stream_names(self) -> List[str]:
+    return list(self._rates)
+
+  def scan_to_time(self, scan: Any) -> Any:
+    """扫描序号 -> 时间（秒）。"""
+    return scan / self._emg_rate
+
+  def get_timestamps(self, name: str, start_index: int, count: int) -> np.ndarray:
+    """数据流样本 `start_index` 起 `count` 个样本的时间戳（秒）。"""
+    return (start_index + np.arange(count)) / self._rates[name]
+
+  def get_start_trigger_times(self) -> np.ndarray:
+    return self.scan_to_time(np.asarray(self._start_trigger_scans, dtype=np.int64))
+
+  def get_stop_trigger_times(self) -> np.ndarray:
+    return self.scan_to_time(np.asarray(self._stop_trigger_scans, dtype=np.int64))
+
+  def get_num_resyncs(self) -> int:
+    """因事件丢失等原因按扫描序号重新同步的次数。"""
+    return self._num_resyncs
+
+  def on_data_available(self, sender: Any, args: Any) -> None:
+    """可直接注册到 `add_on_data_available_handler` 的回调。"""
+    self.push(args.scan_number(), extract_streams(args),
+              args.start_trigger_scan() if args.is_start_trigger_detected() else None,
+              args.stop_trigger_scan() if args.is_stop_trigger_detected() else None)
+
+  def push(self,
+           scan_number: int,
+           blocks: Dict[str, np.ndarray],
+           start_trigger_scan: Optional[int] = None,
+           stop_trigger_scan: Optional[int] = None) -> Dict[str, int]:
+    """记录一个事件的数据块，返回各数据流本块首样本的序号。"""
+    if start_trigger_scan is not None:
+      self._start_trigger_scans.append(start_trigger_scan)
+    if stop_trigger_scan is not None:
+      self._stop_trigger_scans.append(stop_trigger_scan)
+    starts = {}
+    resync = False
+    for name, block in blocks.items():
+      stream = self._streams.get(name)
+      if stream is None:
+        continue
+      # 以扫描序号推算本块首样本的期望序号（与设备按事件累计小数样本的方式一致）。
+      expected = int(get_index_map(stream.rate, self._emg_rate)(scan_number))
+      start = stream.next_index
+      if start != expected and (self._last_scan is None or abs(start - expected) > 1):
+        resync = self._last_scan is not None
+        start = expected
+      stream.append(start, block)
+      starts[name] = start
+    if resync:
+      self._num_resyncs += 1
+    self._last_scan = scan_number
+    return starts
+
+  def get_samples(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+    """返回历史缓冲区中的 (时间戳, 样本) 视图。"""
+    stream = self._streams[name]
+    if stream.data is None:
+      return np.empty(0), np.empty((0,))
+    return stream.index[:stream.size] / stream.rate, stream.data[:stream.size]
+
+  def get_time_range(self, name: str) -> Tuple[float, float]:
+    """历史缓冲区覆盖的时间范围（秒）。"""
+    stream = self._streams[name]
+    if not stream.size:
+      return (0.0, 0.0)
+    return (stream.index[0] / stream.rate, stream.index[stream.size - 1] / stream.rate)
+
+  def resample(self, name: str, times: Any, method: str = 'linear') -> np.ndarray:
+    """将数据流插值到时间网格 `times`（秒），返回形状 (len(times), 通道[, 分量]) 的 float 数组。
+
+    `method`：'linear' 线性插值；'previous' 取不晚于该时刻的最近样本（零阶保持）；
+    'nearest' 取最近样本。超出历史范围的时刻取端点值。样本序号出现跳变（丢失事件）时，
+    跳变两侧之间按线性插值。
+    """
+    t, data = self.get_samples(name)
+    if t.size == 0:
+      raise ValueError("No samples buffered for stream %r" % name)
+    times = np.asarray(times, dtype=np.float64)
+    if method == 'linear':
+      right = np.clip(np.searchsorted(t, times, side='right'), 1, t.size - 1) if t.size > 1 else np.zeros(times.shape, dtype=np.int64)
+      left = np.maximum(right - 1, 0)
+      span = t[right] - t[left]
+      with np.errstate(divide='ignore', invalid='ignore'):
+        w = np.clip(np.where(span > 0, (times - t[left]) / span, 0.0), 0.0, 1.0)
+      w = w.reshape(w.shape + (1,) * (data.ndim - 1))
+      return data[left] * (1.0 - w) + data[right] * w
+    if method == 'previous':
+      idx = np.clip(np.searchsorted(t, times, side='right') - 1, 0, t.size - 1)
+    elif method == 'nearest':
+      idx = np.clip(np.searchsorted(t, times), 1, max(t.size - 1, 1)) if t.size > 1 else np.zeros(times.shape, dtype=np.int64)
+      if t.size > 1:
+        idx = np.where(np.abs(times - t[idx - 1]) <= np.abs(t[idx] - times), idx - 1, idx)
+    else:
+      raise ValueError("Unknown resampling method %r" % method)
+    return data[idx]
+
+  def join(self,
+           names: Optional[Iterable[str]] = None,
+           rate: Optional[float] = None,
+           start: Optional[float] = None,
+           stop: Optional[float] = None,
+           method: str = 'linear') -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """在公共时间范围内以 `rate`（默认 EMG 采样率）构造网格，并将各数据流插值到该网格。
+
+    返回 (时间网格, {数据流: 插值结果})。
+    """
+    names = [name for name in (names or self._rates) if self._streams[name].size]
+    if not names:
+      return np.empty(0), {}
+    rate = rate or self._emg_rate
+    ranges = [self.get_time_range(name) for name in names]
+    t0 = max(r[0] for r in ranges) if start is None else start
+    t1 = min(r[1] for r in ranges) if stop is None else stop
+    grid = np.ceil(t0 * rate) / rate + np.arange(max(int(math.floor((t1 - math.ceil(t0 * rate) / rate) * rate)) + 1, 0)) / rate
+    return grid, {name: self.resample(name, grid, method) for name in names}
@@ -0,0 +1,180 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+.NET 交错数组到 NumPy 的批量转换。
+
+回调中逐元素遍历 pythonnet 返回的 .NET 数组开销很大。本模块对基本
+数值类型（`float[]`、`double[]` 等）的每个通道行使用 `Marshal.Copy`
+一次性拷贝进连续的 `ndarray`；对结构体/元组类型或纯 Python 嵌套列表
+则退化为逐样本的纯 Python 转换，便于在无 CLR 的环境中测试。
+
+NOTE: 本模块不在导入时加载 CLR，仅在首次遇到 .NET 数组时才导入 `System`。
+"""
+
+from typing import Any, Optional, Tuple
+import numpy as np
+
+
+# .NET 基本元素类型名 -> 可被 `Marshal.Copy` 直接拷贝的 NumPy 类型。
+_CLR_ELEMENT_DTYPES = {
+  'Single': np.dtype(np.float32),
+  'Double': np.dtype(np.float64),
+  'Int16': np.dtype(np.int16),
+  'Int32': np.dtype(np.int32),
+  'Int64': np.dtype(np.int64),
+  'Byte': np.dtype(np.uint8),
+}
+
+_interop = None
+
+
+def _get_interop() -> Tuple[Any, Any]:
+  """延迟导入 `Marshal` 与 `IntPtr`（仅首次调用时触达 CLR）。"""
+  global _interop
+  if _interop is None:
+    from System import IntPtr # type: ignore
+    from System.Runtime.InteropServices import Marshal # type: ignore
+    _interop = (Marshal, IntPtr)
+  return _interop
+
+
+def is_clr_array(obj: Any) -> bool:
+  """判断对象是否为 pythonnet 包装的 .NET `System.Array`。"""
+  return hasattr(obj, 'GetType') and hasattr(obj, 'Rank')
+
+
+def _clr_element_dtype(arr: Any) -> Optional[np.dtype]:
+  """返回 .NET 一维数组元素对应的 NumPy 类型；非基本类型返回 None。"""
+  if not is_clr_array(arr):
+    return None
+  return _CLR_ELEMENT_DTYPES.get(arr.GetType().GetElementType().Name)
+
+
+def _copy_clr_row(row: Any, dst: np.ndarray) -> None:
+  """将 .NET 一维基本类型数组整体拷贝到连续的 `dst` 中（最多拷贝 `dst` 的长度，绝不越界写入）。"""
+  Marshal, IntPtr = _get_interop()
+  Marshal.Copy(row, 0, IntPtr(dst.ctypes.data), min(row.Length, dst.shape[0]))
+
+
+def _as_tuple(item: Any) -> tuple:
+  """将样本（Python 元组、.NET `Tuple`/`ValueTuple` 或可迭代对象）展开为元组。"""
+  if isinstance(item, tuple):
+    return item
+  if hasattr(item, 'Item1'):
+    values = []
+    i = 1
+    while hasattr(item, 'Item%d' % i):
+      values.append(getattr(item, 'Item%d' % i))
+      i += 1
+    return tuple(values)
+  return tuple(item)
+
+
+def _into(result: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+  """若提供 `out` 则写入并返回之，否则直接返回 `result`。"""
+  if out is None:
+    return result
+  if out.shape != result.shape:
+    raise ValueError("`out` has shape %s, expected %s" % (out.shape, result.shape))
+  np.copyto(out, result, casting='unsafe')
+  return out
+
+
+def to_numpy_1d(samples: Any, dtype: Any = np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+  """一维样本（如同步通道、丢包计数）→ 形状 (样本,) 的 ndarray。"""
+  dtype = np.dtype(dtype)
+  if samples is None:
+    return _into(np.empty((0,), dtype), out)
+  if isinstance(samples, np.ndarray):
+    return _into(samples.astype(dtype, copy=False), out)
+  src_dtype = _clr_element_dtype(samples)
+  if src_dtype is not None:
+    if out is not None and out.dtype == src_dtype and out.shape == (samples.Length,) and out.flags.c_contiguous:
+      _copy_clr_row(samples, out)
+      return out
+    buf = np.empty((samples.Length,), src_dtype)
+    _copy_clr_row(samples, buf)
+    return _into(buf.astype(dtype, copy=False), out)
+  return _into(np.asarray(list(samples), dtype=dtype), out)
+
+
+def to_numpy_2d(samples: Any, dtype: Any = np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+  """[通道][样本] 交错数组 → 形状 (通道, 样本) 的连续 ndarray。
+
+  对 .NET 基本类型交错数组，每个通道只做一次 `Marshal.Copy`。
+  若提供 `out` 且其类型/形状与源数组一致，则直接写入以避免分配。
+  各通道行长度不一致或某行为 None 时抛出 `ValueError`（指明通道）。
+  """
+  dtype = np.dtype(dtype)
+  if samples is None:
+    return _into(np.empty((0, 0), dtype), out)
+  if isinstance(samples, np.ndarray):
+    return _into(samples.astype(dtype, copy=False), out)
+  if is_clr_array(samples) and samples.Length > 0:
+    rows = [samples[ch] for ch in range(samples.Length)]
+    src_dtype = _clr_element_dtype(rows[0])
+    # NOTE: 仅在各行均为等长基本类型数组时走整行拷贝，否则交由下方的逐样本路径（含行长校验）。
+    if src_dtype is not None and all(row is not None and row.Length == rows[0].Length for row in rows):
+      shape = (len(rows), rows[0].Length)
+      direct = out is not None and out.dtype == src_dtype and out.shape == shape and out.flags.c_contiguous
+      buf = out if direct else np.empty(shape, src_dtype)
+      for ch, row in enumerate(rows):
+        _copy_clr_row(row, buf[ch])
+      if direct:
+        return buf
+      return _into(buf.astype(dtype, copy=False), out)
+  rows = [None if row is None else _as_tuple(row) for row in samples]
+  if not rows:
+    return _into(np.empty((0, 0), dtype), out)
+  for ch, row in enumerate(rows):
+    if row is None:
+      raise ValueError("Channel %d of the jagged sample array is None" % ch)
+    if len(row) != len(rows[0]):
+      raise ValueError("Channel %d has %d samples, expected %d as in channel 0" % (ch, len(row), len(rows[0])))
+  return _into(np.asarray(rows, dtype=dtype), out)
+
+
+def to_numpy_3d(samples: Any, width: int, dtype: Any = np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+  """[通道][样本](分量...) → 形状 (通道, 样本, width) 的 ndarray。
+
+  用于四元数（width=4）与三轴数据（width=3）。样本为结构体/元组，
+  无法整体内存拷贝，因此按通道收集后一次性构造数组。
+  """
+  dtype = np.dtype(dtype)
+  if samples is None:
+    return _into(np.empty((0, 0, width), dtype), out)
+  if isinstance(samples, np.ndarray):
+    return _into(samples.astype(dtype, copy=False), out)
+  channels = [[_as_tuple(s) for s in ch] for ch in samples]
+  n_samples = len(channels[0]) if channels else 0
+  if n_samples == 0:
+    return _into(np.empty((len(channels), 0, width), dtype), out)
+  result = np.asarray(channels, dtype=dtype)
+  if result.shape != (len(channels), n_samples, width):
+    raise ValueError("Expected samples of width %d, got shape %s" % (width, result.shape))
+  return _into(result, out)
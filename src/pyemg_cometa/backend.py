@@ -0,0 +1,64 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+采集后端选择。
+
+`create_daq_system()` 按参数或环境变量 `PYEMG_COMETA_BACKEND` 返回真实的
+`CometaDaqSystem`（需要 Windows 与 .NET 运行时）或纯 Python 的
+`SimulatedDaqSystem`，使上层管线代码与具体后端解耦。
+"""
+
+from typing import Any, Optional
+import os
+
+
+BACKEND_ENV_VAR = 'PYEMG_COMETA_BACKEND'
+
+
+class BackendEnum:
+  """可用的采集后端。"""
+  COMETA = 'cometa'
+  SIMULATED = 'simulated'
+
+
+def create_daq_system(backend: Optional[str] = None, **kwargs: Any) -> Any:
+  """创建采集系统实例。
+
+  参数：
+  - backend: `BackendEnum` 之一；为 None 时读取 `PYEMG_COMETA_BACKEND`，默认真实设备。
+  - kwargs: 传给模拟后端构造函数的参数（真实设备忽略）。
+  """
+  if backend is None:
+    backend = os.environ.get(BACKEND_ENV_VAR, BackendEnum.COMETA)
+  if backend == BackendEnum.COMETA:
+    from .daq_system import CometaDaqSystem
+    return CometaDaqSystem()
+  elif backend == BackendEnum.SIMULATED:
+    from .simulated import SimulatedDaqSystem
+    return SimulatedDaqSystem(**kwargs)
+  raise ValueError("Unknown DAQ backend: %r" % (backend,))
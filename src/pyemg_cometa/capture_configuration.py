@@ -32,33 +32,23 @@
 以及 IMU 采样模式等配置项。
 """
 
-import clr
-import os
-dir_path = os.path.dirname(__file__)
-
-from .constants import ImuAcqTypeEnum, FootSwProtocolEnum, SamplingRateEnum
+from .constants import ImuAcqTypeEnum, FootSwProtocolEnum, SamplingRateEnum, to_net_value
 from .foot_sw_transducer import CometaFootSwTransducerEnabled, CometaFootSwTransducerThreshold
 
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSys')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSysInterface')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'CyUSB')) # type: ignore
+from ._dotnet import get_net_type
 
-from Waveplus.DaqSys import * # type: ignore
-from Waveplus.DaqSysInterface import * # type: ignore
-from Waveplus.DaqSys.Definitions import * # type: ignore
-from Waveplus.DaqSys.Exceptions import * # type: ignore
-from CyUSB import * # type: ignore
+CaptureConfiguration = get_net_type('CaptureConfiguration')
 
 
 class CometaCaptureConfiguration(CaptureConfiguration):  # type: ignore
   """采集配置的 Python 包装。"""
   def get_sampling_rate(self) -> SamplingRateEnum:
     """读取 EMG 采样率设置。"""
-    return self.get_SamplingRate()
+    return SamplingRateEnum.from_net(self.get_SamplingRate())
 
   def set_sampling_rate(self, rate: SamplingRateEnum) -> None:
     """设置 EMG 采样率。"""
-    self.set_SamplingRate(rate)
+    self.set_SamplingRate(to_net_value(rate))
 
   def get_external_trigger_status(self) -> bool:
     """是否启用外部触发。"""
@@ -110,16 +100,16 @@ class CometaCaptureConfiguration(CaptureConfiguration):  # type: ignore
 
   def get_fsw_protocol(self) -> FootSwProtocolEnum:
     """读取 FSW 协议。"""
-    return self.get_FootSwProtocol()
+    return FootSwProtocolEnum.from_net(self.get_FootSwProtocol())
 
   def set_fsw_protocol(self, protocol: FootSwProtocolEnum) -> None:
     """设置 FSW 协议。"""
-    self.set_FootSwProtocol(protocol)
+    self.set_FootSwProtocol(to_net_value(protocol))
 
   def get_imq_acq_type(self) -> ImuAcqTypeEnum:
     """读取 IMU 采样模式。"""
-    return self.get_IMU_AcqType()
+    return ImuAcqTypeEnum.from_net(self.get_IMU_AcqType())
 
   def set_imu_acq_type(self, acq_type: ImuAcqTypeEnum) -> None:
     """设置 IMU 采样模式。"""
-    self.set_IMU_AcqType(acq_type)
+    self.set_IMU_AcqType(to_net_value(acq_type))
@@ -31,175 +31,258 @@ Cometa Waveplus SDK 常量与枚举映射。
 本模块将 .NET SDK 中的枚举/常量统一暴露为 Python 侧的类属性，
 方便在类型提示与 IDE 补全下书写更安全、可读的代码。
 
-注意：这些枚举值直接映射到 .NET 对应值，不改变语义。
+所有枚举均为原生 Python `IntEnum`：状态/错误码比较是整数比较，可 pickle
+传递给子进程，且导入本模块不会启动 CLR。与 .NET 值的转换只在封装层边界
+通过 `to_net()`/`from_net()` 进行，查找表在首次转换时构建并缓存。
 """
 
-import clr
-import os
-dir_path = os.path.dirname(__file__)
-
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSys')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSysInterface')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'CyUSB')) # type: ignore
-
-from Waveplus.DaqSys import * # type: ignore
-from Waveplus.DaqSysInterface import * # type: ignore
-from Waveplus.DaqSys.Definitions import * # type: ignore
-from Waveplus.DaqSys.Exceptions import * # type: ignore
-from WaveplusLab.Shared.Definitions import SensorType # type: ignore
-from CyUSB import * # type: ignore
-
-
-class DeviceStateEnum:
+from typing import Any, Callable, Dict, Optional, Tuple
+from enum import IntEnum
+from ._dotnet import get_net_type, get_sdk_version
+
+
+class NetIntEnum(IntEnum):
+  """映射 .NET 枚举的 Python `IntEnum` 基类。
+
+  成员以 `(序号, .NET 成员名)` 定义；整数值为 Python 侧序号，可直接比较与
+  pickle。与 .NET 值的双向查找表在首次转换时构建一次并缓存。
+  """
+  def __new__(cls, value: int, net_name: Optional[str] = None) -> 'NetIntEnum':
+    obj = int.__new__(cls, value)
+    obj._value_ = value
+    obj._net_name = net_name
+    return obj
+
+  @classmethod
+  def _get_tables(cls) -> Tuple[Dict['NetIntEnum', Any], Dict[Any, 'NetIntEnum']]:
+    """构建（并缓存）Python 成员与 .NET 值之间的双向查找表。"""
+    tables = _tables.get(cls)
+    if tables is None:
+      net_type = get_net_type(*_net_types[cls])
+      to_net, from_net = {}, {}
+      for member in cls:
+        net_value = getattr(net_type, member._net_name, None)
+        if net_value is None:
+          continue # 当前 SDK 版本未提供该成员，`to_net()` 时报错
+        to_net[member] = net_value
+        from_net[net_value] = member
+        from_net[str(net_value)] = member
+      tables = _tables[cls] = (to_net, from_net)
+    return tables
+
+  def to_net(self) -> Any:
+    """转换为对应的 .NET 枚举值；当前 SDK 未提供该成员时抛出 `ValueError`。"""
+    net_value = self._get_tables()[0].get(self)
+    if net_value is None:
+      raise ValueError("%s.%s (.NET member %r) is not provided by the loaded SDK (Waveplus.DaqSys %s)"
+                       % (type(self).__name__, self.name, self._net_name, get_sdk_version()))
+    return net_value
+
+  @classmethod
+  def coerce(cls, value: Any) -> 'NetIntEnum':
+    """将本枚举成员、Python/.NET 成员名字符串或 .NET 枚举值统一转换为本枚举成员。"""
+    if isinstance(value, cls):
+      return value
+    if isinstance(value, str):
+      if value in cls.__members__:
+        return cls[value]
+      for member in cls:
+        if member._net_name == value:
+          return member
+      raise ValueError("%r is not a valid %s" % (value, cls.__name__))
+    return cls.from_net(value)
+
+  @classmethod
+  def from_net(cls, value: Any) -> 'NetIntEnum':
+    """将 .NET 枚举值（或本枚举成员）转换为本枚举成员。"""
+    if isinstance(value, cls):
+      return value
+    from_net = cls._get_tables()[1]
+    member = from_net.get(value)
+    if member is None:
+      member = from_net.get(str(value))
+      if member is None:
+        raise ValueError("%r is not a valid %s" % (value, cls.__name__))
+      from_net[value] = member
+    return member
+
+
+_net_types = {} # type: Dict[type, Tuple[str, Optional[str]]]
+_tables = {} # type: Dict[type, Tuple[Dict[NetIntEnum, Any], Dict[Any, NetIntEnum]]]
+
+
+def _net_enum(type_name: str, namespace: Optional[str] = None) -> Callable[[type], type]:
+  """登记枚举类对应的 .NET 类型名。"""
+  def register(cls: type) -> type:
+    _net_types[cls] = (type_name, namespace)
+    return cls
+  return register
+
+
+def to_net_value(value: Any) -> Any:
+  """若为 `NetIntEnum` 成员则转换为 .NET 值，否则原样返回。"""
+  return value.to_net() if isinstance(value, NetIntEnum) else value
+
+
+@_net_enum('DeviceState')
+class DeviceStateEnum(NetIntEnum):
   """设备状态枚举（映射 .NET `DeviceState`）。"""
-  NOT_CONNECTED = DeviceState.NotConnected # type: ignore # No USB device is connected to the bus
-  INITIALIZING = DeviceState.Initializing # type: ignore # WavePlus is initializing
-  COMMUNICATION_ERROR = DeviceState.CommunicationError # type: ignore # No communication with WavePlus device available
-  INITIALIZING_ERROR = DeviceState.InitializingError # type: ignore # WavePlus device was not correctly initialized
-  IDLE = DeviceState.Idle # type: ignore # WavePlus device is ready for use
-  CAPTURING = DeviceState.Capturing # type: ignore # WavePlus device is acquiting data
+  NOT_CONNECTED = 0, 'NotConnected' # No USB device is connected to the bus
+  INITIALIZING = 1, 'Initializing' # WavePlus is initializing
+  COMMUNICATION_ERROR = 2, 'CommunicationError' # No communication with WavePlus device available
+  INITIALIZING_ERROR = 3, 'InitializingError' # WavePlus device was not correctly initialized
+  IDLE = 4, 'Idle' # WavePlus device is ready for use
+  CAPTURING = 5, 'Capturing' # WavePlus device is acquiting data
+  READING_SENSOR_MEMORY = 6, 'ReadingSensorMemory' # WavePlus device is downloading sensor memory
 
 
-class DeviceErrorEnum:
+@_net_enum('DeviceError')
+class DeviceErrorEnum(NetIntEnum):
   """设备错误码（映射 .NET `DeviceError` 与异常枚举）。"""
-  SUCCESS = DeviceError.Success # type: ignore
-  DEVICE_NOTCONNECTED = DeviceError.DeviceNotConnected # type: ignore
-  SENDING_COMMAND = DeviceError.SendingCommand # type: ignore
-  RECEIVING_COMMAND_REPLY = DeviceError.ReceivingCommandReply # type: ignore
-  DEVICE_ERROR_EXECUTING_COMMAND = DeviceError.DeviceErrorExecutingCommand # type: ignore
-  CONFIGURING_CAPTURE = DeviceError.ConfiguringCapture # type: ignore
-  WRONG_CAPTURE_CONFIGURATION_IMU_ACQ_TYPE = DeviceError.WrongCaptureConfigurationImuAcqType # type: ignore
-  WRONG_CAPTURE_CONFIGURATION_SAMPLING_RATE = DeviceError.WrongCaptureConfigurationSamplingRate # type: ignore
-  WRONG_CAPTURE_CONFIGURATION_SAMPLING_RATE_FROM_DEVICE = DeviceError.WrongCaptureConfigurationSamplingRateFromDevice # type: ignore
-  WRONG_CAPTURE_CONFIGURATION_DATA_AVAILABLE_EVENT_PERIOD = DeviceError.WrongCaptureConfigurationDataAvailableEventPeriod # type: ignore
-  WRONG_SENSOR_CONFIGURATION_ACCELEROMETER_FULL_SCALE = DeviceError.WrongSensorConfigurationAccelerometerFullScale # type: ignore
-  WRONG_SENSOR_CONFIGURATION_GYROSCOPE_FULL_SCALE = DeviceError.WrongSensorConfigurationGyroscopeFullScale # type: ignore
-  WRONG_SENSOR_CONFIGURATION_SENSOR_TYPE = DeviceError.WrongSensorConfigurationSensorType # type: ignore
-  WRONG_FOOT_SW_PROTOCOL = DeviceError.WrongFootSwProtocol # type: ignore
-  WRONG_DEVICE_TYPE_FROM_DEVICE = DeviceError.WrongDeviceTypeFromDevice # type: ignore
-  WRONG_SENSOR_NUMBER = DeviceError.WrongSensorNumber # type: ignore
-  WRONG_FOOT_SW_SENSOR_NUMBER = DeviceError.WrongFootSwSensorNumber # type: ignore
-  FOOT_SW_SENSOR_NOT_INSTALLED = DeviceError.FootSwSensorNotInstalled # type: ignore
-  READING_BACK_CAPTURE_CONFIGURATION_SAMPLING_RATE = DeviceError.ReadingBackCaptureConfigurationSamplingRate # type: ignore
-  READING_BACK_COMMUNICATION_TEST_DATA = DeviceError.ReadingBackCommunicationTestData # type: ignore
-  READING_BACK_SENSOR_COMMAND_BUFFER = DeviceError.ReadingBackSensorCommandBuffer # type: ignore
-  DATA_TRANSFER_THREADING_STARTING_TIMEOUT = DeviceError.DataTransferThreadStartingTimeout# type: ignore
-  ACTION_NOT_ALLOWED_IN_THE_CURRENT_DEVICE_STATE = DeviceError.ActionNotAllowedInTheCurrentDeviceState # type: ignore
-  ACTION_NOT_ALLOWED_IN_THE_CURRENT_DATA_TRANSFER_STATE = DeviceError.ActionNotAllowedInTheCurrentDataTransferState # type: ignore
-  WRONG_DEVICE_STATE = DeviceError.WrongDeviceState # type: ignore
-  WRONG_DEVICE_ACTION = DeviceError.WrongDeviceAction # type: ignore
-  TIMEOUT_EXECUTING_SENSOR_COMMAND = DeviceError.TimeoutExecutingSensorCommand # type: ignore
-  COMMAND_NOT_EXECUTED_BY_ALL_THE_SENSORS = DeviceError.CommandNotExecutedByAllTheSensors # type: ignore
-  WRONG_DAQ_TIMEOUT_VALUE = DeviceError.WrongDaqTimeOutValue # type: ignore
-  BAD_SENSOR_COMMUNICATION = DeviceError.BadSensorCommunication # type: ignore
-  SYNC_BUFFER1_OVERRUN = DeviceError.SyncBuffer1Overrun # type: ignore
-  SYNC_BUFFER2_OVERRUN = DeviceError.SyncBuffer2Overrun # type: ignore
-  IMU_CALIBRATION_NOT_AVAILABLE = DeviceError.ImuCalibrationNotAvailable # type: ignore
-
-
-class DaqDeviceExceptionTypeEnum:
-  DEVICE_NOT_CONNECTED = DaqDeviceExceptionType.deviceNotConnected # type: ignore
-  UNABLE_TO_START_CAPTURE_DATA_TRANSFER = DaqDeviceExceptionType.unableToStartCaptureDataTransfer # type: ignore
-  UNABLE_TO_START_IMPEDANCE_DATA_TRANSFER = DaqDeviceExceptionType.unableToStartImpedanceDataTransfer # type: ignore
-  UNABLE_TO_START_CAPTURING = DaqDeviceExceptionType.unableToStartCapturing # type: ignore
-  UNABLE_TO_STOP_CAPTURING = DaqDeviceExceptionType.unableToStopCapturing # type: ignore
-  UNABLE_TO_READ_SENSOR_MEMORY_STATUS = DaqDeviceExceptionType.unableToReadSensorMemoryStatus # type: ignore
-  UNABLE_TO_GET_CAPTURE_CONFIGURATION = DaqDeviceExceptionType.unableToGetCaptureConfiguration # type: ignore
-  UNABLE_TO_SET_CAPTURE_CONFIGURATION = DaqDeviceExceptionType.unableToSetCaptureConfiguration # type: ignore
-  UNABLE_TO_GET_INSTALLED_SENSORS = DaqDeviceExceptionType.unableToGetInstalledSensors # type: ignore
-  UNABLE_TO_GET_DEVICE_TYPE = DaqDeviceExceptionType.unableToGetDeviceType # type: ignore
-  UNABLE_TO_CONFIGURE_SENSOR = DaqDeviceExceptionType.unableToConfigureSensor # type: ignore
-  UNABLE_TO_GET_SENSOR_CONFIGURATION = DaqDeviceExceptionType.unableToGetSensorConfiguration # type: ignore
-  UNABLE_TO_TURN_INTERNAL_TRIGGER_OFF = DaqDeviceExceptionType.unableToTurnInternalTrigger_OFF # type: ignore
-  UNABLE_TO_TURN_INTERNAL_TRIGGER_ON = DaqDeviceExceptionType.unableToTurnInternalTrigger_ON # type: ignore
-  UNABLE_TO_ENABLE_SENSOR = DaqDeviceExceptionType.unableToEnableSensor # type: ignore
-  UNABLE_TO_DISABLE_SENSOR = DaqDeviceExceptionType.unableToDisableSensor # type: ignore
-  UNABLE_TO_ENABLE_FOOT_SW_SENSOR = DaqDeviceExceptionType.unableToEnableFootSwSensor # type: ignore
-  UNABLE_TO_DISABLE_FOOT_SW_SENSOR = DaqDeviceExceptionType.unableToDisableFootSwSensor # type: ignore
-  UNABLE_TO_DETECT_ACCELEROMETER_OFFSET = DaqDeviceExceptionType.unableToDetectAccelerometerOffset # type: ignore
-  UNABLE_TO_CHECK_ELECTRODE_IMPEDANCE = DaqDeviceExceptionType.unableToCheckElectrodeImpedance # type: ignore
-  UNABLE_TO_GET_ELECTRODE_IMPEDANCE_REPORT = DaqDeviceExceptionType.unableToGetElectrodeImpedanceReport # type: ignore
-  UNABLE_TO_TURN_SENSOR_LED_ON = DaqDeviceExceptionType.unableToTurnSensorLedOn # type: ignore
-  UNABLE_TO_TURN_FOOTSWSENSOR_LED_ON = DaqDeviceExceptionType.unableToTurnFootSwSensorLedOn # type: ignore
-  UNABLE_TO_TURN_ALL_SENSOR_LEDS_ON = DaqDeviceExceptionType.unableToTurnAllSensorLedsOn # type: ignore
-  UNABLE_TO_TURN_ALL_SENSOR_LEDS_OFF = DaqDeviceExceptionType.unableToTurnAllSensorLedsOff # type: ignore
-  UNABLE_TO_START_SENSOR_MEMORY_RECORDING = DaqDeviceExceptionType.unableToStartSensorMemoryRecording # type: ignore
-  UNABLE_TO_STOP_SENSOR_MEMORY_RECORDING = DaqDeviceExceptionType.unableToStopSensorMemoryRecording # type: ignore
-  UNABLE_TO_CLEAR_SENSOR_MEMORY = DaqDeviceExceptionType.unableToClearSensorMemory # type: ignore
-  UNABLE_TO_FORMAT_SENSOR_MEMORY = DaqDeviceExceptionType.unableToFormatSensorMemory # type: ignore
-  UNABLE_TO_START_SENSOR_MEMORY_READING = DaqDeviceExceptionType.unableToStartSensorMemoryReading # type: ignore
-  UNABLE_TO_START_SENSOR_SELECTIVE_MEMORY_READING = DaqDeviceExceptionType.unableToStartSensorSelectiveMemoryReading # type: ignore
-  UNABLE_TO_STOP_SENSOR_MEMORY_READING = DaqDeviceExceptionType.unableToStopSensorMemoryReading # type: ignore
-  UNABLE_TO_ENABLE_SENSOR_MEMORY_MODE = DaqDeviceExceptionType.unableToEnableSensorMemoryMode # type: ignore
-  UNABLE_TO_DISABLE_SENSOR_MEMORY_MODE = DaqDeviceExceptionType.unableToDisableSensorMemoryMode # type: ignore
-  UNABLE_TO_CALIBRATE_SENSOR_IMU = DaqDeviceExceptionType.unableToCalibrateSensorImu # type: ignore
-  UNABLE_TO_CALIBRATE_SENSOR_GYROSCOPE = DaqDeviceExceptionType.unableToCalibrateSensorGyroscope # type: ignore
-  UNABLE_TO_SAVE_MP_STATUS = DaqDeviceExceptionType.unableToSaveMPStatus # type: ignore
-  UNABLE_TO_GET_FIRMWARE_VERSION = DaqDeviceExceptionType.unableToGetFirmwareVersion # type: ignore
-  UNABLE_TO_GET_HARDWARE_VERSION = DaqDeviceExceptionType.unableToGetHardwareVersion # type: ignore
-  UNABLE_TO_SET_AUDIO_CONFIGURATION = DaqDeviceExceptionType.unableToSetAudioConfiguration # type: ignore
-  UNABLE_TO_GET_AUDIO_CONFIGURATION = DaqDeviceExceptionType.unableToGetAudioConfiguration # type: ignore
-  UNABLE_TO_CONVERT_PARAMETER = DaqDeviceExceptionType.unableToConvertParameter # type: ignore
-  UNABLE_TO_UPDATE_FIRMWARE = DaqDeviceExceptionType.unableToUpdateFirmware # type: ignore
-  UNABLE_TO_GET_FPGA_CONFIG_FLAG = DaqDeviceExceptionType.unableToGetFPGAConfigFlag # type: ignore
-  UNABLE_TO_UPDATE_DEVICE_BOARD_EEPROM_INFO = DaqDeviceExceptionType.unableToUpdateDeviceBoardEEPROMInfo # type: ignore
-  UNABLE_TO_GET_DEVICE_BOARD_EEPROM_INFO = DaqDeviceExceptionType.unableToGetDeviceBoardEEPROMInfo # type: ignore
-  UNABLE_TO_SYNCHRONIZE_DATA = DaqDeviceExceptionType.unableToSynchronizeData # type: ignore
-  UNABLE_TO_CHANGE_DEVICE_RF_CHANNEL = DaqDeviceExceptionType.unableToChangeDeviceRFChannel # type: ignore
-  UNABLE_TO_CHANGE_SENSOR_RF_CHANNEL = DaqDeviceExceptionType.unableToChangeSensorRFChannel # type: ignore
-  UNABLE_TO_GET_DEVICE_RF_CHANNEL = DaqDeviceExceptionType.unableToGetDeviceRFChannel # type: ignore
-  UNABLE_TO_SET_FIRST_IMU_CALIBRATION_STEP = DaqDeviceExceptionType.unableToSetFirstImuCalibrationStep # type: ignore
-  UNABLE_TO_SET_NEXT_IMU_CALIBRATION_STEP = DaqDeviceExceptionType.unableToSetNextImuCalibrationStep # type: ignore
-  UNABLE_TO_SET_IMU_ACQ_TYPE = DaqDeviceExceptionType.unableToSetIMUAcqType # type: ignore
-  UNABLE_TO_GET_DEVICE_DEPENDENT_FUNCT_AVAILABILITY = DaqDeviceExceptionType.unableToGetDeviceDependentFunctAvailability # type: ignore
-  UNABLE_TO_READ_SENSOR_INFO = DaqDeviceExceptionType.unableToReadSensorInfo # type: ignore
-
-
-class RFChannelEnum:
+  SUCCESS = 0, 'Success'
+  DEVICE_NOTCONNECTED = 1, 'DeviceNotConnected'
+  SENDING_COMMAND = 2, 'SendingCommand'
+  RECEIVING_COMMAND_REPLY = 3, 'ReceivingCommandReply'
+  DEVICE_ERROR_EXECUTING_COMMAND = 4, 'DeviceErrorExecutingCommand'
+  CONFIGURING_CAPTURE = 5, 'ConfiguringCapture'
+  WRONG_CAPTURE_CONFIGURATION_IMU_ACQ_TYPE = 6, 'WrongCaptureConfigurationImuAcqType'
+  WRONG_CAPTURE_CONFIGURATION_SAMPLING_RATE = 7, 'WrongCaptureConfigurationSamplingRate'
+  WRONG_CAPTURE_CONFIGURATION_SAMPLING_RATE_FROM_DEVICE = 8, 'WrongCaptureConfigurationSamplingRateFromDevice'
+  WRONG_CAPTURE_CONFIGURATION_DATA_AVAILABLE_EVENT_PERIOD = 9, 'WrongCaptureConfigurationDataAvailableEventPeriod'
+  WRONG_SENSOR_CONFIGURATION_ACCELEROMETER_FULL_SCALE = 10, 'WrongSensorConfigurationAccelerometerFullScale'
+  WRONG_SENSOR_CONFIGURATION_GYROSCOPE_FULL_SCALE = 11, 'WrongSensorConfigurationGyroscopeFullScale'
+  WRONG_SENSOR_CONFIGURATION_SENSOR_TYPE = 12, 'WrongSensorConfigurationSensorType'
+  WRONG_FOOT_SW_PROTOCOL = 13, 'WrongFootSwProtocol'
+  WRONG_DEVICE_TYPE_FROM_DEVICE = 14, 'WrongDeviceTypeFromDevice'
+  WRONG_SENSOR_NUMBER = 15, 'WrongSensorNumber'
+  WRONG_FOOT_SW_SENSOR_NUMBER = 16, 'WrongFootSwSensorNumber'
+  FOOT_SW_SENSOR_NOT_INSTALLED = 17, 'FootSwSensorNotInstalled'
+  READING_BACK_CAPTURE_CONFIGURATION_SAMPLING_RATE = 18, 'ReadingBackCaptureConfigurationSamplingRate'
+  READING_BACK_COMMUNICATION_TEST_DATA = 19, 'ReadingBackCommunicationTestData'
+  READING_BACK_SENSOR_COMMAND_BUFFER = 20, 'ReadingBackSensorCommandBuffer'
+  DATA_TRANSFER_THREADING_STARTING_TIMEOUT = 21, 'DataTransferThreadStartingTimeout'
+  ACTION_NOT_ALLOWED_IN_THE_CURRENT_DEVICE_STATE = 22, 'ActionNotAllowedInTheCurrentDeviceState'
+  ACTION_NOT_ALLOWED_IN_THE_CURRENT_DATA_TRANSFER_STATE = 23, 'ActionNotAllowedInTheCurrentDataTransferState'
+  WRONG_DEVICE_STATE = 24, 'WrongDeviceState'
+  WRONG_DEVICE_ACTION = 25, 'WrongDeviceAction'
+  TIMEOUT_EXECUTING_SENSOR_COMMAND = 26, 'TimeoutExecutingSensorCommand'
+  COMMAND_NOT_EXECUTED_BY_ALL_THE_SENSORS = 27, 'CommandNotExecutedByAllTheSensors'
+  WRONG_DAQ_TIMEOUT_VALUE = 28, 'WrongDaqTimeOutValue'
+  BAD_SENSOR_COMMUNICATION = 29, 'BadSensorCommunication'
+  SYNC_BUFFER1_OVERRUN = 30, 'SyncBuffer1Overrun'
+  SYNC_BUFFER2_OVERRUN = 31, 'SyncBuffer2Overrun'
+  IMU_CALIBRATION_NOT_AVAILABLE = 32, 'ImuCalibrationNotAvailable'
+
+
+@_net_enum('DaqDeviceExceptionType')
+class DaqDeviceExceptionTypeEnum(NetIntEnum):
+  DEVICE_NOT_CONNECTED = 0, 'deviceNotConnected'
+  UNABLE_TO_START_CAPTURE_DATA_TRANSFER = 1, 'unableToStartCaptureDataTransfer'
+  UNABLE_TO_START_IMPEDANCE_DATA_TRANSFER = 2, 'unableToStartImpedanceDataTransfer'
+  UNABLE_TO_START_CAPTURING = 3, 'unableToStartCapturing'
+  UNABLE_TO_STOP_CAPTURING = 4, 'unableToStopCapturing'
+  UNABLE_TO_READ_SENSOR_MEMORY_STATUS = 5, 'unableToReadSensorMemoryStatus'
+  UNABLE_TO_GET_CAPTURE_CONFIGURATION = 6, 'unableToGetCaptureConfiguration'
+  UNABLE_TO_SET_CAPTURE_CONFIGURATION = 7, 'unableToSetCaptureConfiguration'
+  UNABLE_TO_GET_INSTALLED_SENSORS = 8, 'unableToGetInstalledSensors'
+  UNABLE_TO_GET_DEVICE_TYPE = 9, 'unableToGetDeviceType'
+  UNABLE_TO_CONFIGURE_SENSOR = 10, 'unableToConfigureSensor'
+  UNABLE_TO_GET_SENSOR_CONFIGURATION = 11, 'unableToGetSensorConfiguration'
+  UNABLE_TO_TURN_INTERNAL_TRIGGER_OFF = 12, 'unableToTurnInternalTrigger_OFF'
+  UNABLE_TO_TURN_INTERNAL_TRIGGER_ON = 13, 'unableToTurnInternalTrigger_ON'
+  UNABLE_TO_ENABLE_SENSOR = 14, 'unableToEnableSensor'
+  UNABLE_TO_DISABLE_SENSOR = 15, 'unableToDisableSensor'
+  UNABLE_TO_ENABLE_FOOT_SW_SENSOR = 16, 'unableToEnableFootSwSensor'
+  UNABLE_TO_DISABLE_FOOT_SW_SENSOR = 17, 'unableToDisableFootSwSensor'
+  UNABLE_TO_DETECT_ACCELEROMETER_OFFSET = 18, 'unableToDetectAccelerometerOffset'
+  UNABLE_TO_CHECK_ELECTRODE_IMPEDANCE = 19, 'unableToCheckElectrodeImpedance'
+  UNABLE_TO_GET_ELECTRODE_IMPEDANCE_REPORT = 20, 'unableToGetElectrodeImpedanceReport'
+  UNABLE_TO_TURN_SENSOR_LED_ON = 21, 'unableToTurnSensorLedOn'
+  UNABLE_TO_TURN_FOOTSWSENSOR_LED_ON = 22, 'unableToTurnFootSwSensorLedOn'
+  UNABLE_TO_TURN_ALL_SENSOR_LEDS_ON = 23, 'unableToTurnAllSensorLedsOn'
+  UNABLE_TO_TURN_ALL_SENSOR_LEDS_OFF = 24, 'unableToTurnAllSensorLedsOff'
+  UNABLE_TO_START_SENSOR_MEMORY_RECORDING = 25, 'unableToStartSensorMemoryRecording'
+  UNABLE_TO_STOP_SENSOR_MEMORY_RECORDING = 26, 'unableToStopSensorMemoryRecording'
+  UNABLE_TO_CLEAR_SENSOR_MEMORY = 27, 'unableToClearSensorMemory'
+  UNABLE_TO_FORMAT_SENSOR_MEMORY = 28, 'unableToFormatSensorMemory'
+  UNABLE_TO_START_SENSOR_MEMORY_READING = 29, 'unableToStartSensorMemoryReading'
+  UNABLE_TO_START_SENSOR_SELECTIVE_MEMORY_READING = 30, 'unableToStartSensorSelectiveMemoryReading'
+  UNABLE_TO_STOP_SENSOR_MEMORY_READING = 31, 'unableToStopSensorMemoryReading'
+  UNABLE_TO_ENABLE_SENSOR_MEMORY_MODE = 32, 'unableToEnableSensorMemoryMode'
+  UNABLE_TO_DISABLE_SENSOR_MEMORY_MODE = 33, 'unableToDisableSensorMemoryMode'
+  UNABLE_TO_CALIBRATE_SENSOR_IMU = 34, 'unableToCalibrateSensorImu'
+  UNABLE_TO_CALIBRATE_SENSOR_GYROSCOPE = 35, 'unableToCalibrateSensorGyroscope'
+  UNABLE_TO_SAVE_MP_STATUS = 36, 'unableToSaveMPStatus'
+  UNABLE_TO_GET_FIRMWARE_VERSION = 37, 'unableToGetFirmwareVersion'
+  UNABLE_TO_GET_HARDWARE_VERSION = 38, 'unableToGetHardwareVersion'
+  UNABLE_TO_SET_AUDIO_CONFIGURATION = 39, 'unableToSetAudioConfiguration'
+  UNABLE_TO_GET_AUDIO_CONFIGURATION = 40, 'unableToGetAudioConfiguration'
+  UNABLE_TO_CONVERT_PARAMETER = 41, 'unableToConvertParameter'
+  UNABLE_TO_UPDATE_FIRMWARE = 42, 'unableToUpdateFirmware'
+  UNABLE_TO_GET_FPGA_CONFIG_FLAG = 43, 'unableToGetFPGAConfigFlag'
+  UNABLE_TO_UPDATE_DEVICE_BOARD_EEPROM_INFO = 44, 'unableToUpdateDeviceBoardEEPROMInfo'
+  UNABLE_TO_GET_DEVICE_BOARD_EEPROM_INFO = 45, 'unableToGetDeviceBoardEEPROMInfo'
+  UNABLE_TO_SYNCHRONIZE_DATA = 46, 'unableToSynchronizeData'
+  UNABLE_TO_CHANGE_DEVICE_RF_CHANNEL = 47, 'unableToChangeDeviceRFChannel'
+  UNABLE_TO_CHANGE_SENSOR_RF_CHANNEL = 48, 'unableToChangeSensorRFChannel'
+  UNABLE_TO_GET_DEVICE_RF_CHANNEL = 49, 'unableToGetDeviceRFChannel'
+  UNABLE_TO_SET_FIRST_IMU_CALIBRATION_STEP = 50, 'unableToSetFirstImuCalibrationStep'
+  UNABLE_TO_SET_NEXT_IMU_CALIBRATION_STEP = 51, 'unableToSetNextImuCalibrationStep'
+  UNABLE_TO_SET_IMU_ACQ_TYPE = 52, 'unableToSetIMUAcqType'
+  UNABLE_TO_GET_DEVICE_DEPENDENT_FUNCT_AVAILABILITY = 53, 'unableToGetDeviceDependentFunctAvailability'
+  UNABLE_TO_READ_SENSOR_INFO = 54, 'unableToReadSensorInfo'
+
+
+@_net_enum('RFChannel')
+class RFChannelEnum(NetIntEnum):
   """RF 信道枚举（映射 .NET `RFChannel`）。"""
-  RF_CHANNEL_0 = RFChannel.RFChannel_0 # type: ignore
-  RF_CHANNEL_1 = RFChannel.RFChannel_1 # type: ignore
-  RF_CHANNEL_2 = RFChannel.RFChannel_2 # type: ignore
-  RF_CHANNEL_3 = RFChannel.RFChannel_3 # type: ignore
-  RF_CHANNEL_4 = RFChannel.RFChannel_4 # type: ignore
-  RF_CHANNEL_5 = RFChannel.RFChannel_5 # type: ignore
-  RF_CHANNEL_6 = RFChannel.RFChannel_6 # type: ignore
-  RF_CHANNEL_7 = RFChannel.RFChannel_7 # type: ignore
-
-
-class SamplingRateEnum:
+  RF_CHANNEL_0 = 0, 'RFChannel_0'
+  RF_CHANNEL_1 = 1, 'RFChannel_1'
+  RF_CHANNEL_2 = 2, 'RFChannel_2'
+  RF_CHANNEL_3 = 3, 'RFChannel_3'
+  RF_CHANNEL_4 = 4, 'RFChannel_4'
+  RF_CHANNEL_5 = 5, 'RFChannel_5'
+  RF_CHANNEL_6 = 6, 'RFChannel_6'
+  RF_CHANNEL_7 = 7, 'RFChannel_7'
+
+
+@_net_enum('SamplingRate')
+class SamplingRateEnum(NetIntEnum):
   """采样率枚举（当前仅提供 2kHz）。"""
-  HZ_2000 = SamplingRate.Hz_2000 # type: ignore # 2 kHz
+  HZ_2000 = 0, 'Hz_2000' # 2 kHz
 
 
 # NOTE: Raw Gyro and Mag only available during the `RAW_DATA` scheme.
-class ImuAcqTypeEnum:
+@_net_enum('ImuAcqType')
+class ImuAcqTypeEnum(NetIntEnum):
   """IMU 采集模式（映射 .NET `ImuAcqType`）。"""
-  RAW_DATA = ImuAcqType.RawData # type: ignore 	# Raw IMU data at 284 Hz
-  FUSED_9DOF_142HZ = ImuAcqType.Fused9xData_142Hz # type: ignore 	# Quaternion from 9-DOF at 142 Hz 
-  FUSED_6DOF_284HZ = ImuAcqType.Fused6xData_284Hz # type: ignore 	# Quaternion from 6-DOF at 284 Hz
-  FUSED_9DOF_71HZ = ImuAcqType.Fused9xData_71Hz # type: ignore 	# Quaternion from 9-DOF at 71 Hz
-  FUSED_6DOF_142HZ = ImuAcqType.Fused6xData_142Hz # type: ignore 	# Quaternion from 6-DOF at 142 Hz
-  MIXED_6DOF_142HZ = ImuAcqType.Mixed6xData_142Hz # type: ignore 	# Quaternion from 6 DOF at 142 Hz and raw acc/gyr at 142 Hz + mag at 47 Hz 
+  RAW_DATA = 0, 'RawData' # Raw IMU data at 284 Hz
+  FUSED_9DOF_142HZ = 1, 'Fused9xData_142Hz' # Quaternion from 9-DOF at 142 Hz
+  FUSED_6DOF_284HZ = 2, 'Fused6xData_284Hz' # Quaternion from 6-DOF at 284 Hz
+  FUSED_9DOF_71HZ = 3, 'Fused9xData_71Hz' # Quaternion from 9-DOF at 71 Hz
+  FUSED_6DOF_142HZ = 4, 'Fused6xData_142Hz' # Quaternion from 6-DOF at 142 Hz
+  MIXED_6DOF_142HZ = 5, 'Mixed6xData_142Hz' # Quaternion from 6 DOF at 142 Hz and raw acc/gyr at 142 Hz + mag at 47 Hz
 
 
-class DataAvailableEventPeriodEnum:
+@_net_enum('DataAvailableEventPeriod')
+class DataAvailableEventPeriodEnum(NetIntEnum):
   """数据事件回调周期（毫秒）。"""
-  MS_100 = DataAvailableEventPeriod.ms_100 # type: ignore
-  MS_50 = DataAvailableEventPeriod.ms_50 # type: ignore
-  MS_25 = DataAvailableEventPeriod.ms_25 # type: ignore
-  MS_10 = DataAvailableEventPeriod.ms_10 # type: ignore
+  MS_100 = 0, 'ms_100'
+  MS_50 = 1, 'ms_50'
+  MS_25 = 2, 'ms_25'
+  MS_10 = 3, 'ms_10'
 
 
-class SensorTypeEnum:
+@_net_enum('SensorType', 'WaveplusLab.Shared.Definitions')
+class SensorTypeEnum(NetIntEnum):
   """传感器类型。"""
-  EMG_SENSOR = SensorType.EMG_SENSOR # type: ignore
-  INERTIAL_SENSOR = SensorType.INERTIAL_SENSOR # type: ignore
-  ANALOG_GP_SENSOR = SensorType.ANALOG_GP_SENSOR # type: ignore
-  FSW_SENSOR = SensorType.FSW_SENSOR # type: ignore
+  EMG_SENSOR = 0, 'EMG_SENSOR'
+  INERTIAL_SENSOR = 1, 'INERTIAL_SENSOR'
+  ANALOG_GP_SENSOR = 2, 'ANALOG_GP_SENSOR'
+  FSW_SENSOR = 3, 'FSW_SENSOR'
 
 
-class SensorStateEnum:
+class SensorStateEnum(IntEnum):
   """传感器电量状态等（按位/数值编码）。"""
   BAT_0 = 0x0000
   BAT_33 = 0x0001
@@ -208,32 +291,81 @@ class SensorStateEnum:
 
 
 # Gravitational field.
-class AccelerometerFullScaleEnum:
+@_net_enum('AccelerometerFullScale')
+class AccelerometerFullScaleEnum(NetIntEnum):
   """加速度计量程（g）。"""
-  G_2 = AccelerometerFullScale.g_2 # type: ignore
-  G_4 = AccelerometerFullScale.g_4 # type: ignore
-  G_8 = AccelerometerFullScale.g_8 # type: ignore
-  G_16 = AccelerometerFullScale.g_16 # type: ignore
+  G_2 = 0, 'g_2'
+  G_4 = 1, 'g_4'
+  G_8 = 2, 'g_8'
+  G_16 = 3, 'g_16'
 
 
 # Degree per second.
-class GyroscopeFullScaleEnum:
+@_net_enum('GyroscopeFullScale')
+class GyroscopeFullScaleEnum(NetIntEnum):
   """陀螺仪量程（度/秒）。"""
-  DPS_250 = GyroscopeFullScale.dps_250 # type: ignore
-  DPS_500 = GyroscopeFullScale.dps_500 # type: ignore
-  DPS_1000 = GyroscopeFullScale.dps_1000 # type: ignore
-  DPS_2000 = GyroscopeFullScale.dps_2000 # type: ignore
+  DPS_250 = 0, 'dps_250'
+  DPS_500 = 1, 'dps_500'
+  DPS_1000 = 2, 'dps_1000'
+  DPS_2000 = 3, 'dps_2000'
 
 
-class FootSwProtocolEnum:
+@_net_enum('FootSwProtocol')
+class FootSwProtocolEnum(NetIntEnum):
   """足底开关（FSW）协议模式。"""
-  FULL_FOOT = FootSwProtocol.FullFoot # type: ignore
-  HALF_FOOT = FootSwProtocol.HalfFoot # type: ignore
-  QUARTER_FOOT = FootSwProtocol.QuarterFoot # type: ignore
+  FULL_FOOT = 0, 'FullFoot'
+  HALF_FOOT = 1, 'HalfFoot'
+  QUARTER_FOOT = 2, 'QuarterFoot'
 
 
-class SensorCheckReportEnum:
+@_net_enum('SensorCheckReport')
+class SensorCheckReportEnum(NetIntEnum):
   """电极阻抗检测报告。"""
-  FAILED = SensorCheckReport.Failed # type: ignore
-  PASSED = SensorCheckReport.Passed # type: ignore
-  NOT_EXECUTED = SensorCheckReport.NotExecuted # type: ignore
+  FAILED = 0, 'Failed'
+  PASSED = 1, 'Passed'
+  NOT_EXECUTED = 2, 'NotExecuted'
+
+
+EMG_SAMPLING_RATE_HZ = 2000
+
+# 采样率枚举 -> EMG 采样率（Hz）。
+SAMPLING_RATES_HZ = {
+  SamplingRateEnum.HZ_2000: 2000,
+}
+
+# 数据事件周期枚举 -> 毫秒。
+EVENT_PERIODS_MS = {
+  DataAvailableEventPeriodEnum.MS_100: 100,
+  DataAvailableEventPeriodEnum.MS_50: 50,
+  DataAvailableEventPeriodEnum.MS_25: 25,
+  DataAvailableEventPeriodEnum.MS_10: 10,
+}
+
+# IMU 模式 -> (四元数, 加速度计/陀螺仪, 磁力计) 采样率（Hz），不产生的模态为 0。
+IMU_SAMPLING_RATES_HZ = {
+  ImuAcqTypeEnum.RAW_DATA: (0.0, 284.0, 284.0),
+  ImuAcqTypeEnum.FUSED_9DOF_142HZ: (142.0, 0.0, 0.0),
+  ImuAcqTypeEnum.FUSED_6DOF_284HZ: (284.0, 0.0, 0.0),
+  ImuAcqTypeEnum.FUSED_9DOF_71HZ: (71.0, 0.0, 0.0),
+  ImuAcqTypeEnum.FUSED_6DOF_142HZ: (142.0, 0.0, 0.0),
+  ImuAcqTypeEnum.MIXED_6DOF_142HZ: (142.0, 142.0, 142.0 / 3),
+}
+
+
+def get_event_period_ms(period: Any) -> int:
+  """将 `DataAvailableEventPeriodEnum`（或其成员名/.NET 值）解析为毫秒；数字原样视为毫秒。"""
+  if isinstance(period, (int, float)) and not isinstance(period, DataAvailableEventPeriodEnum):
+    return int(period)
+  return EVENT_PERIODS_MS[DataAvailableEventPeriodEnum.coerce(period)]
+
+
+def get_modality_rates(imu_acq_type: Any, sampling_rate: Any = SamplingRateEnum.HZ_2000) -> Dict[str, float]:
+  """返回给定 IMU 模式下各模态的采样率（Hz），不产生的模态为 0。"""
+  orientation, raw, magnetometer = IMU_SAMPLING_RATES_HZ[ImuAcqTypeEnum.coerce(imu_acq_type)]
+  return {
+    'emg': float(SAMPLING_RATES_HZ[SamplingRateEnum.coerce(sampling_rate)]),
+    'orientation': orientation,
+    'accelerometer': raw,
+    'gyroscope': raw,
+    'magnetometer': magnetometer,
+  }
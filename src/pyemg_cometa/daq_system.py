@@ -35,28 +35,18 @@ Cometa Waveplus 采集系统 Python 封装。
 """
 
 from typing import Any, Callable, Iterable
-import clr
-import os
-dir_path = os.path.dirname(__file__)
-
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSys')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSysInterface')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'CyUSB')) # type: ignore
-
 from .constants import DataAvailableEventPeriodEnum, RFChannelEnum
 from .constants import DeviceErrorEnum, DeviceStateEnum
-from .constants import SensorCheckReportEnum, SensorTypeEnum
+from .constants import SensorCheckReportEnum, SensorTypeEnum, to_net_value
 from .capture_configuration import CometaCaptureConfiguration
 from .device_dependent_functionalities import CometaDeviceDependentFunctionalities
 from .event_args import CometaDataAvailableEventArgs, CometaDeviceStateChangedEventArgs, CometaSensorMemoryDataAvailableEventArgs
 from .sensor_configuration import CometaSensorConfiguration
 from .version import CometaExtVersion, CometaVersion
 
-from Waveplus.DaqSys import * # type: ignore
-from Waveplus.DaqSysInterface import * # type: ignore
-from Waveplus.DaqSys.Definitions import * # type: ignore
-from Waveplus.DaqSys.Exceptions import * # type: ignore
-from CyUSB import * # type: ignore
+from ._dotnet import get_net_type
+
+DaqSystem = get_net_type('DaqSystem')
 
 
 class CometaDaqSystem(DaqSystem):  # type: ignore
@@ -71,15 +61,15 @@ class CometaDaqSystem(DaqSystem):  # type: ignore
   """
   def get_state(self) -> DeviceStateEnum:
     """获取当前设备状态。"""
-    return self.get_State()
+    return DeviceStateEnum.from_net(self.get_State())
 
   def get_initial_error(self) -> DeviceErrorEnum:
     """获取设备初始化时的错误码（若有）。"""
-    return self.get_InitialError()
+    return DeviceErrorEnum.from_net(self.get_InitialError())
   
   def get_type(self) -> Iterable[SensorTypeEnum]:
     """获取已安装传感器的类型集合。"""
-    return self.get_Type()
+    return [SensorTypeEnum.from_net(sensor_type) for sensor_type in self.get_Type()]
 
   def set_capture_configuration(self, capture_config: CometaCaptureConfiguration) -> None:
     """设置采集配置。"""
@@ -91,7 +81,7 @@ class CometaDaqSystem(DaqSystem):  # type: ignore
 
   def start_capturing(self, event_period: DataAvailableEventPeriodEnum) -> None:
     """按指定事件周期开始采集并触发 DataAvailable 事件。"""
-    self.StartCapturing(event_period)
+    self.StartCapturing(to_net_value(event_period))
 
   def stop_capturing(self) -> None:
     """停止采集。"""
@@ -155,7 +145,7 @@ class CometaDaqSystem(DaqSystem):  # type: ignore
 
   def check_impedance(self, sensor_id: int) -> Iterable[SensorCheckReportEnum]:
     """检测电极阻抗，返回报告结果。"""
-    return self.CheckElectrodeImpedance(sensor_id)
+    return [SensorCheckReportEnum.from_net(report) for report in self.CheckElectrodeImpedance(sensor_id)]
 
   def turn_led_on(self, sensor_id: int) -> None:
     """点亮指定 `sensor_id` 传感器的 LED。"""
@@ -211,15 +201,15 @@ class CometaDaqSystem(DaqSystem):  # type: ignore
 
   def get_master_device_rf_channel(self, device_id: int) -> RFChannelEnum:
     """读取主设备 RF 信道。"""
-    return self.DeviceRFChannel(device_id)
+    return RFChannelEnum.from_net(self.DeviceRFChannel(device_id))
 
   def set_master_device_rf_channel(self, channel: RFChannelEnum, device_id: int) -> None:
     """设置主设备 RF 信道。"""
-    self.ChangeDeviceRFChannel(channel, device_id)
+    self.ChangeDeviceRFChannel(to_net_value(channel), device_id)
 
   def set_semsor_rf_channel(self, channel: RFChannelEnum, device_id) -> None:
     """设置所有传感器 RF 信道。"""
-    self.ChangeSensorsRFChannel(channel, device_id)
+    self.ChangeSensorsRFChannel(to_net_value(channel), device_id)
 
   def write_sync_data(self, data: float, absolute_value: bool) -> None:
     """写入同步通道数据。
@@ -32,19 +32,9 @@
 接口进行薄封装。
 """
 
-import clr
-import os
-dir_path = os.path.dirname(__file__)
+from ._dotnet import get_net_type
 
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSys')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSysInterface')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'CyUSB')) # type: ignore
-
-from Waveplus.DaqSys import * # type: ignore
-from Waveplus.DaqSysInterface import * # type: ignore
-from Waveplus.DaqSys.Definitions import * # type: ignore
-from Waveplus.DaqSys.Exceptions import * # type: ignore
-from CyUSB import * # type: ignore
+DeviceDependentFunctionalities = get_net_type('DeviceDependentFunctionalities')
 
 
 # NOTE: properties accessible when DAQ is in 'Idle', 'Capturing' or 'ReadingSensorMemory' states. 
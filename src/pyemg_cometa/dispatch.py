@@ -0,0 +1,331 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+单委托、按优先级分发的数据回调。
+
+每个 `add_on_data_available_handler` 注册都会在 .NET 侧产生一次独立的委托调用，
+且各回调会重复从事件参数中拷贝同一批数组。`DataDispatcher` 只注册一个回调：
+每次事件将所需模态各提取一次，写入按形状复用的预分配缓冲区（SDK 的
+[通道][样本] 布局），再按优先级依次交给 Python 消费者。
+
+每个消费者有时间预算；连续超出预算的消费者会被自动移到后台通道，由单独的
+工作线程从预分配的帧环中处理，避免阻塞 SDK 回调线程。
+
+NOTE: 前台消费者收到的 `DispatchFrame` 及其数组在回调返回后会被下一次事件覆盖，
+需要保留时请自行拷贝；后台通道的帧在环写满一圈之前有效。
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import threading
+import time
+import numpy as np
+
+from .frame import FRAME_STREAMS, BufferCache, extract_stream
+
+
+class LaneEnum:
+  FOREGROUND = 'foreground' # 在 SDK 回调线程中同步执行
+  BACKGROUND = 'background' # 在后台工作线程中执行
+
+
+class DispatchFrame:
+  """一次事件的数据。`streams` 为 {数据流名: (通道, 样本[, 分量]) 数组}，仅包含非空数据流。"""
+  __slots__ = ('seq', 'scan_number', 'start_trigger_scan', 'stop_trigger_scan', 'streams', '_caches')
+
+  def __init__(self, names: Iterable[str]) -> None:
+    self.seq = -1
+    self.scan_number = 0
+    self.start_trigger_scan: Optional[int] = None
+    self.stop_trigger_scan: Optional[int] = None
+    self.streams: Dict[str, np.ndarray] = {}
+    self._caches = {name: BufferCache(FRAME_STREAMS[name][3]) for name in names}
+
+  def fill(self, seq: int, args: Any) -> None:
+    """从事件参数中将各数据流提取到复用的缓冲区。"""
+    self.seq = seq
+    self.scan_number = args.scan_number()
+    self.start_trigger_scan = args.start_trigger_scan() if args.is_start_trigger_detected() else None
+    self.stop_trigger_scan = args.stop_trigger_scan() if args.is_stop_trigger_detected() else None
+    streams = self.streams
+    streams.clear()
+    for name, cache in self._caches.items():
+      block = extract_stream(args, name, cache)
+      if block is not None:
+        streams[name] = block
+
+  def copy_from(self, other: 'DispatchFrame') -> None:
+    """将另一帧拷贝到本帧的缓冲区（供后台通道使用）。"""
+    self.seq = other.seq
+    self.scan_number = other.scan_number
+    self.start_trigger_scan = other.start_trigger_scan
+    self.stop_trigger_scan = other.stop_trigger_scan
+    streams = self.streams
+    streams.clear()
+    for name, block in other.streams.items():
+      out = self._caches[name].get(block.shape)
+      np.copyto(out, block)
+      streams[name] = out
+
+  def get_num_allocations(self) -> int:
+    """累计分配的缓冲区数量（稳态下应不再增长）。"""
+    return sum(cache.num_allocations for cache in self._caches.values())
+
+
+class _Consumer:
+  """已注册的消费者及其计时统计。"""
+  __slots__ = ('name', 'callback', 'priority', 'budget_ns', 'lane', 'pinned', 'calls', 'errors',
+               'overruns', 'strikes', 'total_ns', 'max_ns', 'last_error', 'last_seq')
+
+  def __init__(self, name: str, callback: Callable[[DispatchFrame], None], priority: int, budget_ns: Optional[int], lane: str, pinned: bool) -> None:
+    self.name = name
+    self.callback = callback
+    self.priority = priority
+    self.budget_ns = budget_ns
+    self.lane = lane
+    self.pinned = pinned
+    self.calls = 0
+    self.errors = 0
+    self.overruns = 0
+    self.strikes = 0
+    self.total_ns = 0
+    self.max_ns = 0
+    self.last_error: Optional[BaseException] = None
+    self.last_seq = -1
+
+  def invoke(self, frame: DispatchFrame) -> int:
+    self.last_seq = frame.seq
+    t0 = time.perf_counter_ns()
+    try:
+      self.callback(frame)
+    except Exception as e:
+      self.errors += 1
+      self.last_error = e
+    elapsed = time.perf_counter_ns() - t0
+    self.calls += 1
+    self.total_ns += elapsed
+    if elapsed > self.max_ns:
+      self.max_ns = elapsed
+    return elapsed
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      'priority': self.priority,
+      'lane': self.lane,
+      'budget_us': None if self.budget_ns is None else self.budget_ns / 1000,
+      'calls': self.calls,
+      'errors': self.errors,
+      'overruns': self.overruns,
+      'mean_us': self.total_ns / self.calls / 1000 if self.calls else None,
+      'max_us': self.max_ns / 1000,
+      'last_error': None if self.last_error is None else repr(self.last_error),
+    }
+
+
+class DataDispatcher:
+  """只向 SDK 注册一个数据回调，提取一次数据后按优先级分发给多个消费者。"""
+  def __init__(self,
+               daq: Any = None,
+               streams: Optional[Iterable[str]] = None,
+               budget_ms: Optional[float] = 1.0,
+               demote_after: int = 3,
+               background_queue_size: int = 64) -> None:
+    names = list(FRAME_STREAMS) if streams is None else list(streams)
+    for name in names:
+      if name not in FRAME_STREAMS:
+        raise ValueError("Unknown stream %r, expected one of %s" % (name, list(FRAME_STREAMS)))
+    self._frame = DispatchFrame(names)
+    self._default_budget_ns = None if budget_ms is None else int(budget_ms * 1e6)
+    self._demote_after = demote_after
+    self._lock = threading.Lock()
+    self._consumers: Dict[str, _Consumer] = {}
+    # NOTE: 两条通道的列表在修改时整体替换（写时复制），SDK 线程遍历时无需加锁。
+    self._foreground: List[_Consumer] = []
+    self._background: List[_Consumer] = []
+    self._seq = 0
+    self._dispatch_ns = 0
+    self._max_dispatch_ns = 0
+    self._ring = [DispatchFrame(names) for _ in range(background_queue_size)]
+    self._spare = DispatchFrame(names)
+    self._write_seq = 0
+    self._read_seq = 0
+    self._num_dropped = 0
+    self._cond = threading.Condition()
+    self._running = True
+    self._worker = threading.Thread(target=self._run_background, name='DataDispatcher-background', daemon=True)
+    self._worker.start()
+    self._daq = None
+    if daq is not None:
+      self.attach(daq)
+
+  def attach(self, daq: Any) -> None:
+    """在 `daq` 上注册唯一的数据回调。"""
+    daq.add_on_data_available_handler(self.on_data_available)
+    self._daq = daq
+
+  def detach(self) -> None:
+    """移除数据回调。"""
+    if self._daq is not None:
+      self._daq.remove_on_data_available_handler(self.on_data_available)
+      self._daq = None
+
+  # 消费者 -----------------------------------------------------------------
+
+  def add_consumer(self,
+                   callback: Callable[[DispatchFrame], None],
+                   priority: int = 0,
+                   name: Optional[str] = None,
+                   budget_ms: Any = 'default',
+                   lane: str = LaneEnum.FOREGROUND,
+                   pinned: bool = False) -> str:
+    """注册消费者，返回其名称。
+
+    `priority` 数值越小越先执行；`budget_ms=None` 表示不限时；`pinned=True`
+    的消费者超出预算也不会被移到后台通道。
+    """
+    if lane not in (LaneEnum.FOREGROUND, LaneEnum.BACKGROUND):
+      raise ValueError("Unknown lane %r" % lane)
+    name = name or getattr(callback, '__name__', 'consumer')
+    budget_ns = self._default_budget_ns if budget_ms == 'default' else (None if budget_ms is None else int(budget_ms * 1e6))
+    with self._lock:
+      if name in self._consumers:
+        raise ValueError("Consumer %r is already registered" % name)
+      self._consumers[name] = _Consumer(name, callback, priority, budget_ns, lane, pinned)
+      self._rebuild()
+    return name
+
+  def remove_consumer(self, name: str) -> None:
+    """注销消费者。"""
+    with self._lock:
+      del self._consumers[name]
+      self._rebuild()
+
+  def move_to_lane(self, name: str, lane: str) -> None:
+    """手动将消费者移到指定通道（如排查后移回前台）。"""
+    with self._lock:
+      consumer = self._consumers[name]
+      consumer.lane = lane
+      consumer.strikes = 0
+      self._rebuild()
+
+  def _rebuild(self) -> None:
+    consumers = sorted(self._consumers.values(), key=lambda c: c.priority)
+    self._foreground = [c for c in consumers if c.lane == LaneEnum.FOREGROUND]
+    self._background = [c for c in consumers if c.lane == LaneEnum.BACKGROUND]
+
+  # 分发 -------------------------------------------------------------------
+
+  def on_data_available(self, sender: Any, args: Any) -> None:
+    """数据回调：提取一次数据，依次调用前台消费者，并将帧交给后台通道。"""
+    t0 = time.perf_counter_ns()
+    frame = self._frame
+    frame.fill(self._seq, args)
+    self._seq += 1
+    # NOTE: 本次事件中被降级的消费者已在前台处理过该帧；若后台通道因此才有消费者，无需拷贝该帧。
+    has_background = bool(self._background)
+    demoted = None
+    for consumer in self._foreground:
+      elapsed = consumer.invoke(frame)
+      if consumer.budget_ns is not None and elapsed > consumer.budget_ns:
+        consumer.overruns += 1
+        consumer.strikes += 1
+        if not consumer.pinned and consumer.strikes >= self._demote_after:
+          demoted = (demoted or []) + [consumer]
+      else:
+        consumer.strikes = 0
+    if demoted:
+      with self._lock:
+        for consumer in demoted:
+          consumer.lane = LaneEnum.BACKGROUND
+        self._rebuild()
+    if has_background:
+      self._enqueue(frame)
+    elapsed = time.perf_counter_ns() - t0
+    self._dispatch_ns += elapsed
+    if elapsed > self._max_dispatch_ns:
+      self._max_dispatch_ns = elapsed
+
+  def _enqueue(self, frame: DispatchFrame) -> None:
+    with self._cond:
+      if self._write_seq - self._read_seq >= len(self._ring):
+        self._read_seq += 1 # 丢弃最旧的帧
+        self._num_dropped += 1
+      self._ring[self._write_seq % len(self._ring)].copy_from(frame)
+      self._write_seq += 1
+      self._cond.notify()
+
+  def _run_background(self) -> None:
+    frame = self._spare
+    while True:
+      with self._cond:
+        while self._running and self._read_seq == self._write_seq:
+          self._cond.wait()
+        if not self._running:
+          return
+        # NOTE: 与环中的槽交换帧对象而非拷贝，处理期间写端不会覆盖正在读取的数据。
+        idx = self._read_seq % len(self._ring)
+        frame, self._ring[idx] = self._ring[idx], frame
+        self._read_seq += 1
+      for consumer in self._background:
+        if frame.seq > consumer.last_seq: # 降级前已在前台处理过的帧不再重复
+          consumer.invoke(frame)
+
+  # 统计 -------------------------------------------------------------------
+
+  def get_num_dropped(self) -> int:
+    """后台通道因积压而丢弃的帧数。"""
+    return self._num_dropped
+
+  def get_consumer_stats(self) -> Dict[str, Dict[str, Any]]:
+    """各消费者的通道、调用次数、超时次数与耗时（微秒）。"""
+    return {name: consumer.to_dict() for name, consumer in list(self._consumers.items())}
+
+  def get_stats(self) -> Dict[str, Any]:
+    """分发统计：事件数、分发耗时（含前台消费者）、后台积压与缓冲区分配次数。"""
+    return {
+      'events': self._seq,
+      'mean_dispatch_us': self._dispatch_ns / self._seq / 1000 if self._seq else None,
+      'max_dispatch_us': self._max_dispatch_ns / 1000,
+      'background_backlog': self._write_seq - self._read_seq,
+      'background_dropped': self._num_dropped,
+      'buffer_allocations': self._frame.get_num_allocations(),
+      'consumers': self.get_consumer_stats(),
+    }
+
+  def close(self) -> None:
+    """移除数据回调并停止后台线程（未处理的后台帧被丢弃）。"""
+    self.detach()
+    with self._cond:
+      self._running = False
+      self._cond.notify()
+    self._worker.join()
+
+  def __enter__(self) -> 'DataDispatcher':
+    return self
+
+  def __exit__(self, *exc_info: Any) -> None:
+    self.close()
@@ -0,0 +1,232 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+实时 EMG 信号处理流水线（向量化、跨事件保持滤波器状态）。
+
+每个处理级一次处理形状为 (通道, 样本) 的二维块（即
+`get_emg_samples_as_numpy()` 的输出），所有通道同时计算：
+- `BandPassStage`/`HighPassStage`/`LowPassStage`/`NotchStage`：二阶节（SOS）IIR 滤波，
+  `sosfilt` 的 zi 状态跨事件保存，块边界无缝衔接；
+- `RectifyStage`：全波整流；
+- `EnvelopeStage`：整流 + 低通包络；
+- `MovingRmsStage`：滑动窗口 RMS（保存上一块的尾部样本）。
+
+处理级可用 `|` 串联为 `DspPipeline`，例如
+`pipeline = BandPassStage(20, 450) | NotchStage(50) | EnvelopeStage(6)`。
+滤波器系数按（采样率枚举, 参数）缓存，同一配置的多个实例共享系数。
+
+需要 SciPy：`pip install pysio-pyemg-cometa[dsp]`。
+"""
+
+from typing import Any, Iterable, List, Optional, Tuple
+import abc
+import functools
+import numpy as np
+
+from .constants import SAMPLING_RATES_HZ, SamplingRateEnum
+
+
+def _import_scipy_signal() -> Any:
+  try:
+    from scipy import signal
+  except ImportError as e:
+    raise ImportError("'scipy' is required for the DSP pipeline; install it with `pip install pysio-pyemg-cometa[dsp]`") from e
+  return signal
+
+
+def get_sampling_rate_hz(sampling_rate: Any) -> float:
+  """将 `SamplingRateEnum`（或其名称/.NET 值）转换为 Hz；数值原样返回。"""
+  if isinstance(sampling_rate, (int, float)) and not isinstance(sampling_rate, SamplingRateEnum):
+    return float(sampling_rate)
+  return float(SAMPLING_RATES_HZ[SamplingRateEnum.coerce(sampling_rate)])
+
+
+@functools.lru_cache(maxsize=None)
+def _design_sos(kind: str, sampling_rate: SamplingRateEnum, params: Tuple) -> np.ndarray:
+  signal = _import_scipy_signal()
+  fs = get_sampling_rate_hz(sampling_rate)
+  if kind == 'notch':
+    freq, q = params
+    b, a = signal.iirnotch(freq, q, fs=fs)
+    sos = signal.tf2sos(b, a)
+  else:
+    order, cutoff = params
+    sos = signal.butter(order, cutoff, btype=kind, output='sos', fs=fs)
+  sos = np.ascontiguousarray(sos, dtype=np.float64)
+  sos.flags.writeable = False
+  return sos
+
+
+def design_sos(kind: str, params: Tuple, sampling_rate: Any = SamplingRateEnum.HZ_2000) -> np.ndarray:
+  """返回缓存的 SOS 系数（只读）。
+
+  `kind` 为 'bandpass'/'highpass'/'lowpass'（`params=(order, cutoff)`）或
+  'notch'（`params=(freq, q)`）。
+  """
+  return _design_sos(kind, SamplingRateEnum.coerce(sampling_rate), tuple(params))
+
+
+class DspStage(abc.ABC):
+  """处理级基类。子类实现 `process(block)`，并在有状态时实现 `reset()`。"""
+  @abc.abstractmethod
+  def process(self, block: np.ndarray) -> np.ndarray:
+    ...
+
+  def reset(self) -> None:
+    """清除跨块状态（如重新开始采集时）。"""
+
+  def __call__(self, block: np.ndarray) -> np.ndarray:
+    return self.process(block)
+
+  def __or__(self, other: 'DspStage') -> 'DspPipeline':
+    return DspPipeline([self, other])
+
+
+class DspPipeline(DspStage):
+  """依次执行的处理级序列。"""
+  def __init__(self, stages: Iterable[DspStage] = ()) -> None:
+    self.stages = [] # type: List[DspStage]
+    for stage in stages:
+      self.stages.extend(stage.stages if isinstance(stage, DspPipeline) else [stage])
+
+  def process(self, block: np.ndarray) -> np.ndarray:
+    for stage in self.stages:
+      block = stage.process(block)
+    return block
+
+  def reset(self) -> None:
+    for stage in self.stages:
+      stage.reset()
+
+  def __or__(self, other: DspStage) -> 'DspPipeline':
+    return DspPipeline([self, other])
+
+
+class SosFilterStage(DspStage):
+  """通用 SOS IIR 滤波级，沿样本轴（最后一维）滤波，zi 状态跨块保存。
+
+  首个块使用 `sosfilt_zi` 按各通道首样本初始化状态，以避免起始瞬态。
+  """
+  def __init__(self, sos: np.ndarray, dtype: Any = np.float32) -> None:
+    self._signal = _import_scipy_signal()
+    self._sos = np.array(sos) # sosfilt 需要可写的系数数组；缓存中的系数为只读
+    self._dtype = np.dtype(dtype)
+    self._zi = None # type: Optional[np.ndarray]
+
+  def process(self, block: np.ndarray) -> np.ndarray:
+    block = np.asarray(block)
+    if block.shape[-1] == 0:
+      return block.astype(self._dtype, copy=False)
+    if self._zi is None or self._zi.shape[1:-1] != block.shape[:-1]:
+      zi = self._signal.sosfilt_zi(self._sos) # (n_sections, 2)
+      zi = zi.reshape((zi.shape[0],) + (1,) * (block.ndim - 1) + (2,))
+      self._zi = zi * block[..., :1].astype(np.float64)[np.newaxis]
+    out, self._zi = self._signal.sosfilt(self._sos, block, axis=-1, zi=self._zi)
+    return out.astype(self._dtype, copy=False)
+
+  def reset(self) -> None:
+    self._zi = None
+
+
+class BandPassStage(SosFilterStage):
+  """Butterworth 带通滤波（默认 20–450 Hz，4 阶）。"""
+  def __init__(self, low_hz: float = 20.0, high_hz: float = 450.0, order: int = 4,
+               sampling_rate: Any = SamplingRateEnum.HZ_2000, dtype: Any = np.float32) -> None:
+    super().__init__(design_sos('bandpass', (order, (low_hz, high_hz)), sampling_rate), dtype)
+
+
+class HighPassStage(SosFilterStage):
+  """Butterworth 高通滤波（默认 20 Hz，4 阶），用于去除运动伪迹与基线漂移。"""
+  def __init__(self, cutoff_hz: float = 20.0, order: int = 4,
+               sampling_rate: Any = SamplingRateEnum.HZ_2000, dtype: Any = np.float32) -> None:
+    super().__init__(design_sos('highpass', (order, cutoff_hz), sampling_rate), dtype)
+
+
+class LowPassStage(SosFilterStage):
+  """Butterworth 低通滤波。"""
+  def __init__(self, cutoff_hz: float, order: int = 4,
+               sampling_rate: Any = SamplingRateEnum.HZ_2000, dtype: Any = np.float32) -> None:
+    super().__init__(design_sos('lowpass', (order, cutoff_hz), sampling_rate), dtype)
+
+
+class NotchStage(SosFilterStage):
+  """工频陷波（默认 50 Hz，Q=30）。"""
+  def __init__(self, freq_hz: float = 50.0, q: float = 30.0,
+               sampling_rate: Any = SamplingRateEnum.HZ_2000, dtype: Any = np.float32) -> None:
+    super().__init__(design_sos('notch', (freq_hz, q), sampling_rate), dtype)
+
+
+class RectifyStage(DspStage):
+  """全波整流。"""
+  def process(self, block: np.ndarray) -> np.ndarray:
+    return np.abs(block)
+
+
+class EnvelopeStage(DspStage):
+  """线性包络：全波整流后低通滤波（默认 6 Hz，2 阶）。"""
+  def __init__(self, cutoff_hz: float = 6.0, order: int = 2,
+               sampling_rate: Any = SamplingRateEnum.HZ_2000, dtype: Any = np.float32) -> None:
+    self._lowpass = LowPassStage(cutoff_hz, order, sampling_rate, dtype)
+
+  def process(self, block: np.ndarray) -> np.ndarray:
+    return self._lowpass.process(np.abs(block))
+
+  def reset(self) -> None:
+    self._lowpass.reset()
+
+
+class MovingRmsStage(DspStage):
+  """滑动窗口 RMS，输出与输入逐样本对齐。
+
+  使用平方和的累积和计算；保存上一块末尾 `window - 1` 个样本，
+  因此块边界处的结果与整段离线计算一致（首个窗口未满时按已有样本计算）。
+  """
+  def __init__(self, window: int, dtype: Any = np.float32) -> None:
+    if window < 1:
+      raise ValueError("window must be >= 1")
+    self._window = window
+    self._dtype = np.dtype(dtype)
+    self._tail = None # type: Optional[np.ndarray]
+
+  def process(self, block: np.ndarray) -> np.ndarray:
+    block = np.asarray(block, dtype=np.float64)
+    num_samples = block.shape[-1]
+    if self._tail is None or self._tail.shape[:-1] != block.shape[:-1]:
+      self._tail = np.zeros(block.shape[:-1] + (0,))
+    x = np.concatenate((self._tail, block), axis=-1)
+    history = self._tail.shape[-1]
+    csum = np.cumsum(x * x, axis=-1)
+    csum = np.concatenate((np.zeros(block.shape[:-1] + (1,)), csum), axis=-1)
+    end = np.arange(history + 1, history + num_samples + 1)
+    start = np.maximum(end - self._window, 0)
+    out = np.sqrt(np.maximum(csum[..., end] - csum[..., start], 0.0) / (end - start))
+    self._tail = x[..., max(x.shape[-1] - (self._window - 1), 0):]
+    return out.astype(self._dtype, copy=False)
+
+  def reset(self) -> None:
+    self._tail = None
@@ -32,22 +32,18 @@
 属性访问方法，便于在回调中直接读取所需数据。
 """
 
-from typing import Iterable
-import clr
-import os
-dir_path = os.path.dirname(__file__)
-
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSys')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSysInterface')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'CyUSB')) # type: ignore
+from typing import Iterable, Optional
+import numpy as np
 
+from .arrays import to_numpy_1d, to_numpy_2d, to_numpy_3d
 from .constants import DeviceErrorEnum, DeviceStateEnum, SensorStateEnum
 
-from Waveplus.DaqSys import * # type: ignore
-from Waveplus.DaqSysInterface import * # type: ignore
-from Waveplus.DaqSys.Definitions import * # type: ignore
-from Waveplus.DaqSys.Exceptions import * # type: ignore
-from CyUSB import * # type: ignore
+from ._dotnet import get_net_type
+
+CommandProgressEventArgs = get_net_type('CommandProgressEventArgs')
+DeviceStateChangedEventArgs = get_net_type('DeviceStateChangedEventArgs')
+DataAvailableEventArgs = get_net_type('DataAvailableEventArgs')
+SensorMemoryDataAvailableEventArgs = get_net_type('SensorMemoryDataAvailableEventArgs')
 
 
 class CometaCommandProgressEventArgs(CommandProgressEventArgs):  # type: ignore
@@ -61,7 +57,7 @@ class CometaDeviceStateChangedEventArgs(DeviceStateChangedEventArgs):  # type: i
   """设备状态变化事件参数包装。"""
   def get_state(self) -> DeviceStateEnum:
     """返回新的设备状态。"""
-    return self.State
+    return DeviceStateEnum.from_net(self.State)
 
 
 class CometaDataAvailableEventArgs(DataAvailableEventArgs):  # type: ignore
@@ -110,6 +106,34 @@ class CometaDataAvailableEventArgs(DataAvailableEventArgs):  # type: ignore
     """FSW 传感器状态。"""
     return self.FootSwSensorStates
 
+  def get_emg_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """EMG 数据的连续 ndarray，形状 (通道, 样本)。"""
+    return to_numpy_2d(self.Samples, dtype, out)
+
+  def get_orientation_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """IMU 四元数的 ndarray，形状 (通道, 样本, 4)。"""
+    return to_numpy_3d(self.ImuSamples, 4, dtype, out)
+
+  def get_accelerometer_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """加速度计数据的 ndarray，形状 (通道, 样本, 3)。"""
+    return to_numpy_3d(self.AccelerometerSamples, 3, dtype, out)
+
+  def get_gyroscope_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """陀螺仪数据的 ndarray，形状 (通道, 样本, 3)。"""
+    return to_numpy_3d(self.GyroscopeSamples, 3, dtype, out)
+
+  def get_magnetometer_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """磁力计数据的 ndarray，形状 (通道, 样本, 3)。"""
+    return to_numpy_3d(self.MagnetometerSamples, 3, dtype, out)
+
+  def get_fsw_samples_as_numpy(self, dtype=np.int32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """FSW 样本的 ndarray，形状 (样本, 2)。"""
+    return to_numpy_2d(self.FootSwSamples, dtype, out)
+
+  def get_sync_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """同步通道数据的 ndarray，形状 (样本,)。"""
+    return to_numpy_1d(self.SyncSamples, dtype, out)
+
   def is_start_trigger_detected(self) -> bool:
     """是否检测到开始触发。"""
     return self.StartTriggerDetected
@@ -181,6 +205,30 @@ class CometaSensorMemoryDataAvailableEventArgs(SensorMemoryDataAvailableEventArg
     """FSW 传感器状态。"""
     return self.FootSwSensorStates
 
+  def get_emg_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """EMG 数据的连续 ndarray，形状 (通道, 样本)。"""
+    return to_numpy_2d(self.Samples, dtype, out)
+
+  def get_orientation_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """IMU 四元数的 ndarray，形状 (通道, 样本, 4)。"""
+    return to_numpy_3d(self.ImuSamples, 4, dtype, out)
+
+  def get_accelerometer_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """加速度计数据的 ndarray，形状 (通道, 样本, 3)。"""
+    return to_numpy_3d(self.AccelerometerSamples, 3, dtype, out)
+
+  def get_gyroscope_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """陀螺仪数据的 ndarray，形状 (通道, 样本, 3)。"""
+    return to_numpy_3d(self.GyroscopeSamples, 3, dtype, out)
+
+  def get_magnetometer_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """磁力计数据的 ndarray，形状 (通道, 样本, 3)。"""
+    return to_numpy_3d(self.MagnetometerSamples, 3, dtype, out)
+
+  def get_fsw_samples_as_numpy(self, dtype=np.int32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """FSW 样本的 ndarray，形状 (样本, 2)。"""
+    return to_numpy_2d(self.FootSwSamples, dtype, out)
+
   def is_trial_end(self) -> bool:
     """是否为试次/段落结束标记。"""
     return self.TrialEnd
@@ -211,7 +259,7 @@ class CometaSensorMemoryDataAvailableEventArgs(SensorMemoryDataAvailableEventArg
   
   def get_error_code(self) -> DeviceErrorEnum:
     """错误码（若发生错误）。"""
-    return self.ErrorCode
+    return DeviceErrorEnum.from_net(self.ErrorCode)
   
   def get_lost_packets(self) -> int:
     """总丢包计数。"""
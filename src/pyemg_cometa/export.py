@@ -0,0 +1,266 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+HDF5/Zarr 压缩分块导出。
+
+`Hdf5Exporter`/`ZarrExporter` 接收 `CometaDataAvailableEventArgs` 或
+`CometaSensorMemoryDataAvailableEventArgs`，将每个模态（EMG、四元数、
+加速度计、陀螺仪、磁力计、FSW、同步、传感器状态）写入独立的可扩展分块
+数据集，并使用 Blosc/LZ4 一类的压缩。
+
+分块长度按 “采样率 × 事件周期 × `events_per_chunk`” 计算；数据在内存中
+暂存到满一个分块后才整块追加，因此追加操作从不改写已写入的分块。会话
+元数据（采样率、`ImuAcqTypeEnum`、传感器类型）写入根属性。
+
+NOTE: `h5py`（Blosc 需 `hdf5plugin`）与 `zarr` 为可选依赖，仅在创建对应导出器时导入，
+可通过 `pip install pysio-pyemg-cometa[export]` 安装。
+"""
+
+from typing import Any, Dict, Optional, Tuple
+import abc
+import json
+import numpy as np
+
+from .constants import get_event_period_ms, get_modality_rates
+from .recorder import describe_capture_configuration, describe_sensor_configuration, extract_streams
+
+
+CODECS = ('lz4', 'zstd', 'blosclz', 'gzip', 'lzf', None)
+BLOSC_CODECS = ('lz4', 'zstd', 'blosclz')
+
+
+def _import_optional(name: str) -> Any:
+  try:
+    return __import__(name)
+  except ImportError as e:
+    raise ImportError("%r is required for this exporter; install it with `pip install pysio-pyemg-cometa[export]`" % name) from e
+
+
+class _ChunkedExporter(abc.ABC):
+  """按分块对齐暂存并追加各模态数据的导出器基类。"""
+  def __init__(self,
+               capture_configuration: Any = None,
+               sensor_configurations: Optional[Dict[int, Any]] = None,
+               event_period: Any = None,
+               events_per_chunk: int = 100,
+               codec: Optional[str] = 'lz4',
+               level: int = 5) -> None:
+    if codec not in CODECS:
+      raise ValueError("Unknown codec %r, expected one of %s" % (codec, CODECS))
+    self._codec = codec
+    self._level = level
+    self._events_per_chunk = events_per_chunk
+    self._period_s = get_event_period_ms(event_period) / 1000.0 if event_period is not None else None
+    capture = describe_capture_configuration(capture_configuration)
+    self._rates = {} # type: Dict[str, float]
+    if capture is not None:
+      self._rates = get_modality_rates(capture['imu_acq_type'], capture['sampling_rate'])
+    self._metadata = {
+      'capture_configuration': capture,
+      'sensor_configurations': {str(k): describe_sensor_configuration(v) for k, v in (sensor_configurations or {}).items()},
+      'rates_hz': self._rates,
+      'event_period_s': self._period_s,
+      'codec': codec,
+    }
+    self._staging = {} # type: Dict[str, Tuple[np.ndarray, int]]
+    self._chunk_lengths = {} # type: Dict[str, int]
+    self._num_samples = {} # type: Dict[str, int]
+    self._num_events = 0
+
+  def _stream_rate(self, name: str) -> float:
+    return self._rates.get('emg' if name in ('fsw', 'sync') else name, 0.0)
+
+  def _chunk_length(self, name: str, block: np.ndarray) -> int:
+    rate = self._stream_rate(name)
+    if rate > 0 and self._period_s is not None:
+      per_event = rate * self._period_s
+    else:
+      per_event = block.shape[0]
+    return max(1, int(round(per_event * self._events_per_chunk)))
+
+  def on_data_available(self, sender: Any, args: Any) -> None:
+    """在线数据回调（可直接传给 `add_on_data_available_handler`）。"""
+    self.append(extract_streams(args))
+
+  def on_sensor_memory_data_available(self, sender: Any, args: Any) -> None:
+    """内存数据回调（可直接传给 `add_on_sensor_memory_data_available_handler`）。"""
+    self.append(extract_streams(args))
+
+  def append(self, blocks: Dict[str, np.ndarray]) -> None:
+    """追加一个事件的样本主序数据块 {模态: (样本, ...)}。"""
+    for name, block in blocks.items():
+      if name not in self._staging:
+        chunk_len = self._chunk_length(name, block)
+        self._chunk_lengths[name] = chunk_len
+        self._num_samples[name] = 0
+        self._staging[name] = (np.empty((chunk_len,) + block.shape[1:], dtype=block.dtype), 0)
+        self._create(name, block.shape[1:], block.dtype, chunk_len, self._stream_rate(name))
+      buf, fill = self._staging[name]
+      pos = 0
+      while pos < block.shape[0]:
+        n = min(buf.shape[0] - fill, block.shape[0] - pos)
+        buf[fill:fill + n] = block[pos:pos + n]
+        fill += n
+        pos += n
+        if fill == buf.shape[0]:
+          self._append(name, buf)
+          self._num_samples[name] += fill
+          fill = 0
+      self._staging[name] = (buf, fill)
+    self._num_events += 1
+
+  def _flush(self) -> None:
+    """写出所有未满分块的暂存数据（最后一个分块可能不满）。"""
+    for name, (buf, fill) in self._staging.items():
+      if fill:
+        self._append(name, buf[:fill])
+        self._num_samples[name] += fill
+        self._staging[name] = (buf, 0)
+
+  def get_stats(self) -> Dict[str, Any]:
+    """返回事件数、各模态已写样本数与分块长度。"""
+    return {
+      'num_events': self._num_events,
+      'num_samples': dict(self._num_samples),
+      'chunk_lengths': dict(self._chunk_lengths),
+    }
+
+  def close(self) -> None:
+    """写出剩余数据、写入会话元数据并关闭文件。"""
+    self._flush()
+    self._metadata['num_events'] = self._num_events
+    self._set_attrs(self._metadata)
+    self._close()
+
+  def __enter__(self) -> '_ChunkedExporter':
+    return self
+
+  def __exit__(self, *exc_info: Any) -> None:
+    self.close()
+
+  @abc.abstractmethod
+  def _create(self, name: str, sample_shape: Tuple[int, ...], dtype: np.dtype, chunk_len: int, rate: float) -> None:
+    ...
+
+  @abc.abstractmethod
+  def _append(self, name: str, data: np.ndarray) -> None:
+    ...
+
+  @abc.abstractmethod
+  def _set_attrs(self, metadata: Dict[str, Any]) -> None:
+    ...
+
+  @abc.abstractmethod
+  def _close(self) -> None:
+    ...
+
+
+class Hdf5Exporter(_ChunkedExporter):
+  """导出到单个 HDF5 文件，每个模态一个可扩展数据集。
+
+  `codec` 为 lz4/zstd/blosclz 时需要 `hdf5plugin`；gzip/lzf 为 HDF5 内置。
+  """
+  def __init__(self, path: str, **kwargs: Any) -> None:
+    super().__init__(**kwargs)
+    h5py = _import_optional('h5py')
+    self._compression = {} # type: Dict[str, Any]
+    if self._codec in BLOSC_CODECS:
+      hdf5plugin = _import_optional('hdf5plugin')
+      self._compression = dict(hdf5plugin.Blosc(cname=self._codec, clevel=self._level, shuffle=hdf5plugin.Blosc.SHUFFLE))
+    elif self._codec == 'gzip':
+      self._compression = {'compression': 'gzip', 'compression_opts': self._level}
+    elif self._codec == 'lzf':
+      self._compression = {'compression': 'lzf'}
+    self._file = h5py.File(path, 'w')
+
+  def _create(self, name: str, sample_shape: Tuple[int, ...], dtype: np.dtype, chunk_len: int, rate: float) -> None:
+    dataset = self._file.create_dataset(name,
+                                        shape=(0,) + tuple(sample_shape),
+                                        maxshape=(None,) + tuple(sample_shape),
+                                        chunks=(chunk_len,) + tuple(sample_shape),
+                                        dtype=dtype,
+                                        **self._compression)
+    dataset.attrs['rate_hz'] = rate
+
+  def _append(self, name: str, data: np.ndarray) -> None:
+    dataset = self._file[name]
+    n = dataset.shape[0]
+    dataset.resize(n + data.shape[0], axis=0)
+    dataset[n:] = data
+
+  def _set_attrs(self, metadata: Dict[str, Any]) -> None:
+    for key, value in metadata.items():
+      self._file.attrs[key] = json.dumps(value)
+
+  def _close(self) -> None:
+    self._file.close()
+
+
+class ZarrExporter(_ChunkedExporter):
+  """导出到 Zarr 目录存储，每个模态一个可扩展数组（支持 zarr 2 与 3）。
+
+  `codec` 为 gzip/lzf 以外的值时使用 Blosc；`lzf` 不受 Zarr 支持。
+  """
+  def __init__(self, path: str, **kwargs: Any) -> None:
+    super().__init__(**kwargs)
+    if self._codec == 'lzf':
+      raise ValueError("Codec 'lzf' is not supported by Zarr")
+    zarr = _import_optional('zarr')
+    self._zarr = zarr
+    self._group = zarr.open_group(path, mode='w')
+
+  def _compressor_kwargs(self) -> Dict[str, Any]:
+    if self._codec is None:
+      return {'compressors': None} if hasattr(self._group, 'create_array') else {'compressor': None}
+    if hasattr(self._group, 'create_array'):
+      from zarr import codecs
+      if self._codec == 'gzip':
+        return {'compressors': [codecs.GzipCodec(level=self._level)]}
+      return {'compressors': [codecs.BloscCodec(cname=self._codec, clevel=self._level, shuffle='shuffle')]}
+    import numcodecs
+    if self._codec == 'gzip':
+      return {'compressor': numcodecs.GZip(level=self._level)}
+    return {'compressor': numcodecs.Blosc(cname=self._codec, clevel=self._level, shuffle=numcodecs.Blosc.SHUFFLE)}
+
+  def _create(self, name: str, sample_shape: Tuple[int, ...], dtype: np.dtype, chunk_len: int, rate: float) -> None:
+    create = getattr(self._group, 'create_array', None) or self._group.create_dataset
+    array = create(name,
+                   shape=(0,) + tuple(sample_shape),
+                   chunks=(chunk_len,) + tuple(sample_shape),
+                   dtype=dtype,
+                   **self._compressor_kwargs())
+    array.attrs['rate_hz'] = rate
+
+  def _append(self, name: str, data: np.ndarray) -> None:
+    self._group[name].append(data, axis=0)
+
+  def _set_attrs(self, metadata: Dict[str, Any]) -> None:
+    self._group.attrs.update(json.loads(json.dumps(metadata)))
+
+  def _close(self) -> None:
+    pass
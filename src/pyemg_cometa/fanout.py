@@ -0,0 +1,271 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+基于 `multiprocessing.shared_memory` 的多进程数据分发。
+
+采集进程中的 `SharedFramePublisher` 将每次 `DataAvailable` 的数据块写入
+共享内存环（按序号存放，附带 `scan_number()`）；解码、可视化、记录等
+进程通过共享内存名称创建 `SharedFrameSubscriber` 挂载，直接读取共享
+内存视图，无需 pickle 与队列拷贝。
+
+共享内存布局（均为 64 字节对齐）：
+- 头部：魔数、版本、槽数、通道数、每槽最大样本数、数据类型、写序号、订阅者上限
+- 订阅者表：每个订阅者的 (pid, 已读序号)，供发布者计算滞后
+- 槽元数据：(槽序号, scan_number, 样本数)
+- 槽数据：(槽数, 通道, 每槽最大样本数)
+
+NOTE: 每个槽采用序号锁（seqlock）：写入前清零槽序号，写完后再置为 `seq + 1`，
+读取方在读前/读后校验以检测被覆盖的数据。
+
+NOTE: 订阅者表项的占用由发布者的 `claim_lock`（`multiprocessing.Lock`）串行化；
+多个订阅者进程可能同时挂载时，应将其作为 `lock` 传给各 `SharedFrameSubscriber`，
+否则表项占用仅为尽力而为。
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from multiprocessing import shared_memory
+import contextlib
+import multiprocessing
+import os
+import numpy as np
+
+
+_MAGIC = 0x434F4D455441 # 'COMETA'
+_VERSION = 1
+_HEADER_FIELDS = 8
+_H_MAGIC, _H_VERSION, _H_SLOTS, _H_CHANNELS, _H_MAX_SAMPLES, _H_DTYPE, _H_WRITE_SEQ, _H_MAX_SUBSCRIBERS = range(_HEADER_FIELDS)
+_S_SEQ, _S_SCAN, _S_NUM_SAMPLES = range(3)
+_ALIGN = 64
+
+
+def _aligned(n: int) -> int:
+  return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class _Layout:
+  """根据头部参数计算共享内存中各区域的偏移与视图。"""
+  def __init__(self, buf: memoryview, slot_count: int, num_channels: int, max_samples: int, dtype: np.dtype, max_subscribers: int) -> None:
+    offset = _aligned(_HEADER_FIELDS * 8)
+    self.subscribers = np.ndarray((max_subscribers, 2), dtype=np.int64, buffer=buf, offset=offset)
+    offset += _aligned(self.subscribers.nbytes)
+    self.slots = np.ndarray((slot_count, 3), dtype=np.int64, buffer=buf, offset=offset)
+    offset += _aligned(self.slots.nbytes)
+    self.data = np.ndarray((slot_count, num_channels, max_samples), dtype=dtype, buffer=buf, offset=offset)
+
+  @staticmethod
+  def size(slot_count: int, num_channels: int, max_samples: int, dtype: np.dtype, max_subscribers: int) -> int:
+    return (_aligned(_HEADER_FIELDS * 8)
+            + _aligned(max_subscribers * 2 * 8)
+            + _aligned(slot_count * 3 * 8)
+            + slot_count * num_channels * max_samples * dtype.itemsize)
+
+
+class SharedFrame(NamedTuple):
+  """订阅者读到的一帧数据。`samples` 默认为共享内存视图，形状 (通道, 样本)。"""
+  seq: int
+  scan_number: int
+  samples: np.ndarray
+
+
+class SharedFramePublisher:
+  """在采集进程中创建共享内存环并发布数据块。"""
+  def __init__(self,
+               name: Optional[str],
+               num_channels: int,
+               max_samples: int,
+               slot_count: int = 256,
+               dtype: Any = np.float32,
+               max_subscribers: int = 16) -> None:
+    dtype = np.dtype(dtype)
+    size = _Layout.size(slot_count, num_channels, max_samples, dtype, max_subscribers)
+    self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=self._shm.buf)
+    self._header[:] = 0
+    self._layout = _Layout(self._shm.buf, slot_count, num_channels, max_samples, dtype, max_subscribers)
+    self._layout.subscribers[:] = 0
+    self._layout.slots[:] = 0
+    self._header[_H_SLOTS] = slot_count
+    self._header[_H_CHANNELS] = num_channels
+    self._header[_H_MAX_SAMPLES] = max_samples
+    self._header[_H_DTYPE] = ord(dtype.char)
+    self._header[_H_MAX_SUBSCRIBERS] = max_subscribers
+    self._header[_H_VERSION] = _VERSION
+    self._header[_H_MAGIC] = _MAGIC
+    self._slot_count = slot_count
+    self._seq = 0
+    self._claim_lock = multiprocessing.Lock()
+
+  @property
+  def name(self) -> str:
+    """共享内存名称，供订阅者挂载。"""
+    return self._shm.name
+
+  @property
+  def claim_lock(self) -> Any:
+    """串行化订阅者表项占用的锁，可随进程参数传给订阅者。"""
+    return self._claim_lock
+
+  def publish(self, block: np.ndarray, scan_number: int) -> int:
+    """写入形状为 (通道, 样本) 的数据块，返回其序号。"""
+    n = block.shape[1]
+    if block.shape[0] != self._layout.data.shape[1] or n > self._layout.data.shape[2]:
+      raise ValueError("Block of shape %s does not fit slot shape %s" % (block.shape, self._layout.data.shape[1:]))
+    seq = self._seq
+    idx = seq % self._slot_count
+    slot = self._layout.slots[idx]
+    slot[_S_SEQ] = 0
+    self._layout.data[idx, :, :n] = block
+    slot[_S_SCAN] = scan_number
+    slot[_S_NUM_SAMPLES] = n
+    slot[_S_SEQ] = seq + 1
+    self._seq = seq + 1
+    self._header[_H_WRITE_SEQ] = self._seq
+    return seq
+
+  def get_subscriber_lags(self) -> Dict[int, int]:
+    """返回 {pid: 滞后帧数}，仅包含已挂载的订阅者。"""
+    lags = {}
+    for pid, read_seq in self._layout.subscribers:
+      if pid:
+        lags[int(pid)] = self._seq - int(read_seq)
+    return lags
+
+  def get_slow_subscribers(self, max_lag: Optional[int] = None) -> List[int]:
+    """返回滞后超过 `max_lag`（默认半个环）的订阅者 pid。"""
+    if max_lag is None:
+      max_lag = self._slot_count // 2
+    return [pid for pid, lag in self.get_subscriber_lags().items() if lag > max_lag]
+
+  def close(self, unlink: bool = True) -> None:
+    """关闭并（默认）删除共享内存。"""
+    del self._header, self._layout
+    self._shm.close()
+    if unlink:
+      self._shm.unlink()
+
+
+class SharedFrameSubscriber:
+  """在消费进程中按名称挂载发布者的共享内存环。
+
+  `lock` 为发布者的 `claim_lock`，用于与其他订阅者互斥地占用订阅者表项。
+  """
+  def __init__(self, name: str, start_at_latest: bool = True, lock: Any = None) -> None:
+    try:
+      # NOTE: Python 3.13+ 允许订阅者不注册到 resource_tracker，避免退出时误删共享内存。
+      self._shm = shared_memory.SharedMemory(name=name, create=False, track=False)
+    except TypeError:
+      self._shm = shared_memory.SharedMemory(name=name, create=False)
+    self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=self._shm.buf)
+    if self._header[_H_MAGIC] != _MAGIC or self._header[_H_VERSION] != _VERSION:
+      self._shm.close()
+      raise ValueError("Shared memory %r is not a frame ring" % name)
+    self._slot_count = int(self._header[_H_SLOTS])
+    self._layout = _Layout(self._shm.buf,
+                           self._slot_count,
+                           int(self._header[_H_CHANNELS]),
+                           int(self._header[_H_MAX_SAMPLES]),
+                           np.dtype(chr(int(self._header[_H_DTYPE]))),
+                           int(self._header[_H_MAX_SUBSCRIBERS]))
+    self._next_seq = int(self._header[_H_WRITE_SEQ]) if start_at_latest else 0
+    self._num_missed = 0
+    self._entry = self._claim_entry(lock)
+
+  def _claim_entry(self, lock: Any) -> Optional[np.ndarray]:
+    """在订阅者表中占用一个空位（表满时不上报滞后）。"""
+    pid = os.getpid()
+    with lock if lock is not None else contextlib.nullcontext():
+      for entry in self._layout.subscribers:
+        if entry[0] == 0:
+          entry[1] = self._next_seq
+          entry[0] = pid
+          return entry
+    return None
+
+  def lag(self) -> int:
+    """尚未读取的帧数。"""
+    return int(self._header[_H_WRITE_SEQ]) - self._next_seq
+
+  def get_num_missed(self) -> int:
+    """因消费过慢被覆盖而跳过的帧数。"""
+    return self._num_missed
+
+  def read(self, copy: bool = False) -> Optional[SharedFrame]:
+    """读取下一帧；无新数据时返回 None。
+
+    `copy=False` 时返回共享内存视图，在发布者写满一圈（`slot_count` 帧）
+    之前有效，可用 `is_valid()` 校验。
+    """
+    while True:
+      write_seq = int(self._header[_H_WRITE_SEQ])
+      if self._next_seq >= write_seq:
+        return None
+      oldest = write_seq - self._slot_count
+      if self._next_seq < oldest:
+        self._num_missed += oldest - self._next_seq
+        self._next_seq = oldest
+      seq = self._next_seq
+      idx = seq % self._slot_count
+      slot = self._layout.slots[idx]
+      if slot[_S_SEQ] != seq + 1:
+        self._next_seq += 1
+        self._num_missed += 1
+        continue
+      scan_number = int(slot[_S_SCAN])
+      samples = self._layout.data[idx, :, :int(slot[_S_NUM_SAMPLES])]
+      if copy:
+        samples = samples.copy()
+      if slot[_S_SEQ] != seq + 1:
+        self._next_seq += 1
+        self._num_missed += 1
+        continue
+      self._next_seq = seq + 1
+      if self._entry is not None:
+        self._entry[1] = self._next_seq
+      return SharedFrame(seq, scan_number, samples)
+
+  def is_valid(self, frame: SharedFrame) -> bool:
+    """该帧对应的槽是否仍未被发布者覆盖。"""
+    return self._layout.slots[frame.seq % self._slot_count][_S_SEQ] == frame.seq + 1
+
+  def close(self) -> None:
+    """释放订阅者表项并断开共享内存。"""
+    if self._entry is not None:
+      self._entry[0] = 0
+    del self._header, self._layout, self._entry
+    self._shm.close()
+
+
+def make_data_available_handler(publisher: SharedFramePublisher,
+                                extract: Optional[Callable[[Any], np.ndarray]] = None) -> Callable[[Any, Any], None]:
+  """构造可传给 `CometaDaqSystem.add_on_data_available_handler` 的发布回调。"""
+  if extract is None:
+    extract = lambda args: args.get_emg_samples_as_numpy()
+
+  def on_data_available(sender: Any, args: Any) -> None:
+    publisher.publish(extract(args), args.scan_number())
+  return on_data_available
@@ -0,0 +1,268 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+滑动窗口 EMG 特征提取（增量计算）。
+
+`FeatureExtractor` 逐块消费 (通道, 样本) 形状的 EMG 数据，按窗口长度 `window`
+与步长 `hop` 输出特征向量：
+- 时域特征 MAV、RMS、WL、ZC、SSC 以及 Hjorth 参数（activity/mobility/complexity）
+  基于逐样本贡献的累积和计算，每个新样本只参与一次运算（O(1)/样本），
+  窗口值为两个累积和之差；
+- 频域特征 MNF（平均频率）、MDF（中值频率）对本块内所有输出窗口与所有通道
+  一次性批量做加窗 `rfft`。
+
+`get_latency_stats()` 返回每块处理耗时的统计，用于检查控制回路的时延预算。
+"""
+
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .constants import EMG_SAMPLING_RATE_HZ
+
+
+# 可选特征（按输出顺序）。
+FEATURES = ('mav', 'rms', 'wl', 'zc', 'ssc', 'mnf', 'mdf', 'activity', 'mobility', 'complexity')
+SPECTRAL_FEATURES = ('mnf', 'mdf')
+HJORTH_FEATURES = ('activity', 'mobility', 'complexity')
+
+# 累积和的行：|x|、x^2、|dx|、ZC、SSC、x、dx、dx^2、ddx、ddx^2
+_SUM_ABS, _SUM_SQ, _SUM_WL, _SUM_ZC, _SUM_SSC, _SUM_X, _SUM_DX, _SUM_DX2, _SUM_DDX, _SUM_DDX2 = range(10)
+_NUM_SUMS = 10
+# 各累积和在窗口起点处的偏移：一阶差分（及 ZC）的首项跨越窗口左边界，窗口内只有 w-1 个；
+# SSC 与二阶差分需要连续三个样本，窗口内只有 w-2 个。
+_WINDOW_OFFSETS = np.array([0, 0, 1, 1, 2, 0, 1, 1, 2, 2])
+
+
+class FeatureBatch(NamedTuple):
+  """一次 `process()` 输出的特征。
+
+  - sample_index: 每个窗口末样本之后的样本计数（自开始起），形状 (窗口数,)
+  - features: 形状 (窗口数, 通道, 特征数)，特征顺序见 `FeatureExtractor.feature_names`
+  """
+  sample_index: np.ndarray
+  features: np.ndarray
+
+
+class FeatureExtractor:
+  """按窗口/步长增量输出 EMG 特征。
+
+  参数：
+  - num_channels: 通道数。
+  - window: 窗口长度（样本），默认 200（2 kHz 下 100 ms）。
+  - hop: 输出步长（样本），默认 50。
+  - features: 需要计算的特征名（见 `FEATURES`），默认全部。
+  - threshold: ZC/SSC 的幅值阈值，抑制噪声引起的计数。
+  - sampling_rate: 采样率（Hz），用于频域特征。
+  - dtype: 输出特征的数据类型。
+  - latency_history: 保留最近多少次处理耗时用于统计。
+  """
+  def __init__(self,
+               num_channels: int,
+               window: int = 200,
+               hop: int = 50,
+               features: Optional[Iterable[str]] = None,
+               threshold: float = 0.0,
+               sampling_rate: float = EMG_SAMPLING_RATE_HZ,
+               dtype: Any = np.float32,
+               latency_history: int = 4096) -> None:
+    if window < 3 or hop < 1:
+      raise ValueError("window must be >= 3 and hop >= 1")
+    features = tuple(features) if features is not None else FEATURES
+    unknown = set(features) - set(FEATURES)
+    if unknown:
+      raise ValueError("Unknown features: %s" % ', '.join(sorted(unknown)))
+    self._num_channels = num_channels
+    self._window = window
+    self._hop = hop
+    self._features = features
+    self._threshold = threshold
+    self._dtype = np.dtype(dtype)
+    self._spectral = any(f in SPECTRAL_FEATURES for f in features)
+    if self._spectral:
+      self._taper = np.hanning(window)
+      self._freqs = np.fft.rfftfreq(window, 1.0 / sampling_rate)
+    self._latency = np.zeros(latency_history)
+    self._num_blocks = 0
+    self.reset()
+
+  @property
+  def feature_names(self) -> Tuple[str, ...]:
+    return self._features
+
+  @property
+  def window(self) -> int:
+    return self._window
+
+  @property
+  def hop(self) -> int:
+    return self._hop
+
+  def reset(self) -> None:
+    """清除窗口历史（如重新开始采集时）。"""
+    self._num_samples = 0
+    # 累积和历史：最近 window+1 个值，以最旧值为基准（避免长时间运行的精度损失）。
+    self._csum = np.zeros((_NUM_SUMS, self._num_channels, 1))
+    # 原始样本历史：最近 window 个样本（频域特征与差分所需）。
+    self._raw = np.zeros((self._num_channels, 0))
+
+  def process(self, block: np.ndarray) -> FeatureBatch:
+    """消费一个 (通道, 样本) 块，返回本块内完成的所有窗口的特征。"""
+    t0 = time.perf_counter()
+    block = np.asarray(block, dtype=np.float64)
+    n = block.shape[1]
+    if n == 0:
+      # NOTE: 空块不产生窗口；若继续处理，首块时的累积和基准会被截为零长度。
+      return FeatureBatch(np.empty(0, dtype=np.int64), np.empty((0, self._num_channels, len(self._features)), dtype=self._dtype))
+    prev = self._raw[:, -2:]
+    x = np.concatenate((prev, block), axis=1)
+    history = prev.shape[1]
+
+    # 逐样本贡献（仅对新样本计算）。
+    dx = np.diff(x, axis=1)
+    contrib = np.zeros((_NUM_SUMS, self._num_channels, n))
+    contrib[_SUM_ABS] = np.abs(block)
+    contrib[_SUM_SQ] = block * block
+    contrib[_SUM_X] = block
+    if history >= 1:
+      d = dx[:, history - 1:]
+    else:
+      d = np.concatenate((np.zeros((self._num_channels, 1)), dx), axis=1)
+    contrib[_SUM_WL] = np.abs(d)
+    contrib[_SUM_DX] = d
+    contrib[_SUM_DX2] = d * d
+    xp = x[:, history - 1:-1] if history >= 1 else np.concatenate((block[:, :1], block[:, :-1]), axis=1)
+    contrib[_SUM_ZC] = (block * xp < 0) & (np.abs(d) >= self._threshold)
+    dp = np.concatenate((np.zeros((self._num_channels, 1)), d[:, :-1]), axis=1)
+    if history >= 2:
+      dp[:, 0] = dx[:, history - 2]
+    contrib[_SUM_SSC] = (dp * d < 0) & ((np.abs(dp) >= self._threshold) | (np.abs(d) >= self._threshold))
+    dd = d - dp
+    contrib[_SUM_DDX] = dd
+    contrib[_SUM_DDX2] = dd * dd
+
+    csum = np.concatenate((self._csum, self._csum[..., -1:] + np.cumsum(contrib, axis=2)), axis=2)
+    base = self._num_samples - (self._csum.shape[2] - 1) # csum[..., i] 对应样本计数 base + i
+
+    # 本块内完成的窗口：末端样本计数 e 满足 e >= window 且 (e - window) % hop == 0。
+    start = self._num_samples + 1
+    end = self._num_samples + n
+    first = max(start, self._window)
+    first += (-(first - self._window)) % self._hop
+    ends = np.arange(first, end + 1, self._hop)
+    raw = np.concatenate((self._raw, block), axis=1)
+    if ends.size:
+      out = self._compute(csum, base, raw, self._num_samples - self._raw.shape[1], ends)
+    else:
+      out = np.empty((0, self._num_channels, len(self._features)), dtype=self._dtype)
+
+    self._num_samples = end
+    keep = min(self._window + 1, csum.shape[2])
+    self._csum = csum[..., -keep:] - csum[..., -keep:-keep + 1]
+    self._raw = raw[:, -self._window:]
+    self._latency[self._num_blocks % self._latency.size] = time.perf_counter() - t0
+    self._num_blocks += 1
+    return FeatureBatch(ends, out)
+
+  def _compute(self, csum: np.ndarray, base: int, raw: np.ndarray, raw_base: int, ends: np.ndarray) -> np.ndarray:
+    w = self._window
+    starts = ends - w - base + _WINDOW_OFFSETS[:, None] # (sums, 窗口数)
+    starts = np.broadcast_to(starts[:, None, :], (_NUM_SUMS, self._num_channels, ends.size))
+    sums = csum[..., ends - base] - np.take_along_axis(csum, starts, axis=2) # (sums, 通道, 窗口数)
+    sums = np.moveaxis(sums, 2, 0) # (窗口数, sums, 通道)
+    out = np.empty((ends.size, self._num_channels, len(self._features)), dtype=self._dtype)
+    hjorth = None
+    spectral = None
+    for i, name in enumerate(self._features):
+      if name == 'mav':
+        out[..., i] = sums[:, _SUM_ABS] / w
+      elif name == 'rms':
+        out[..., i] = np.sqrt(np.maximum(sums[:, _SUM_SQ], 0.0) / w)
+      elif name == 'wl':
+        out[..., i] = sums[:, _SUM_WL]
+      elif name == 'zc':
+        out[..., i] = np.rint(sums[:, _SUM_ZC])
+      elif name == 'ssc':
+        out[..., i] = np.rint(sums[:, _SUM_SSC])
+      elif name in HJORTH_FEATURES:
+        if hjorth is None:
+          hjorth = self._hjorth(sums)
+        out[..., i] = hjorth[HJORTH_FEATURES.index(name)]
+      else:
+        if spectral is None:
+          spectral = self._spectrum(raw, raw_base, ends)
+        out[..., i] = spectral[SPECTRAL_FEATURES.index(name)]
+    return out
+
+  def _hjorth(self, sums: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    w = self._window
+    var_x = np.maximum(sums[:, _SUM_SQ] / w - (sums[:, _SUM_X] / w) ** 2, 0.0)
+    var_dx = np.maximum(sums[:, _SUM_DX2] / (w - 1) - (sums[:, _SUM_DX] / (w - 1)) ** 2, 0.0)
+    var_ddx = np.maximum(sums[:, _SUM_DDX2] / (w - 2) - (sums[:, _SUM_DDX] / (w - 2)) ** 2, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+      mobility = np.sqrt(var_dx / var_x)
+      complexity = np.sqrt(var_ddx / var_dx) / mobility
+    return var_x, np.nan_to_num(mobility), np.nan_to_num(complexity)
+
+  def _spectrum(self, raw: np.ndarray, raw_base: int, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # 批量取出所有窗口：(通道, 窗口数, window) -> (窗口数, 通道, window)
+    frames = sliding_window_view(raw, self._window, axis=1)[:, ends - self._window - raw_base]
+    frames = np.swapaxes(frames, 0, 1)
+    frames = (frames - frames.mean(axis=-1, keepdims=True)) * self._taper
+    power = np.abs(np.fft.rfft(frames, axis=-1)) ** 2
+    total = power.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+      mnf = np.nan_to_num((power * self._freqs).sum(axis=-1) / total)
+    cumulative = np.cumsum(power, axis=-1)
+    mdf = self._freqs[np.argmax(cumulative >= 0.5 * cumulative[..., -1:], axis=-1)]
+    return mnf, mdf
+
+  def get_latency_stats(self) -> Dict[str, float]:
+    """最近若干块的处理耗时统计（毫秒）。"""
+    n = min(self._num_blocks, self._latency.size)
+    if n == 0:
+      return {'num_blocks': 0, 'mean_ms': 0.0, 'median_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    latency = self._latency[:n] * 1e3
+    return {
+      'num_blocks': self._num_blocks,
+      'mean_ms': float(latency.mean()),
+      'median_ms': float(np.median(latency)),
+      'p99_ms': float(np.percentile(latency, 99)),
+      'max_ms': float(latency.max()),
+    }
+
+
+def make_data_available_handler(extractor: FeatureExtractor,
+                                on_features: Callable[[FeatureBatch], None]) -> Callable[[Any, Any], None]:
+  """返回可直接注册到 `add_on_data_available_handler` 的回调：提取 EMG 块并在有新窗口时调用 `on_features`。"""
+  def on_data_available(sender: Any, args: Any) -> None:
+    batch = extractor.process(args.get_emg_samples_as_numpy(np.float64))
+    if batch.sample_index.size:
+      on_features(batch)
+  return on_data_available
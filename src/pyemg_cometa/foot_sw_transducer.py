@@ -31,19 +31,10 @@
 提供对 A/1/5/T 四个部位的启用状态与阈值的读写封装。
 """
 
-import clr
-import os
-dir_path = os.path.dirname(__file__)
-
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSys')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSysInterface')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'CyUSB')) # type: ignore
-
-from Waveplus.DaqSys import * # type: ignore
-from Waveplus.DaqSysInterface import * # type: ignore
-from Waveplus.DaqSys.Definitions import * # type: ignore
-from Waveplus.DaqSys.Exceptions import * # type: ignore
-from CyUSB import * # type: ignore
+from ._dotnet import get_net_type
+
+FootSwTransducerEnabled = get_net_type('FootSwTransducerEnabled')
+FootSwTransducerThreshold = get_net_type('FootSwTransducerThreshold')
 
 
 class CometaFootSwTransducerEnabled(FootSwTransducerEnabled):  # type: ignore
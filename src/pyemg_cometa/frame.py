@@ -0,0 +1,238 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+列式事件帧。
+
+一次回调中通常要调用 10 余个事件参数 getter，每次都是一次 pythonnet 属性访问，
+四元数与三轴数据还会产生逐样本的 Python 元组。`FrameBuilder` 每个事件只做一次
+提取，得到 `EventFrame`：所有存在的模态均为类型化的连续数组（SDK 的 [通道][样本]
+布局），另含扫描序号、触发、传输速率与丢包计数，消费者通过属性直接访问，
+不再经过互操作层。
+
+给定 `ImuAcqTypeEnum` 时，该模式不产生的模态（如 FUSED 模式下的加速度计与传感器状态）
+完全不调用其 getter，对应属性为 None。
+"""
+
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import numpy as np
+
+from .arrays import to_numpy_1d, to_numpy_2d, to_numpy_3d
+from .constants import IMU_SAMPLING_RATES_HZ, ImuAcqTypeEnum
+
+
+# 数据流名 -> (事件参数原始 getter, 维数, 分量宽度, 数据类型)。布局与 `recorder.extract_raw_streams` 一致。
+FRAME_STREAMS = {
+  'emg': ('get_emg_samples', 2, None, np.float32),
+  'orientation': ('get_orientation_samples', 3, 4, np.float32),
+  'accelerometer': ('get_accelerometer_samples', 3, 3, np.float32),
+  'gyroscope': ('get_gyroscope_samples', 3, 3, np.float32),
+  'magnetometer': ('get_magnetometer_samples', 3, 3, np.float32),
+  'sensor_states': ('get_sensor_states', 2, None, np.int16),
+  'fsw': ('get_fsw_samples', 2, None, np.int32),
+  'sync': ('get_sync_samples', 1, None, np.float32),
+}
+
+
+def get_frame_streams(imu_acq_type: Any = None) -> Tuple[str, ...]:
+  """给定 IMU 模式下事件中会出现的数据流；为 None 时返回全部数据流。"""
+  if imu_acq_type is None:
+    return tuple(FRAME_STREAMS)
+  orientation, raw, magnetometer = IMU_SAMPLING_RATES_HZ[ImuAcqTypeEnum.coerce(imu_acq_type)]
+  present = {
+    'orientation': orientation > 0,
+    'accelerometer': raw > 0,
+    'gyroscope': raw > 0,
+    'magnetometer': magnetometer > 0,
+    'sensor_states': raw > 0, # NOTE: FUSED 模式不提供传感器状态。
+  }
+  return tuple(name for name in FRAME_STREAMS if present.get(name, True))
+
+
+def _shape_of(samples: Any, ndim: int, width: Optional[int]) -> Tuple[int, ...]:
+  """不拷贝数据，读取（ndarray、.NET 交错数组或嵌套序列）样本的形状。"""
+  if isinstance(samples, np.ndarray):
+    return samples.shape
+  n = len(samples)
+  if ndim == 1:
+    return (n,)
+  m = len(samples[0]) if n else 0
+  return (n, m) if ndim == 2 else (n, m, width)
+
+
+class BufferCache:
+  """按形状缓存的预分配数组。
+
+  事件内样本数可能在相邻两个值之间交替（如 IMU 142 Hz 的向下取整累积），
+  因此每个数据流保留少量形状各异的缓冲区。
+  """
+  def __init__(self, dtype: Any, max_shapes: int = 4) -> None:
+    self._dtype = np.dtype(dtype)
+    self._max_shapes = max_shapes
+    self._buffers: Dict[Tuple[int, ...], np.ndarray] = {}
+    self.num_allocations = 0
+
+  def get(self, shape: Tuple[int, ...]) -> np.ndarray:
+    buf = self._buffers.get(shape)
+    if buf is None:
+      if len(self._buffers) >= self._max_shapes:
+        self._buffers.pop(next(iter(self._buffers)))
+      buf = self._buffers[shape] = np.empty(shape, self._dtype)
+      self.num_allocations += 1
+    return buf
+
+
+def extract_stream(args: Any, name: str, cache: Optional[BufferCache] = None) -> Optional[np.ndarray]:
+  """调用一次原始 getter 并转换为数组；数据流不存在或为空时返回 None。"""
+  getter, ndim, width, dtype = FRAME_STREAMS[name]
+  if not hasattr(args, getter):
+    return None # 如内存数据事件没有同步通道
+  samples = getattr(args, getter)()
+  if samples is None:
+    return None
+  shape = _shape_of(samples, ndim, width)
+  if 0 in shape:
+    return None
+  out = cache.get(shape) if cache is not None else None
+  if ndim == 1:
+    return to_numpy_1d(samples, dtype, out)
+  if ndim == 2:
+    return to_numpy_2d(samples, dtype, out)
+  return to_numpy_3d(samples, width, dtype, out)
+
+
+class EventFrame:
+  """一次数据事件的列式快照。
+
+  模态属性为 (通道, 样本[, 分量]) 数组（`fsw` 为 (样本, 2)，`sync` 为 (样本,)），
+  不存在或未提取的模态为 None；触发扫描号在未检测到触发时为 None。
+  """
+  __slots__ = ('scan_number', 'start_trigger_scan', 'stop_trigger_scan', 'transfer_rate', 'usb_lost_packets',
+               'rf_lost_packets') + tuple(FRAME_STREAMS)
+
+  def __init__(self) -> None:
+    self.scan_number = 0
+    self.start_trigger_scan: Optional[int] = None
+    self.stop_trigger_scan: Optional[int] = None
+    self.transfer_rate = 0
+    self.usb_lost_packets = 0
+    self.rf_lost_packets: Optional[np.ndarray] = None
+    for name in FRAME_STREAMS:
+      setattr(self, name, None)
+
+  @property
+  def start_trigger(self) -> bool:
+    """是否检测到开始触发。"""
+    return self.start_trigger_scan is not None
+
+  @property
+  def stop_trigger(self) -> bool:
+    """是否检测到停止触发。"""
+    return self.stop_trigger_scan is not None
+
+  def get_num_samples(self) -> int:
+    """本事件的 EMG 样本数。"""
+    return 0 if self.emg is None else self.emg.shape[1]
+
+  def get_streams(self) -> Dict[str, np.ndarray]:
+    """{数据流名: 数组}，仅包含存在的模态（与 `recorder.extract_raw_streams` 的结果一致）。"""
+    streams = {}
+    for name in FRAME_STREAMS:
+      block = getattr(self, name)
+      if block is not None:
+        streams[name] = block
+    return streams
+
+  def copy(self) -> 'EventFrame':
+    """深拷贝（用于在复用模式下保留帧）。"""
+    frame = EventFrame()
+    for name in EventFrame.__slots__:
+      value = getattr(self, name)
+      setattr(frame, name, value.copy() if isinstance(value, np.ndarray) else value)
+    return frame
+
+  @classmethod
+  def from_args(cls, args: Any, imu_acq_type: Any = None) -> 'EventFrame':
+    """从事件参数构造一帧（每次分配新数组）。"""
+    return FrameBuilder(imu_acq_type).build(args)
+
+
+class FrameBuilder:
+  """每个事件调用一次 `build(args)` 生成 `EventFrame`。
+
+  参数：
+  - imu_acq_type: 当前 IMU 模式，用于跳过不产生的模态；None 表示逐个探测。
+  - streams: 只提取这些数据流（默认为该模式下的全部数据流）。
+  - reuse: 为 True 时复用同一个帧对象与按形状缓存的数组，稳态下不再分配；
+    此时帧在下一次 `build()` 后失效，需要保留时使用 `EventFrame.copy()`。
+  """
+  def __init__(self, imu_acq_type: Any = None, streams: Optional[Iterable[str]] = None, reuse: bool = False) -> None:
+    present = get_frame_streams(imu_acq_type)
+    self._names = present if streams is None else tuple(name for name in present if name in set(streams))
+    self._reuse = reuse
+    self._frame = EventFrame() if reuse else None
+    self._caches = {name: BufferCache(FRAME_STREAMS[name][3]) for name in self._names} if reuse else {}
+    self._rf_cache = BufferCache(np.int32)
+
+  @classmethod
+  def from_capture_configuration(cls, capture_configuration: Any, **kwargs: Any) -> 'FrameBuilder':
+    """根据采集配置（`CometaCaptureConfiguration` 或快照）的 IMU 模式创建。"""
+    from .recorder import describe_capture_configuration
+    return cls(describe_capture_configuration(capture_configuration)['imu_acq_type'], **kwargs)
+
+  def get_stream_names(self) -> Tuple[str, ...]:
+    """会被提取的数据流。"""
+    return self._names
+
+  def build(self, args: Any) -> EventFrame:
+    """提取事件参数中的全部所需数据。"""
+    frame = self._frame if self._reuse else EventFrame()
+    for name in self._names:
+      setattr(frame, name, extract_stream(args, name, self._caches.get(name)))
+    frame.scan_number = args.scan_number()
+    frame.start_trigger_scan = args.start_trigger_scan() if args.is_start_trigger_detected() else None
+    frame.stop_trigger_scan = args.stop_trigger_scan() if args.is_stop_trigger_detected() else None
+    frame.transfer_rate = args.get_transfer_rate()
+    frame.usb_lost_packets = args.get_usb_lost_packets()
+    rf_lost = args.get_sensor_rf_lost_packets()
+    if rf_lost is None:
+      frame.rf_lost_packets = None
+    else:
+      out = self._rf_cache.get((len(rf_lost),)) if self._reuse else None
+      frame.rf_lost_packets = to_numpy_1d(rf_lost, np.int32, out)
+    return frame
+
+
+def make_data_available_handler(on_frame: Callable[[EventFrame], None],
+                                imu_acq_type: Any = None,
+                                reuse: bool = False) -> Callable[[Any, Any], None]:
+  """构造可传给 `CometaDaqSystem.add_on_data_available_handler` 的回调，每个事件以一帧调用 `on_frame`。"""
+  builder = FrameBuilder(imu_acq_type, reuse=reuse)
+
+  def on_data_available(sender: Any, args: Any) -> None:
+    on_frame(builder.build(args))
+  return on_data_available
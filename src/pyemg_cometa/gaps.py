@@ -0,0 +1,293 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+丢包感知的间隙检测与增量填补。
+
+`get_sensor_rf_lost_packets()`/`get_usb_lost_packets()` 是自采集开始的累计计数。
+本模块在相邻事件之间对计数做差分，定位本事件中发生丢包的传感器，并为数据块
+生成有效性掩码（True 为有效样本）：
+- 丢包传感器中数据被置零的样本（SDK 以零填充丢失的包）标记为无效；
+  若该传感器本块中没有零样本，则整块标记为无效；
+- USB 丢包影响所有传感器。
+
+`GapFiller` 可选地对不超过 `max_gap` 个样本的短间隙做增量填补：
+- HOLD：保持间隙前最后一个有效值；
+- LINEAR：在间隙前最后输出值与间隙后首个有效值之间线性插值；间隙延续到块末尾时
+  先保持，下一块中从已输出的值继续插值。已输出的样本不再修改，因此无需缓存整窗数据。
+
+数据块采用 SDK 的 [通道][样本][分量] 布局（如 `get_emg_samples_as_numpy()`）。
+"""
+
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional
+import numpy as np
+
+from .arrays import to_numpy_1d
+
+
+class FillMethodEnum:
+  """间隙填补方式。"""
+  NONE = 'none'     # 仅标记，不修改数据
+  HOLD = 'hold'     # 保持最后有效值
+  LINEAR = 'linear' # 线性插值
+
+
+class GapResult(NamedTuple):
+  """单个数据流的处理结果。
+
+  - samples: （可能已填补的）数据块，形状与输入相同
+  - mask: 有效性掩码，形状 (通道, 样本)，True 为原始有效样本
+  - num_filled: 本块中被填补的样本数
+  """
+  samples: np.ndarray
+  mask: np.ndarray
+  num_filled: int
+
+
+class LossTracker:
+  """对累计丢包计数做差分，并统计各传感器的丢包率。"""
+  def __init__(self, num_sensors: int) -> None:
+    self._num_sensors = num_sensors
+    self.reset()
+
+  def reset(self) -> None:
+    self._last_rf = None # type: Optional[np.ndarray]
+    self._last_usb = None # type: Optional[int]
+    self._num_events = 0
+    self._rf_lost = np.zeros(self._num_sensors, dtype=np.int64)
+    self._events_with_loss = np.zeros(self._num_sensors, dtype=np.int64)
+    self._usb_lost = 0
+
+  def update(self, rf_lost_packets: Any, usb_lost_packets: int) -> np.ndarray:
+    """输入本事件的累计计数，返回各传感器本事件是否丢包（bool 数组）。
+
+    计数回退（如重新开始采集）时以当前值作为增量。
+    """
+    rf = to_numpy_1d(rf_lost_packets, np.int64)[:self._num_sensors]
+    if rf.size < self._num_sensors:
+      rf = np.pad(rf, (0, self._num_sensors - rf.size))
+    if self._last_rf is None:
+      rf_delta = np.zeros(self._num_sensors, dtype=np.int64)
+      usb_delta = 0
+    else:
+      rf_delta = rf - self._last_rf
+      rf_delta = np.where(rf_delta < 0, rf, rf_delta)
+      usb_delta = usb_lost_packets - self._last_usb
+      usb_delta = usb_lost_packets if usb_delta < 0 else usb_delta
+    self._last_rf = rf
+    self._last_usb = usb_lost_packets
+    self._num_events += 1
+    self._rf_lost += rf_delta
+    self._usb_lost += usb_delta
+    lost = (rf_delta > 0) | (usb_delta > 0)
+    self._events_with_loss += lost
+    return lost
+
+  def get_stats(self) -> Dict[str, Any]:
+    """累计丢包与丢包率（每事件丢包数、含丢包事件占比）。"""
+    n = max(self._num_events, 1)
+    return {
+      'num_events': self._num_events,
+      'usb_lost_packets': self._usb_lost,
+      'sensor_lost_packets': self._rf_lost.tolist(),
+      'sensor_loss_rate': (self._rf_lost / n).tolist(),
+      'sensor_events_with_loss_ratio': (self._events_with_loss / n).tolist(),
+    }
+
+
+class GapFiller:
+  """为单个数据流生成有效性掩码并增量填补短间隙。
+
+  参数：
+  - num_channels: 通道数（即传感器数）。
+  - method: `FillMethodEnum` 之一。
+  - max_gap: 可填补的最长间隙（样本）；更长的间隙保持原样（仍标记为无效）。
+    NOTE: 延续到块末尾的间隙按已知长度判断，之后才超过 `max_gap` 的间隙其前段已被填补。
+  """
+  def __init__(self, num_channels: int, method: str = FillMethodEnum.HOLD, max_gap: int = 100) -> None:
+    if method not in (FillMethodEnum.NONE, FillMethodEnum.HOLD, FillMethodEnum.LINEAR):
+      raise ValueError("Unknown fill method %r" % (method,))
+    self._num_channels = num_channels
+    self._method = method
+    self._max_gap = max_gap
+    self._num_invalid = np.zeros(num_channels, dtype=np.int64)
+    self._num_samples = 0
+    self._num_filled = 0
+    self.reset()
+
+  def reset(self) -> None:
+    """清除跨块状态。"""
+    self._last = None # type: Optional[np.ndarray] # 各通道最后输出的值
+    self._run = np.zeros(self._num_channels, dtype=np.int64) # 延续到上一块末尾的间隙长度
+    self._has_last = np.zeros(self._num_channels, dtype=bool)
+
+  def get_mask(self, block: np.ndarray, lost: np.ndarray) -> np.ndarray:
+    """按本事件的丢包传感器生成有效性掩码。"""
+    mask = np.ones(block.shape[:2], dtype=bool)
+    if not lost.any():
+      return mask
+    zero = block[lost] == 0
+    if zero.ndim > 2:
+      zero = zero.reshape(zero.shape[:2] + (-1,)).all(axis=2)
+    zero[~zero.any(axis=1)] = True # 未找到零填充样本时整块无效
+    mask[lost] = ~zero
+    return mask
+
+  def process(self, block: np.ndarray, lost: np.ndarray) -> GapResult:
+    """处理一个数据块。`lost` 为各通道本事件是否丢包。"""
+    block = np.asarray(block)
+    mask = self.get_mask(block, lost)
+    num_filled = 0
+    if self._method != FillMethodEnum.NONE and block.shape[1]:
+      if not mask.all():
+        block, num_filled = self._fill(block, mask)
+      else:
+        self._run[:] = 0
+      self._last = block[:, -1].copy()
+      self._has_last |= mask.any(axis=1)
+    self._num_samples += block.shape[1]
+    self._num_invalid += block.shape[1] - mask.sum(axis=1)
+    self._num_filled += num_filled
+    return GapResult(block, mask, num_filled)
+
+  def _fill(self, block: np.ndarray, mask: np.ndarray) -> Any:
+    channels = np.flatnonzero(~mask.all(axis=1))
+    out = block.copy()
+    n = block.shape[1]
+    positions = np.arange(n)
+    sub_mask = mask[channels]
+    # 间隙前最后有效样本的位置；上一块延续的间隙为负数（-1 - 已延续的长度）。
+    prev = np.where(sub_mask, positions, np.iinfo(np.int64).min)
+    prev = np.maximum.accumulate(prev, axis=1)
+    carried = prev == np.iinfo(np.int64).min
+    prev = np.where(carried, -1 - self._run[channels, np.newaxis], prev)
+    # 间隙后首个有效样本的位置；没有时为 n（间隙延续到块末尾）。
+    nxt = np.where(sub_mask, positions, n)
+    nxt = np.minimum.accumulate(nxt[:, ::-1], axis=1)[:, ::-1]
+    gap_len = nxt - prev - 1
+    ended = nxt < n
+    has_prev = ~carried | self._has_last[channels, np.newaxis]
+    fill = ~sub_mask & has_prev & (gap_len <= self._max_gap)
+    # 延续到块末尾的间隙：已知长度已超过 max_gap 时不再填补。
+    fill &= ended | (n - prev - 1 <= self._max_gap)
+    if fill.any():
+      ci, si = np.nonzero(fill)
+      c = channels[ci]
+      p = prev[ci, si]
+      if self._last is None:
+        self._last = np.zeros((self._num_channels,) + block.shape[2:], dtype=block.dtype)
+      # 间隙前的值：本块内取对应样本，上一块延续时取上一块最后输出的值。
+      start_value = np.where(self._expand(p >= 0, block), block[c, np.maximum(p, 0)], self._last[c])
+      if self._method == FillMethodEnum.LINEAR:
+        q = nxt[ci, si]
+        can_interp = q < n
+        end_value = block[c, np.minimum(q, n - 1)]
+        # 上一块延续的间隙从已输出的最后值（位置 -1）开始插值。
+        origin = np.where(p >= 0, p, -1)
+        w = np.where(can_interp, (si - origin) / np.maximum(q - origin, 1), 0.0)
+        w = self._expand(w, block)
+        values = start_value + (end_value - start_value) * w
+      else:
+        values = start_value
+      out[c, si] = values.astype(block.dtype, copy=False)
+    # 更新延续到块末尾的间隙长度。
+    tail_gap = ~sub_mask[:, -1]
+    self._run[channels] = np.where(tail_gap, n - 1 - prev[:, -1], 0)
+    return out, int(fill.sum())
+
+  @staticmethod
+  def _expand(a: np.ndarray, block: np.ndarray) -> np.ndarray:
+    return a.reshape(a.shape + (1,) * (block.ndim - 2))
+
+  def get_stats(self) -> Dict[str, Any]:
+    """各通道无效样本比例与填补样本数。"""
+    n = max(self._num_samples, 1)
+    return {
+      'num_samples': self._num_samples,
+      'num_filled': self._num_filled,
+      'invalid_ratio': (self._num_invalid / n).tolist(),
+    }
+
+
+class GapDetector:
+  """对一个事件的多个数据流执行丢包检测与填补。
+
+  参数：
+  - num_sensors: 传感器数。
+  - streams: 需要处理的数据流（`emg`、`accelerometer` 等，使用 `get_<stream>_samples_as_numpy`）。
+  - method / max_gap: 见 `GapFiller`；`max_gap` 以 EMG 样本计，其它数据流按块长比例换算。
+  """
+  def __init__(self,
+               num_sensors: int,
+               streams: Iterable[str] = ('emg',),
+               method: str = FillMethodEnum.HOLD,
+               max_gap: int = 100) -> None:
+    self._tracker = LossTracker(num_sensors)
+    self._streams = tuple(streams)
+    self._method = method
+    self._max_gap = max_gap
+    self._fillers = {} # type: Dict[str, GapFiller]
+    self._num_sensors = num_sensors
+
+  def reset(self) -> None:
+    self._tracker.reset()
+    for filler in self._fillers.values():
+      filler.reset()
+
+  def process(self, args: Any) -> Dict[str, GapResult]:
+    """处理一个 `DataAvailable` 事件，返回 {数据流: GapResult}（跳过本事件为空的数据流）。"""
+    lost = self._tracker.update(args.get_sensor_rf_lost_packets(), args.get_usb_lost_packets())
+    results = {}
+    emg_len = None
+    for name in self._streams:
+      block = getattr(args, 'get_%s_samples_as_numpy' % name)()
+      if block.size == 0:
+        continue
+      if name == 'emg':
+        emg_len = block.shape[1]
+      filler = self._fillers.get(name)
+      if filler is None:
+        max_gap = self._max_gap
+        if name != 'emg' and emg_len:
+          max_gap = max(1, self._max_gap * block.shape[1] // emg_len)
+        filler = self._fillers[name] = GapFiller(self._num_sensors, self._method, max_gap)
+      results[name] = filler.process(block, lost[:block.shape[0]])
+    return results
+
+  def get_stats(self) -> Dict[str, Any]:
+    """丢包统计与各数据流的填补统计。"""
+    stats = self._tracker.get_stats()
+    stats['streams'] = {name: filler.get_stats() for name, filler in self._fillers.items()}
+    return stats
+
+
+def make_data_available_handler(detector: GapDetector,
+                                on_result: Callable[[Any, Dict[str, GapResult]], None]) -> Callable[[Any, Any], None]:
+  """返回可直接注册到 `add_on_data_available_handler` 的回调，处理后调用 `on_result(args, results)`。"""
+  def on_data_available(sender: Any, args: Any) -> None:
+    on_result(args, detector.process(args))
+  return on_data_available
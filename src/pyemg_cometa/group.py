@@ -0,0 +1,392 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+多接收器编排。
+
+`DaqGroup` 管理同一主机上的多个 Waveplus 接收器（各自使用不同的 RF 信道，见
+`set_master_device_rf_channel`）：
+- 配置、阻抗检测等阻塞命令按设备并发执行（线程池），同一设备内的命令仍按顺序
+  执行，因为 SDK 对单个设备对象不是线程安全的；
+- `start()` 用屏障让各设备尽量同时 `start_capturing`，随后在所有设备上同时写入
+  共享标记（`write_sync_data` 的同步通道阶跃，或 `generate_start_trigger`），
+  以标记所在的扫描序号作为各设备的公共时间原点；
+- 各设备数据以原点对齐后送入各自的 `StreamAligner`，`read_merged()` 在公共时间
+  网格上增量输出合并结果；
+- `get_skew_stats()` 报告启动时的调用偏差、标记扫描偏移以及事件到达时间相对
+  参考设备的偏差（主机时钟）。
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import numpy as np
+
+from .align import StreamAligner
+from .constants import DataAvailableEventPeriodEnum, EMG_SAMPLING_RATE_HZ, ImuAcqTypeEnum, SamplingRateEnum
+from .recorder import extract_streams
+
+
+class SyncMarkerEnum:
+  """公共时间原点的标记方式。"""
+  NONE = 'none'       # 不写入标记，各设备以扫描 0 为原点
+  SYNC = 'sync'       # `write_sync_data` 写入同步通道阶跃
+  TRIGGER = 'trigger' # `generate_start_trigger`
+
+
+class DaqGroupError(Exception):
+  """一个或多个设备的命令失败。`errors` 为 {设备名: 异常}。"""
+  def __init__(self, errors: Dict[str, BaseException]) -> None:
+    super().__init__("Command failed on %s" % ', '.join('%s (%s)' % (name, e) for name, e in errors.items()))
+    self.errors = errors
+
+
+class _Member:
+  """组内单个设备的运行时状态。"""
+  def __init__(self, name: str, daq: Any, aligner: StreamAligner) -> None:
+    self.name = name
+    self.daq = daq
+    self.aligner = aligner
+    self.lock = threading.Lock()
+    self.handler = None # type: Optional[Callable[[Any, Any], None]]
+    self.origin_scan = None # type: Optional[int]
+    self.num_events = 0
+    self.num_discarded = 0
+    self.start_call_time = 0.0
+    self.marker_call_time = 0.0
+    self.last_arrival = None # type: Optional[Tuple[int, float]]
+    self.arrival_offsets = [] # type: List[float]
+
+
+class DaqGroup:
+  """多个 `CometaDaqSystem`（或 `SimulatedDaqSystem`）的并发编排与数据合并。
+
+  参数：
+  - devices: {设备名: 设备对象}，或设备对象序列（名称为 'dev0'、'dev1' …）。
+  - imu_acq_type / sampling_rate: 各设备共用的采集参数，用于推导数据流采样率。
+  - max_workers: 线程池大小，默认等于设备数（同步开始/标记不经线程池，不受其限制）。
+  - history_s: 每个设备保留的对齐历史时长（秒）。
+  - barrier_timeout: 同步开始/标记时等待所有设备就绪的超时（秒），超时抛出 `DaqGroupError`。
+  """
+  def __init__(self,
+               devices: Union[Dict[str, Any], Iterable[Any]],
+               imu_acq_type: Any = ImuAcqTypeEnum.RAW_DATA,
+               sampling_rate: Any = SamplingRateEnum.HZ_2000,
+               max_workers: Optional[int] = None,
+               history_s: float = 10.0,
+               barrier_timeout: float = 10.0) -> None:
+    if not isinstance(devices, dict):
+      devices = {'dev%d' % i: daq for i, daq in enumerate(devices)}
+    if not devices:
+      raise ValueError("DaqGroup requires at least one device")
+    self._devices = dict(devices)
+    self._imu_acq_type = imu_acq_type
+    self._sampling_rate = sampling_rate
+    self._history_s = history_s
+    self._barrier_timeout = barrier_timeout
+    self._pool = ThreadPoolExecutor(max_workers=max_workers or len(self._devices), thread_name_prefix='DaqGroup')
+    self._members = {} # type: Dict[str, _Member]
+    self._marker = SyncMarkerEnum.NONE
+    self._marker_value = 0.0
+    self._merged_until = None # type: Optional[float]
+    self._capturing = False
+
+  @property
+  def names(self) -> List[str]:
+    return list(self._devices)
+
+  def __getitem__(self, name: str) -> Any:
+    return self._devices[name]
+
+  def __enter__(self) -> 'DaqGroup':
+    return self
+
+  def __exit__(self, exc_type, exc, tb) -> None:
+    self.close()
+
+  # 并发命令 ---------------------------------------------------------------
+
+  def map(self, func: Callable[..., Any], names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """对每个设备并发执行 `func(name, daq)`，返回 {设备名: 结果}；任一失败时抛出 `DaqGroupError`。"""
+    names = list(names) if names is not None else self.names
+    futures = {name: self._pool.submit(func, name, self._devices[name]) for name in names}
+    results = {}
+    errors = {}
+    for name, future in futures.items():
+      try:
+        results[name] = future.result()
+      except Exception as e:
+        errors[name] = e
+    if errors:
+      raise DaqGroupError(errors)
+    return results
+
+  def _map_synchronized(self, func: Callable[[str, Any], None]) -> None:
+    """每个设备一个专用线程，在屏障释放后同时执行 `func(name, daq)`。
+
+    NOTE: 不使用共享线程池——池小于设备数时屏障永远无法凑满。屏障带超时，
+    某个设备未能到达时其余设备得到 `BrokenBarrierError` 而不是无限等待。
+    """
+    barrier = threading.Barrier(len(self._members), timeout=self._barrier_timeout)
+    errors = {} # type: Dict[str, BaseException]
+
+    def run(name: str, daq: Any) -> None:
+      try:
+        barrier.wait()
+      except threading.BrokenBarrierError as e:
+        errors[name] = e
+        return
+      try:
+        func(name, daq)
+      except BaseException as e:
+        errors[name] = e
+    threads = [threading.Thread(target=run, args=(name, member.daq), name='DaqGroup-%s' % name, daemon=True)
+               for name, member in self._members.items()]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    if errors:
+      raise DaqGroupError(errors)
+
+  def call(self, method: str, *args: Any) -> Dict[str, Any]:
+    """在所有设备上并发调用同名方法。"""
+    return self.map(lambda name, daq: getattr(daq, method)(*args))
+
+  def set_rf_channels(self, channels: Dict[str, Any], device_id: int = 0) -> None:
+    """为各设备设置主设备 RF 信道 {设备名: RFChannelEnum}。"""
+    self.map(lambda name, daq: daq.set_master_device_rf_channel(channels[name], device_id), channels)
+
+  def configure(self,
+                capture_configuration: Any = None,
+                sensor_configurations: Optional[Dict[str, Dict[int, Any]]] = None) -> None:
+    """并发下发采集配置与传感器配置。
+
+    `sensor_configurations` 为 {设备名: {sensor_id: 配置}}；同一设备内按 sensor_id 顺序下发。
+    """
+    def apply(name: str, daq: Any) -> None:
+      if capture_configuration is not None:
+        daq.set_capture_configuration(capture_configuration)
+      for sensor_id, config in sorted((sensor_configurations or {}).get(name, {}).items()):
+        daq.set_sensor_configuration(config, sensor_id)
+    self.map(apply)
+
+  def check_impedance(self, sensor_ids: Optional[Dict[str, Iterable[int]]] = None) -> Dict[str, Dict[int, Any]]:
+    """并发检测各设备的电极阻抗，返回 {设备名: {sensor_id: 报告}}。"""
+    def check(name: str, daq: Any) -> Dict[int, Any]:
+      ids = sensor_ids[name] if sensor_ids is not None else range(daq.get_num_installed_sensors())
+      return {sensor_id: daq.check_impedance(sensor_id) for sensor_id in ids}
+    return self.map(check)
+
+  def detect_accelerometer_offset(self, sensor_ids: Optional[Dict[str, Iterable[int]]] = None) -> None:
+    """并发执行各设备的加速度计零偏检测。"""
+    def detect(name: str, daq: Any) -> None:
+      ids = sensor_ids[name] if sensor_ids is not None else range(daq.get_num_installed_sensors())
+      for sensor_id in ids:
+        daq.detect_accelerometer_offset(sensor_id)
+    self.map(detect)
+
+  # 同步采集 ---------------------------------------------------------------
+
+  def start(self,
+            event_period: Any = DataAvailableEventPeriodEnum.MS_100,
+            marker: str = SyncMarkerEnum.SYNC,
+            marker_value: float = 1.0,
+            marker_delay: float = 0.2) -> None:
+    """同步开始采集。
+
+    各设备在屏障释放后同时调用 `start_capturing`；`marker` 不为 NONE 时，等待
+    `marker_delay` 秒（确保各设备已开始出数据）后再同时写入标记。
+    标记出现前的数据不进入合并输出。
+    """
+    if self._capturing:
+      raise RuntimeError("DaqGroup is already capturing")
+    self._marker = marker
+    self._marker_value = marker_value
+    self._merged_until = None
+    self._members = {}
+    for name, daq in self._devices.items():
+      member = _Member(name, daq, StreamAligner(self._imu_acq_type, self._sampling_rate, event_period, self._history_s))
+      if marker == SyncMarkerEnum.NONE:
+        member.origin_scan = 0
+      elif marker == SyncMarkerEnum.SYNC:
+        daq.write_sync_data(0.0, True)
+      member.handler = self._make_handler(member)
+      daq.add_on_data_available_handler(member.handler)
+      self._members[name] = member
+    started = set()
+
+    def start(name: str, daq: Any) -> None:
+      self._members[name].start_call_time = time.perf_counter()
+      daq.start_capturing(event_period)
+      started.add(name)
+    try:
+      self._map_synchronized(start)
+    except BaseException:
+      # 回滚：停止已开始的设备并注销所有回调，保持与调用前一致。
+      for name in started:
+        try:
+          self._devices[name].stop_capturing()
+        except Exception:
+          pass
+      for member in self._members.values():
+        member.daq.remove_on_data_available_handler(member.handler)
+      raise
+    self._capturing = True
+    if marker != SyncMarkerEnum.NONE:
+      time.sleep(marker_delay)
+      self.mark()
+
+  def mark(self) -> None:
+    """在所有设备上同时写入共享标记（`start()` 会自动调用一次）。"""
+    def mark(name: str, daq: Any) -> None:
+      self._members[name].marker_call_time = time.perf_counter()
+      if self._marker == SyncMarkerEnum.SYNC:
+        daq.write_sync_data(self._marker_value, True)
+      else:
+        daq.generate_start_trigger()
+    self._map_synchronized(mark)
+
+  def wait_for_origin(self, timeout: Optional[float] = None) -> bool:
+    """等待所有设备都检测到标记。"""
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    while any(m.origin_scan is None for m in self._members.values()):
+      if deadline is not None and time.perf_counter() > deadline:
+        return False
+      time.sleep(0.005)
+    return True
+
+  def stop(self) -> None:
+    """并发停止采集并注销回调。"""
+    if not self._capturing:
+      return
+    self._capturing = False
+    try:
+      self.call('stop_capturing')
+    finally:
+      for member in self._members.values():
+        member.daq.remove_on_data_available_handler(member.handler)
+
+  def close(self) -> None:
+    """停止采集并关闭线程池（不释放设备对象）。"""
+    try:
+      self.stop()
+    finally:
+      self._pool.shutdown(wait=True)
+
+  def _make_handler(self, member: _Member) -> Callable[[Any, Any], None]:
+    def on_data_available(sender: Any, args: Any) -> None:
+      arrival = time.perf_counter()
+      scan = args.scan_number()
+      blocks = extract_streams(args)
+      with member.lock:
+        member.num_events += 1
+        if member.origin_scan is None:
+          member.origin_scan = self._find_marker(args, scan, blocks)
+          if member.origin_scan is None:
+            member.num_discarded += 1
+            return
+        member.aligner.push(scan - member.origin_scan, blocks)
+        member.last_arrival = (scan - member.origin_scan, arrival)
+      self._record_arrival(member)
+    return on_data_available
+
+  def _find_marker(self, args: Any, scan: int, blocks: Dict[str, np.ndarray]) -> Optional[int]:
+    if self._marker == SyncMarkerEnum.TRIGGER:
+      return args.start_trigger_scan() if args.is_start_trigger_detected() else None
+    sync = blocks.get('sync')
+    if sync is None:
+      return None
+    hits = np.flatnonzero(sync == self._marker_value)
+    return scan + int(hits[0]) if hits.size else None
+
+  def _record_arrival(self, member: _Member) -> None:
+    # 到达时间偏差：同一对齐扫描下，本设备与参考设备（第一个设备）的主机到达时间之差。
+    reference = self._members[self.names[0]]
+    if member is reference or reference.last_arrival is None or member.last_arrival is None:
+      return
+    ref_scan, ref_time = reference.last_arrival
+    scan, arrival = member.last_arrival
+    offset = (arrival - scan / EMG_SAMPLING_RATE_HZ) - (ref_time - ref_scan / EMG_SAMPLING_RATE_HZ)
+    member.arrival_offsets.append(offset)
+    if len(member.arrival_offsets) > 4096:
+      del member.arrival_offsets[:2048]
+
+  # 合并输出 ---------------------------------------------------------------
+
+  def read_merged(self,
+                  names: Iterable[str] = ('emg',),
+                  rate: Optional[float] = None,
+                  method: str = 'linear') -> Tuple[np.ndarray, Dict[str, Dict[str, np.ndarray]]]:
+    """返回自上次调用以来、所有设备都已覆盖的公共时间段的合并数据。
+
+    返回 (时间网格（秒，相对标记）, {设备名: {数据流: 插值结果}})；尚无公共数据时网格为空。
+    """
+    names = list(names)
+    rate = rate or EMG_SAMPLING_RATE_HZ
+    members = [m for m in self._members.values() if m.origin_scan is not None]
+    if len(members) != len(self._members) or not members:
+      return np.empty(0), {}
+    for member in members:
+      member.lock.acquire()
+    try:
+      ranges = [m.aligner.get_time_range(name) for m in members for name in names]
+      t0 = max(r[0] for r in ranges)
+      t1 = min(r[1] for r in ranges)
+      if self._merged_until is not None:
+        t0 = max(t0, self._merged_until + 0.5 / rate)
+      if t1 < t0:
+        return np.empty(0), {}
+      grid = np.ceil(t0 * rate) / rate + np.arange(int(np.floor(t1 * rate)) - int(np.ceil(t0 * rate)) + 1) / rate
+      merged = {m.name: {name: m.aligner.resample(name, grid, method) for name in names} for m in members}
+    finally:
+      for member in members:
+        member.lock.release()
+    if grid.size:
+      self._merged_until = grid[-1]
+    return grid, merged
+
+  def get_skew_stats(self) -> Dict[str, Any]:
+    """设备间偏差统计（毫秒）。"""
+    start_times = [m.start_call_time for m in self._members.values()]
+    marker_times = [m.marker_call_time for m in self._members.values()]
+    devices = {}
+    for name, member in self._members.items():
+      offsets = np.asarray(member.arrival_offsets) * 1e3
+      devices[name] = {
+        'origin_scan': member.origin_scan,
+        'num_events': member.num_events,
+        'num_discarded': member.num_discarded,
+        'arrival_skew_mean_ms': float(offsets.mean()) if offsets.size else 0.0,
+        'arrival_skew_max_ms': float(np.abs(offsets).max()) if offsets.size else 0.0,
+      }
+    return {
+      'start_call_spread_ms': (max(start_times) - min(start_times)) * 1e3 if start_times else 0.0,
+      'marker_call_spread_ms': (max(marker_times) - min(marker_times)) * 1e3 if self._marker != SyncMarkerEnum.NONE and marker_times else 0.0,
+      'devices': devices,
+    }
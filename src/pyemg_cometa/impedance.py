@@ -0,0 +1,264 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+并行电极阻抗扫描与结果缓存。
+
+会前逐个调用 `check_impedance(sensor_id)` 往往占据大部分准备时间。`ImpedanceSweep`
+对所有已安装传感器（`get_num_installed_sensors()`）排程检测：设备命令在线程池中
+执行，并发数受 `max_concurrency` 限制（SDK 不提供并发上限查询，默认 1，即设备上
+串行）；主机侧工作（报告解析、缓存持久化、`on_result` 回调）在设备忙于下一个传感器
+时完成，从而与设备命令重叠。
+
+结果（`SensorCheckReportEnum`）带时间戳写入缓存（可选 JSON 文件），在 `ttl_s` 内再次
+扫描时跳过该传感器；默认只缓存全部通过的结果，未通过的电极处理后总会被重新检测。
+每个传感器的检测耗时记录在 `ImpedanceResult.duration_s` 中，`SweepReport.summary()`
+生成汇总表。
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import json
+import os
+import time
+
+from .constants import SensorCheckReportEnum
+
+
+class ImpedanceStatusEnum:
+  PASSED = 'passed'             # 所有报告均为 PASSED
+  FAILED = 'failed'             # 至少一个报告为 FAILED
+  NOT_EXECUTED = 'not_executed' # 没有失败但存在未执行的检测（如传感器未启用）
+  ERROR = 'error'               # 命令抛出异常
+
+
+class ImpedanceResult(NamedTuple):
+  """单个传感器的阻抗检测结果。"""
+  sensor_id: int
+  reports: Tuple[SensorCheckReportEnum, ...]
+  status: str
+  timestamp: float
+  duration_s: float
+  cached: bool
+  error: Optional[str]
+
+  def to_dict(self) -> Dict[str, Any]:
+    d = self._asdict()
+    d['reports'] = [report.name for report in self.reports]
+    return d
+
+  @classmethod
+  def from_dict(cls, d: Dict[str, Any], cached: bool = True) -> 'ImpedanceResult':
+    return cls(d['sensor_id'], tuple(SensorCheckReportEnum.coerce(name) for name in d['reports']), d['status'],
+               d['timestamp'], d['duration_s'], cached, d.get('error'))
+
+
+def get_status(reports: Iterable[SensorCheckReportEnum]) -> str:
+  """由报告列表得到汇总状态。"""
+  reports = list(reports)
+  if any(report == SensorCheckReportEnum.FAILED for report in reports):
+    return ImpedanceStatusEnum.FAILED
+  if not reports or any(report != SensorCheckReportEnum.PASSED for report in reports):
+    return ImpedanceStatusEnum.NOT_EXECUTED
+  return ImpedanceStatusEnum.PASSED
+
+
+class SweepReport:
+  """`ImpedanceSweep.run()` 的结果。"""
+  def __init__(self) -> None:
+    self.results = {} # type: Dict[int, ImpedanceResult]
+    self.wall_time_s = 0.0
+
+  @property
+  def num_checked(self) -> int:
+    """实际执行检测的传感器数（不含缓存命中）。"""
+    return sum(not result.cached for result in self.results.values())
+
+  @property
+  def num_cached(self) -> int:
+    return sum(result.cached for result in self.results.values())
+
+  @property
+  def device_time_s(self) -> float:
+    """本次实际检测的耗时总和（串行执行时的预计耗时）。"""
+    return sum(result.duration_s for result in self.results.values() if not result.cached)
+
+  def get_sensor_ids(self, status: str) -> List[int]:
+    """状态为 `status` 的传感器。"""
+    return sorted(sensor_id for sensor_id, result in self.results.items() if result.status == status)
+
+  def all_passed(self) -> bool:
+    return all(result.status == ImpedanceStatusEnum.PASSED for result in self.results.values())
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      'wall_time_s': self.wall_time_s,
+      'device_time_s': self.device_time_s,
+      'num_checked': self.num_checked,
+      'num_cached': self.num_cached,
+      'results': {str(sensor_id): result.to_dict() for sensor_id, result in sorted(self.results.items())},
+    }
+
+  def summary(self) -> str:
+    """可打印的汇总表：每个传感器一行，末尾为各状态计数与耗时。"""
+    lines = ['%-8s %-13s %10s  %s' % ('sensor', 'status', 'time (s)', 'reports')]
+    for sensor_id, result in sorted(self.results.items()):
+      duration = 'cached' if result.cached else '%.3f' % result.duration_s
+      detail = result.error if result.error is not None else ', '.join(report.name for report in result.reports)
+      lines.append('%-8d %-13s %10s  %s' % (sensor_id, result.status, duration, detail))
+    counts = ', '.join('%d %s' % (len(self.get_sensor_ids(status)), status)
+                       for status in (ImpedanceStatusEnum.PASSED, ImpedanceStatusEnum.FAILED,
+                                      ImpedanceStatusEnum.NOT_EXECUTED, ImpedanceStatusEnum.ERROR))
+    lines.append('%s; %d checked, %d cached; wall time %.3f s for %.3f s of checks'
+                 % (counts, self.num_checked, self.num_cached, self.wall_time_s, self.device_time_s))
+    return '\n'.join(lines)
+
+  def __repr__(self) -> str:
+    return 'SweepReport(num_checked=%d, num_cached=%d, wall_time_s=%.3f)' % (self.num_checked, self.num_cached, self.wall_time_s)
+
+
+class ImpedanceSweep:
+  """排程所有传感器的阻抗检测并缓存结果。
+
+  参数：
+  - daq: 设备对象（`CometaDaqSystem` 或 `SimulatedDaqSystem`）。
+  - ttl_s: 缓存结果的有效期（秒）；None 表示永不过期。
+  - cache_path: 缓存 JSON 文件路径；None 时仅缓存在内存中。
+  - device_key: 缓存中区分设备的键，一个缓存文件可保存多个设备。
+  - max_concurrency: 同时向设备下发的检测命令数上限。
+  - cache_failed: 是否也缓存未全部通过的结果。
+  - on_result: 每得到一个（非缓存）结果时在调用线程中回调。
+  """
+  def __init__(self,
+               daq: Any,
+               ttl_s: Optional[float] = 300.0,
+               cache_path: Optional[str] = None,
+               device_key: str = 'default',
+               max_concurrency: int = 1,
+               cache_failed: bool = False,
+               on_result: Optional[Callable[[ImpedanceResult], None]] = None) -> None:
+    if max_concurrency < 1:
+      raise ValueError("`max_concurrency` must be at least 1")
+    self._daq = daq
+    self._ttl_s = ttl_s
+    self._cache_path = cache_path
+    self._device_key = device_key
+    self._max_concurrency = max_concurrency
+    self._cache_failed = cache_failed
+    self._on_result = on_result
+    self._cache = self._load_cache()
+
+  def _load_cache(self) -> Dict[str, Any]:
+    if self._cache_path is not None and os.path.exists(self._cache_path):
+      with open(self._cache_path) as f:
+        return json.load(f).get(self._device_key, {})
+    return {}
+
+  def _save_cache(self) -> None:
+    if self._cache_path is None:
+      return
+    caches = {}
+    if os.path.exists(self._cache_path):
+      with open(self._cache_path) as f:
+        caches = json.load(f)
+    caches[self._device_key] = self._cache
+    tmp = self._cache_path + '.tmp'
+    with open(tmp, 'w') as f:
+      json.dump(caches, f, indent=2)
+    os.replace(tmp, self._cache_path)
+
+  def get_cached(self, sensor_id: int, now: Optional[float] = None) -> Optional[ImpedanceResult]:
+    """返回仍在有效期内的缓存结果。"""
+    entry = self._cache.get(str(sensor_id))
+    if entry is None:
+      return None
+    now = time.time() if now is None else now
+    if self._ttl_s is not None and now - entry['timestamp'] > self._ttl_s:
+      return None
+    return ImpedanceResult.from_dict(entry)
+
+  def invalidate(self, sensor_ids: Optional[Iterable[int]] = None) -> None:
+    """清除缓存（默认全部），如更换电极后。"""
+    if sensor_ids is None:
+      self._cache = {}
+    else:
+      for sensor_id in sensor_ids:
+        self._cache.pop(str(sensor_id), None)
+    self._save_cache()
+
+  def _check(self, sensor_id: int) -> ImpedanceResult:
+    """在工作线程中执行一次设备命令。"""
+    timestamp = time.time()
+    t0 = time.perf_counter()
+    try:
+      reports = tuple(SensorCheckReportEnum.coerce(report) for report in self._daq.check_impedance(sensor_id))
+    except Exception as e:
+      return ImpedanceResult(sensor_id, (), ImpedanceStatusEnum.ERROR, timestamp, time.perf_counter() - t0, False, repr(e))
+    return ImpedanceResult(sensor_id, reports, get_status(reports), timestamp, time.perf_counter() - t0, False, None)
+
+  def run(self, sensor_ids: Optional[Iterable[int]] = None, force: bool = False) -> SweepReport:
+    """检测 `sensor_ids`（默认全部已安装传感器），`force=True` 时忽略缓存。"""
+    t0 = time.perf_counter()
+    report = SweepReport()
+    if sensor_ids is None:
+      sensor_ids = range(self._daq.get_num_installed_sensors())
+    pending = []
+    now = time.time()
+    for sensor_id in sensor_ids:
+      cached = None if force else self.get_cached(sensor_id, now)
+      if cached is not None:
+        report.results[sensor_id] = cached
+      else:
+        pending.append(sensor_id)
+    with ThreadPoolExecutor(max_workers=self._max_concurrency, thread_name_prefix='ImpedanceSweep') as executor:
+      # NOTE: 最多保持 `max_concurrency` 个命令在途，设备执行下一个检测时在本线程处理已完成的结果。
+      queue = iter(pending)
+      futures = set()
+      for sensor_id in queue:
+        futures.add(executor.submit(self._check, sensor_id))
+        if len(futures) >= self._max_concurrency:
+          break
+      while futures:
+        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+        for _ in done:
+          sensor_id = next(queue, None)
+          if sensor_id is not None:
+            futures.add(executor.submit(self._check, sensor_id))
+        for future in done:
+          self._record(report, future.result())
+    report.wall_time_s = time.perf_counter() - t0
+    return report
+
+  def _record(self, report: SweepReport, result: ImpedanceResult) -> None:
+    report.results[result.sensor_id] = result
+    if result.status == ImpedanceStatusEnum.PASSED or (self._cache_failed and result.status != ImpedanceStatusEnum.ERROR):
+      self._cache[str(result.sensor_id)] = result.to_dict()
+    else:
+      self._cache.pop(str(result.sensor_id), None)
+    self._save_cache()
+    if self._on_result is not None:
+      self._on_result(result)
@@ -0,0 +1,505 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+二进制帧格式的网络数据流发布与订阅。
+
+`StreamServer` 挂在 `CometaDaqSystem` 的数据回调上，将每次事件的各模态数据块
+序列化为紧凑的二进制帧（头部包含 `scan_number()`、触发标志/扫描号与丢包计数），
+经 TCP、UDP 或本地 Unix 套接字发布给多个订阅者。每个订阅者有独立的发送队列与
+发送线程，队列满时按 `SendPolicyEnum` 处理，慢订阅者不会拖慢采集回调。
+`StreamClient` 为对应的客户端，解码后的数组直接引用接收缓冲区，无需再拷贝。
+
+帧格式（小端）：
+- 帧头 `FRAME_HEADER`：魔数 `CMTS`、版本、标志、数据块数、帧总长度、帧序号、
+  scan_number、开始/停止触发扫描号、USB 丢包数、传输速率、发布时间戳（`time.time()`）
+- 数据块头 `BLOCK_HEADER`：数据流编号（`BLOCK_STREAMS` 中的下标）、数据类型字符、
+  维数、三个维度长度；其后为按 8 字节对齐的 C 顺序数据
+
+TCP/Unix 以帧头中的总长度分帧；UDP 每个数据报恰为一帧，客户端通过定期发送
+`SUB` 数据报订阅（超过 `udp_timeout` 未续订即移除），超过数据报上限的帧被丢弃。
+"""
+
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+import collections
+import socket
+import struct
+import threading
+import time
+import numpy as np
+
+from .dispatch import DispatchFrame
+from .frame import FRAME_STREAMS
+
+
+MAGIC = b'CMTS'
+PROTOCOL_VERSION = 1
+FRAME_HEADER = struct.Struct('<4sBBHIQqqqIId')
+BLOCK_HEADER = struct.Struct('<BBBx3I')
+BLOCK_STREAMS = list(FRAME_STREAMS) + ['rf_lost_packets']
+MAX_DATAGRAM = 65507
+
+FLAG_START_TRIGGER = 0x1
+FLAG_STOP_TRIGGER = 0x2
+
+_SUBSCRIBE = b'SUB'
+_UNSUBSCRIBE = b'UNSUB'
+_DTYPES = {np.dtype(t).char: np.dtype(t) for t in (np.float32, np.float64, np.int16, np.int32, np.int64, np.uint8)}
+
+
+class TransportEnum:
+  TCP = 'tcp'
+  UDP = 'udp'
+  UNIX = 'unix' # 本机 Unix 域流套接字，地址为文件路径
+
+
+class SendPolicyEnum:
+  """订阅者发送队列写满时的处理策略。"""
+  DROP_OLDEST = 'drop_oldest' # 丢弃队列中最旧的帧
+  DROP_NEWEST = 'drop_newest' # 丢弃新到的帧
+  DISCONNECT = 'disconnect'   # 断开该订阅者
+
+
+class NetFrame(NamedTuple):
+  """客户端收到的一帧。`streams` 为 {数据流名: 数组}，布局与 `DispatchFrame.streams` 相同。"""
+  seq: int
+  scan_number: int
+  start_trigger_scan: Optional[int]
+  stop_trigger_scan: Optional[int]
+  usb_lost_packets: int
+  transfer_rate: int
+  timestamp: float
+  streams: Dict[str, np.ndarray]
+
+
+def _padded(n: int) -> int:
+  return (n + 7) & ~7
+
+
+class FrameEncoder:
+  """将事件数据编码为二进制帧，内部复用一块按需增长的缓冲区。"""
+  def __init__(self, initial_size: int = 1 << 16) -> None:
+    self._buf = bytearray(initial_size)
+    self._ids = {name: i for i, name in enumerate(BLOCK_STREAMS)}
+
+  def encode(self,
+             seq: int,
+             scan_number: int,
+             streams: Dict[str, np.ndarray],
+             start_trigger_scan: Optional[int] = None,
+             stop_trigger_scan: Optional[int] = None,
+             usb_lost_packets: int = 0,
+             transfer_rate: int = 0,
+             timestamp: Optional[float] = None) -> bytes:
+    """返回编码后的帧（一次拷贝为 `bytes`，可安全地由多个订阅者共享）。"""
+    size = FRAME_HEADER.size + sum(BLOCK_HEADER.size + _padded(block.nbytes) for block in streams.values())
+    if size > len(self._buf):
+      self._buf = bytearray(_padded(size * 2))
+    buf = self._buf
+    view = memoryview(buf)
+    flags = (FLAG_START_TRIGGER if start_trigger_scan is not None else 0) | (FLAG_STOP_TRIGGER if stop_trigger_scan is not None else 0)
+    FRAME_HEADER.pack_into(buf, 0, MAGIC, PROTOCOL_VERSION, flags, len(streams), size, seq, scan_number,
+                           start_trigger_scan or 0, stop_trigger_scan or 0, usb_lost_packets, transfer_rate,
+                           time.time() if timestamp is None else timestamp)
+    offset = FRAME_HEADER.size
+    for name, block in streams.items():
+      shape = block.shape + (0,) * (3 - block.ndim)
+      BLOCK_HEADER.pack_into(buf, offset, self._ids[name], ord(block.dtype.char), block.ndim, *shape)
+      offset += BLOCK_HEADER.size
+      nbytes = block.nbytes
+      view[offset:offset + nbytes] = np.ascontiguousarray(block).reshape(-1).view(np.uint8)
+      offset += _padded(nbytes)
+    return bytes(view[:size])
+
+
+def decode_frame(data: Union[bytes, bytearray, memoryview]) -> NetFrame:
+  """解码一帧；返回的数组为 `data` 上的只读视图（`bytearray` 时可写）。"""
+  (magic, version, flags, num_blocks, size, seq, scan_number, start_scan, stop_scan,
+   usb_lost, transfer_rate, timestamp) = FRAME_HEADER.unpack_from(data, 0)
+  if magic != MAGIC or version != PROTOCOL_VERSION:
+    raise ValueError("Not a stream frame (magic %r, version %d)" % (magic, version))
+  if len(data) < size:
+    raise ValueError("Truncated frame: %d of %d bytes" % (len(data), size))
+  streams = {}
+  offset = FRAME_HEADER.size
+  for _ in range(num_blocks):
+    stream_id, dtype_char, ndim, *shape = BLOCK_HEADER.unpack_from(data, offset)
+    offset += BLOCK_HEADER.size
+    dtype = _DTYPES[chr(dtype_char)]
+    shape = tuple(shape[:ndim])
+    count = int(np.prod(shape))
+    streams[BLOCK_STREAMS[stream_id]] = np.frombuffer(data, dtype, count, offset).reshape(shape)
+    offset += _padded(count * dtype.itemsize)
+  return NetFrame(seq, scan_number,
+                  start_scan if flags & FLAG_START_TRIGGER else None,
+                  stop_scan if flags & FLAG_STOP_TRIGGER else None,
+                  usb_lost, transfer_rate, timestamp, streams)
+
+
+class _Subscriber:
+  """一个订阅者的发送队列与发送线程。"""
+  def __init__(self, server: 'StreamServer', key: Any, send: Any, queue_size: int, policy: str, on_close: Any = None) -> None:
+    self.key = key
+    self._server = server
+    self._send = send
+    self._on_close = on_close
+    self._queue: collections.deque = collections.deque()
+    self._queue_size = queue_size
+    self._policy = policy
+    self._cond = threading.Condition()
+    self.connected = True
+    self.last_seen = time.monotonic()
+    self.num_sent = 0
+    self.num_dropped = 0
+    self.bytes_sent = 0
+    self._thread = threading.Thread(target=self._run, name='StreamServer-%s' % (key,), daemon=True)
+    self._thread.start()
+
+  def put(self, data: bytes) -> None:
+    with self._cond:
+      if len(self._queue) >= self._queue_size:
+        if self._policy == SendPolicyEnum.DROP_NEWEST:
+          self.num_dropped += 1
+          return
+        if self._policy == SendPolicyEnum.DISCONNECT:
+          self.num_dropped += len(self._queue) + 1
+          self.connected = False
+          self._cond.notify()
+          return
+        self._queue.popleft()
+        self.num_dropped += 1
+      self._queue.append(data)
+      self._cond.notify()
+
+  def _run(self) -> None:
+    while True:
+      with self._cond:
+        while self.connected and not self._queue:
+          self._cond.wait()
+        if not self.connected:
+          break
+        data = self._queue.popleft()
+      try:
+        self._send(data)
+      except OSError:
+        break
+      self.num_sent += 1
+      self.bytes_sent += len(data)
+    self.connected = False
+    if self._on_close is not None:
+      self._on_close()
+    self._server._remove_subscriber(self)
+
+  def close(self) -> None:
+    with self._cond:
+      self.connected = False
+      self._cond.notify()
+
+  def get_stats(self) -> Dict[str, Any]:
+    return {'queued': len(self._queue), 'sent': self.num_sent, 'dropped': self.num_dropped, 'bytes_sent': self.bytes_sent}
+
+
+class StreamServer:
+  """将数据回调发布为二进制帧流的服务端。"""
+  def __init__(self,
+               daq: Any = None,
+               address: Union[Tuple[str, int], str] = ('0.0.0.0', 9200),
+               transport: str = TransportEnum.TCP,
+               streams: Optional[Iterable[str]] = None,
+               queue_size: int = 256,
+               policy: str = SendPolicyEnum.DROP_OLDEST,
+               udp_timeout: float = 5.0) -> None:
+    self._transport = transport
+    self._queue_size = queue_size
+    self._policy = policy
+    self._udp_timeout = udp_timeout
+    self._frame = DispatchFrame(FRAME_STREAMS if streams is None else streams)
+    self._encoder = FrameEncoder()
+    self._lock = threading.Lock()
+    self._subscribers: Dict[Any, _Subscriber] = {}
+    self._seq = 0
+    self._num_oversize = 0
+    self._bytes = 0
+    self._encode_ns = 0
+    self._running = True
+    if transport == TransportEnum.UDP:
+      self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    elif transport == TransportEnum.TCP:
+      self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+      self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    elif transport == TransportEnum.UNIX:
+      self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+      raise ValueError("Unknown transport %r" % transport)
+    self._sock.bind(address)
+    if transport != TransportEnum.UDP:
+      self._sock.listen()
+    self._thread = threading.Thread(target=self._run_udp if transport == TransportEnum.UDP else self._run_accept,
+                                    name='StreamServer-listen', daemon=True)
+    self._thread.start()
+    self._daq = None
+    if daq is not None:
+      self.attach(daq)
+
+  def get_address(self) -> Union[Tuple[str, int], str]:
+    """实际监听的地址（端口为 0 时由系统分配）。"""
+    return self._sock.getsockname()
+
+  def attach(self, daq: Any) -> None:
+    """在 `daq` 上注册数据回调。"""
+    daq.add_on_data_available_handler(self.on_data_available)
+    self._daq = daq
+
+  def detach(self) -> None:
+    """移除数据回调。"""
+    if self._daq is not None:
+      self._daq.remove_on_data_available_handler(self.on_data_available)
+      self._daq = None
+
+  # 订阅者 -----------------------------------------------------------------
+
+  def _run_accept(self) -> None:
+    while self._running:
+      try:
+        conn, addr = self._sock.accept()
+      except OSError:
+        # NOTE: 客户端在握手完成前断开时 accept 会报 ECONNABORTED 等错误，仅在关闭监听后退出。
+        if not self._running:
+          return
+        continue
+      try:
+        if self._transport == TransportEnum.TCP:
+          conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn.shutdown(socket.SHUT_RD)
+      except OSError:
+        conn.close()
+        continue
+      key = addr or 'unix-%d' % conn.fileno()
+      with self._lock:
+        self._subscribers[key] = _Subscriber(self, key, conn.sendall, self._queue_size, self._policy, conn.close)
+
+  def _run_udp(self) -> None:
+    while self._running:
+      try:
+        data, addr = self._sock.recvfrom(64)
+      except OSError:
+        # NOTE: Windows 上向已关闭的 UDP 端口 sendto 后，下一次 recvfrom 会报 WSAECONNRESET；仅在关闭监听后退出。
+        if not self._running:
+          return
+        continue
+      with self._lock:
+        subscriber = self._subscribers.get(addr)
+        if data == _SUBSCRIBE:
+          if subscriber is None:
+            send = lambda frame, addr=addr: self._sock.sendto(frame, addr)
+            subscriber = self._subscribers[addr] = _Subscriber(self, addr, send, self._queue_size, self._policy)
+          subscriber.last_seen = time.monotonic()
+        elif data == _UNSUBSCRIBE and subscriber is not None:
+          subscriber.close()
+
+  def _remove_subscriber(self, subscriber: _Subscriber) -> None:
+    with self._lock:
+      if self._subscribers.get(subscriber.key) is subscriber:
+        del self._subscribers[subscriber.key]
+
+  def get_num_subscribers(self) -> int:
+    """当前订阅者数量。"""
+    return len(self._subscribers)
+
+  # 发布 -------------------------------------------------------------------
+
+  def on_data_available(self, sender: Any, args: Any) -> None:
+    """数据回调：提取数据块、编码为一帧并放入各订阅者的发送队列。"""
+    t0 = time.perf_counter_ns()
+    frame = self._frame
+    frame.fill(self._seq, args)
+    streams = frame.streams
+    rf_lost = args.get_sensor_rf_lost_packets()
+    if rf_lost is not None and len(rf_lost):
+      streams['rf_lost_packets'] = np.asarray(list(rf_lost), np.int32)
+    data = self._encoder.encode(self._seq, frame.scan_number, streams, frame.start_trigger_scan, frame.stop_trigger_scan,
+                                args.get_usb_lost_packets(), args.get_transfer_rate())
+    self._encode_ns += time.perf_counter_ns() - t0
+    self.publish(data)
+
+  def publish(self, data: bytes) -> None:
+    """将已编码的帧放入各订阅者的发送队列。"""
+    self._seq += 1
+    self._bytes += len(data)
+    if self._transport == TransportEnum.UDP and len(data) > MAX_DATAGRAM:
+      self._num_oversize += 1
+      return
+    now = time.monotonic()
+    for subscriber in list(self._subscribers.values()):
+      if self._transport == TransportEnum.UDP and now - subscriber.last_seen > self._udp_timeout:
+        subscriber.close()
+        continue
+      subscriber.put(data)
+
+  def get_stats(self) -> Dict[str, Any]:
+    """发布统计与各订阅者的发送/丢弃计数。"""
+    return {
+      'frames': self._seq,
+      'bytes': self._bytes,
+      'mean_encode_us': self._encode_ns / self._seq / 1000 if self._seq else None,
+      'oversize_dropped': self._num_oversize,
+      'subscribers': {str(key): subscriber.get_stats() for key, subscriber in list(self._subscribers.items())},
+    }
+
+  def close(self) -> None:
+    """移除数据回调，断开所有订阅者并关闭监听套接字。"""
+    self.detach()
+    self._running = False
+    with self._lock:
+      subscribers = list(self._subscribers.values())
+    for subscriber in subscribers:
+      subscriber.close()
+    try:
+      self._sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+      pass
+    self._sock.close()
+    self._thread.join()
+
+  def __enter__(self) -> 'StreamServer':
+    return self
+
+  def __exit__(self, *exc_info: Any) -> None:
+    self.close()
+
+
+class StreamClient:
+  """`StreamServer` 的订阅客户端。"""
+  def __init__(self,
+               address: Union[Tuple[str, int], str],
+               transport: str = TransportEnum.TCP,
+               resubscribe_s: float = 1.0) -> None:
+    self._address = address
+    self._transport = transport
+    self._resubscribe_s = resubscribe_s
+    self._last_subscribe = 0.0
+    self._header = bytearray(FRAME_HEADER.size)
+    self._header_view = memoryview(self._header)
+    self._next_seq: Optional[int] = None
+    self._num_missed = 0
+    if transport == TransportEnum.UDP:
+      self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+      self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+      self._subscribe()
+    elif transport in (TransportEnum.TCP, TransportEnum.UNIX):
+      self._sock = socket.socket(socket.AF_INET if transport == TransportEnum.TCP else socket.AF_UNIX, socket.SOCK_STREAM)
+      self._sock.connect(address)
+    else:
+      raise ValueError("Unknown transport %r" % transport)
+
+  def _subscribe(self) -> None:
+    self._sock.sendto(_SUBSCRIBE, self._address)
+    self._last_subscribe = time.monotonic()
+
+  def _recv_exactly(self, view: memoryview) -> None:
+    while len(view):
+      n = self._sock.recv_into(view)
+      if n == 0:
+        raise ConnectionError("Stream server closed the connection")
+      view = view[n:]
+
+  def _recv_datagram(self, timeout: Optional[float]) -> Optional[memoryview]:
+    # NOTE: 以 `resubscribe_s` 为时间片等待并按时续订，采集暂停超过 `udp_timeout` 时也不会被服务端移除。
+    deadline = None if timeout is None else time.monotonic() + timeout
+    data = bytearray(MAX_DATAGRAM)
+    while True:
+      now = time.monotonic()
+      if now - self._last_subscribe >= self._resubscribe_s:
+        self._subscribe()
+      wait = self._last_subscribe + self._resubscribe_s - now
+      if deadline is not None:
+        wait = min(wait, deadline - now)
+      self._sock.settimeout(max(wait, 0.0))
+      try:
+        n = self._sock.recv_into(data)
+        return memoryview(data)[:n]
+      except (socket.timeout, BlockingIOError):
+        if deadline is not None and time.monotonic() >= deadline:
+          return None
+
+  def recv(self, timeout: Optional[float] = None) -> Optional[NetFrame]:
+    """接收下一帧；超时返回 None，服务端关闭连接时抛出 `ConnectionError`。"""
+    if self._transport == TransportEnum.UDP:
+      data = self._recv_datagram(timeout)
+      if data is None:
+        return None
+    else:
+      self._sock.settimeout(timeout)
+      try:
+        # NOTE: 超时前已读到的部分帧头会保留到下次调用；帧头读完之后不再超时，避免流错位。
+        while len(self._header_view):
+          n = self._sock.recv_into(self._header_view)
+          if n == 0:
+            raise ConnectionError("Stream server closed the connection")
+          self._header_view = self._header_view[n:]
+      except socket.timeout:
+        return None
+      self._header_view = memoryview(self._header)
+      self._sock.settimeout(None)
+      size = FRAME_HEADER.unpack_from(self._header)[4]
+      data = bytearray(size)
+      data[:FRAME_HEADER.size] = self._header
+      self._recv_exactly(memoryview(data)[FRAME_HEADER.size:])
+    frame = decode_frame(data)
+    if self._next_seq is not None and frame.seq > self._next_seq:
+      self._num_missed += frame.seq - self._next_seq
+    self._next_seq = frame.seq + 1
+    return frame
+
+  def __iter__(self) -> Iterator[NetFrame]:
+    """阻塞地逐帧迭代，直至连接关闭。"""
+    while True:
+      try:
+        frame = self.recv()
+      except ConnectionError:
+        return
+      if frame is not None:
+        yield frame
+
+  def get_num_missed(self) -> int:
+    """按帧序号统计的缺失帧数（服务端丢弃或 UDP 丢包）。"""
+    return self._num_missed
+
+  def close(self) -> None:
+    """断开连接（UDP 时通知服务端退订）。"""
+    if self._transport == TransportEnum.UDP:
+      try:
+        self._sock.sendto(_UNSUBSCRIBE, self._address)
+      except OSError:
+        pass
+    self._sock.close()
+
+  def __enter__(self) -> 'StreamClient':
+    return self
+
+  def __exit__(self, *exc_info: Any) -> None:
+    self.close()
@@ -0,0 +1,287 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+传感器内存批量下载引擎。
+
+`MemoryOffloadEngine` 基于 `CometaDaqSystem.start_selective_memory_reading()`
+与 `SensorMemoryDataAvailable` 事件按试次排队下载：
+- 回调中仅批量拷贝数据，解码/转换与写盘交给线程池；
+- 每个数据块按到达序号写为 `trial_<id>/chunk_<seq>.npz`，边到达边落盘；
+- 试次结束后写入清单并记录到 `offload_state.json`，中断后重新运行时跳过
+  已完成的试次，从第一个未完成的试次重新开始；
+- 单个试次失败时记录到状态文件并继续下载其余试次，全部结束后汇总抛出 `OffloadError`；
+- 以 `get_current_trial_id()` 校验数据块所属试次，丢弃其他试次的残留数据块；
+- 统计吞吐（MB/s）、进度（`get_transfer_progress()` 等）与丢包（`get_lost_packets()`）。
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+import json
+import os
+import shutil
+import threading
+import time
+import numpy as np
+
+from .constants import DeviceErrorEnum
+from .recorder import extract_raw_streams, to_sample_major
+
+
+STATE_FILE = 'offload_state.json'
+MANIFEST_FILE = 'manifest.json'
+
+
+class OffloadError(Exception):
+  """一个或多个试次下载失败（设备报告错误码、超时或写盘失败）。`errors` 为 {试次 ID: 错误描述}。"""
+  def __init__(self, errors: Dict[int, str]) -> None:
+    super().__init__("Offloading failed for %s" % ', '.join('trial %d (%s)' % (trial_id, e) for trial_id, e in errors.items()))
+    self.errors = errors
+
+
+class _TrialState:
+  """单个试次下载过程中的可变状态。"""
+  def __init__(self, trial_id: int, path: str) -> None:
+    self.trial_id = trial_id
+    self.path = path
+    self.done = threading.Event()
+    self.futures = [] # type: List[Future]
+    self.num_chunks = 0
+    self.num_samples = 0
+    self.num_bytes = 0
+    self.lost_packets = 0
+    self.sensor_lost_packets = [] # type: List[int]
+    self.num_foreign_chunks = 0 # 属于其他试次而被丢弃的数据块
+    self.error = None # type: Optional[str]
+    self.start_time = time.perf_counter()
+
+
+class MemoryOffloadEngine:
+  """按试次下载传感器内存并异步解码写盘，支持断点续传。
+
+  参数：
+  - daq: `CometaDaqSystem`（或同接口的模拟设备）。
+  - output_dir: 输出目录，每个试次一个子目录。
+  - max_workers: 解码/写盘线程池大小。
+  - converter: 可选的 `{模态: 样本主序数组} -> {模态: 数组}` 转换函数，在线程池中执行。
+  - trial_timeout: 单个试次的最长等待时间（秒）。
+  - on_progress: 可选回调 `(trial_id, 总进度%, 当前试次进度%)`，在 SDK 线程上调用，须轻量。
+  """
+  def __init__(self,
+               daq: Any,
+               output_dir: str,
+               max_workers: int = 4,
+               converter: Optional[Callable[[Dict[str, np.ndarray]], Dict[str, np.ndarray]]] = None,
+               trial_timeout: float = 3600.0,
+               on_progress: Optional[Callable[[int, int, int], None]] = None) -> None:
+    self._daq = daq
+    self._output_dir = output_dir
+    self._max_workers = max_workers
+    self._converter = converter
+    self._trial_timeout = trial_timeout
+    self._on_progress = on_progress
+    os.makedirs(output_dir, exist_ok=True)
+    self._state = self._load_state()
+    self._trial = None # type: Optional[_TrialState]
+    self._num_saved_trials = None # type: Optional[int]
+    self._transfer_progress = 0
+    self._trial_progress = 0
+    self._transfer_rate = 0
+    self._total_bytes = 0
+    self._pool = None # type: Optional[ThreadPoolExecutor]
+    self._lock = threading.Lock()
+    self._elapsed = 0.0
+
+  def _load_state(self) -> Dict[str, Any]:
+    path = os.path.join(self._output_dir, STATE_FILE)
+    if os.path.exists(path):
+      with open(path) as f:
+        return json.load(f)
+    return {'completed': {}, 'failed': {}}
+
+  def _save_state(self) -> None:
+    path = os.path.join(self._output_dir, STATE_FILE)
+    with open(path + '.tmp', 'w') as f:
+      json.dump(self._state, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+  def is_completed(self, trial_id: int) -> bool:
+    """试次是否已完整下载（含之前的运行）。"""
+    return str(trial_id) in self._state['completed']
+
+  def get_completed_trials(self) -> List[int]:
+    """已完成的试次 ID。"""
+    return sorted(int(k) for k in self._state['completed'])
+
+  def run(self, trial_ids: Optional[Iterable[int]] = None, first_trial_id: int = 1) -> Dict[str, Any]:
+    """依次下载 `trial_ids` 中尚未完成的试次，返回统计信息。
+
+    `trial_ids` 为 None 时从 `first_trial_id` 开始，根据事件报告的
+    `get_num_saved_trials()` 下载全部试次。失败的试次不会中断其余试次，
+    全部结束后抛出汇总的 `OffloadError`。
+    """
+    errors = {} # type: Dict[int, str]
+    self._daq.add_on_sensor_memory_data_available_handler(self.on_sensor_memory_data_available)
+    pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='MemoryOffload')
+    try:
+      if trial_ids is not None:
+        for trial_id in trial_ids:
+          if not self.is_completed(trial_id):
+            self._offload_trial(trial_id, pool, errors)
+      else:
+        # 试次总数由内存数据事件报告，并随状态文件保存以便续传。
+        self._num_saved_trials = self._num_saved_trials or self._state.get('num_saved_trials')
+        trial_id = first_trial_id
+        while self._num_saved_trials is None or trial_id < first_trial_id + self._num_saved_trials:
+          if not self.is_completed(trial_id):
+            self._offload_trial(trial_id, pool, errors)
+            if self._num_saved_trials is None:
+              break # 未收到任何事件，无法得知试次总数
+          trial_id += 1
+    finally:
+      pool.shutdown(wait=True)
+      self._daq.remove_on_sensor_memory_data_available_handler(self.on_sensor_memory_data_available)
+    if errors:
+      raise OffloadError(errors)
+    return self.get_stats()
+
+  def _offload_trial(self, trial_id: int, pool: ThreadPoolExecutor, errors: Dict[int, str]) -> None:
+    path = os.path.join(self._output_dir, 'trial_%d' % trial_id)
+    if os.path.exists(path):
+      shutil.rmtree(path) # 上次中断留下的不完整试次
+    os.makedirs(path)
+    trial = _TrialState(trial_id, path)
+    self._pool = pool
+    self._trial = trial
+    finished = False
+    try:
+      self._daq.start_selective_memory_reading(trial_id)
+      finished = trial.done.wait(self._trial_timeout)
+    except Exception as e:
+      trial.error = trial.error or repr(e)
+    finally:
+      self._daq.stop_selective_memory_reading()
+      self._trial = None
+    for future in trial.futures:
+      try:
+        future.result()
+      except Exception as e:
+        trial.error = trial.error or 'write failed: %r' % e
+    elapsed = time.perf_counter() - trial.start_time
+    self._elapsed += elapsed
+    summary = {
+      'num_chunks': trial.num_chunks,
+      'num_samples': trial.num_samples,
+      'num_bytes': trial.num_bytes,
+      'lost_packets': trial.lost_packets,
+      'sensor_lost_packets': trial.sensor_lost_packets,
+      'num_foreign_chunks': trial.num_foreign_chunks,
+      'elapsed_s': elapsed,
+    }
+    if not finished or trial.error is not None:
+      summary['error'] = trial.error or 'timeout'
+      errors[trial_id] = summary['error']
+      self._state['failed'][str(trial_id)] = summary
+      self._save_state()
+      return
+    with open(os.path.join(path, MANIFEST_FILE), 'w') as f:
+      json.dump(summary, f, indent=2)
+    self._state['failed'].pop(str(trial_id), None)
+    self._state['completed'][str(trial_id)] = summary
+    if self._num_saved_trials is not None:
+      self._state['num_saved_trials'] = self._num_saved_trials
+    self._save_state()
+
+  def on_sensor_memory_data_available(self, sender: Any, args: Any) -> None:
+    """内存数据回调：批量拷贝数据并提交给线程池。"""
+    trial = self._trial
+    if trial is None or trial.done.is_set():
+      return
+    if args.get_current_trial_id() != trial.trial_id:
+      trial.num_foreign_chunks += 1 # 上一试次停止后仍在途的数据块
+      return
+    error = DeviceErrorEnum.coerce(args.get_error_code())
+    if error != DeviceErrorEnum.SUCCESS:
+      trial.error = error.name
+      trial.done.set()
+      return
+    self._num_saved_trials = args.get_num_saved_trials()
+    self._transfer_progress = args.get_transfer_progress()
+    self._trial_progress = args.get_current_trial_transfer_progress()
+    self._transfer_rate = args.get_transfer_rate()
+    trial.lost_packets = args.get_lost_packets()
+    trial.sensor_lost_packets = list(args.get_sensor_lost_packets())
+    raw = extract_raw_streams(args)
+    if raw:
+      seq = trial.num_chunks
+      trial.num_chunks += 1
+      trial.futures.append(self._pool.submit(self._write_chunk, trial, seq, raw))
+    if self._on_progress is not None:
+      self._on_progress(trial.trial_id, self._transfer_progress, self._trial_progress)
+    if args.is_trial_end():
+      trial.done.set()
+
+  def _write_chunk(self, trial: _TrialState, seq: int, raw: Dict[str, np.ndarray]) -> None:
+    blocks = to_sample_major(raw)
+    if self._converter is not None:
+      blocks = self._converter(blocks)
+    path = os.path.join(trial.path, 'chunk_%06d.npz' % seq)
+    np.savez(path + '.tmp', **blocks)
+    os.replace(path + '.tmp.npz', path)
+    num_bytes = sum(block.nbytes for block in blocks.values())
+    with self._lock:
+      trial.num_bytes += num_bytes
+      trial.num_samples += blocks['emg'].shape[0] if 'emg' in blocks else 0
+      self._total_bytes += num_bytes
+
+  def get_stats(self) -> Dict[str, Any]:
+    """返回吞吐、进度与丢包统计。"""
+    trial = self._trial
+    elapsed = self._elapsed + (time.perf_counter() - trial.start_time if trial is not None else 0.0)
+    return {
+      'completed_trials': self.get_completed_trials(),
+      'failed_trials': sorted(int(k) for k in self._state['failed']),
+      'current_trial_id': trial.trial_id if trial is not None else None,
+      'num_saved_trials': self._num_saved_trials,
+      'transfer_progress': self._transfer_progress,
+      'current_trial_transfer_progress': self._trial_progress,
+      'device_transfer_rate': self._transfer_rate,
+      'num_bytes': self._total_bytes,
+      'throughput_mb_s': self._total_bytes / 1e6 / elapsed if elapsed > 0 else 0.0,
+      'lost_packets': sum(t['lost_packets'] for t in self._state['completed'].values()) + (trial.lost_packets if trial is not None else 0),
+    }
+
+
+def load_trial(path: str) -> Dict[str, np.ndarray]:
+  """按序拼接 `trial_<id>` 目录中的所有数据块，返回 {模态: 样本主序数组}。"""
+  chunks = sorted(f for f in os.listdir(path) if f.startswith('chunk_') and f.endswith('.npz'))
+  parts = {} # type: Dict[str, List[np.ndarray]]
+  for name in chunks:
+    with np.load(os.path.join(path, name)) as data:
+      for key in data.files:
+        parts.setdefault(key, []).append(data[key])
+  return {key: np.concatenate(blocks) for key, blocks in parts.items()}
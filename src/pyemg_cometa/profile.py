@@ -0,0 +1,392 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+声明式设备配置（Setup Profile）与幂等下发。
+
+`SetupProfile` 以纯 Python 描述一次会话需要的设备状态：采集配置（采样率、IMU
+模式、外部触发、FSW 协议/通道/阈值）、各传感器的类型与量程、启用的传感器集合、
+FSW 开关以及需要做加速度计零偏检测的传感器。
+
+`ProfileApplier.apply()` 将目标配置与客户端缓存的“上次成功下发的设备状态”比较，
+只发送发生变化的命令，并记录每一步的耗时。缓存可持久化为 JSON 文件，使重启
+后的会话在配置未变时几乎不产生设备往返。
+
+NOTE: 缓存只反映本客户端下发过的状态。设备重新上电或被其它程序修改后，应调用
+`invalidate()` 或以 `force=True` 下发。
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+import json
+import os
+import time
+
+from .constants import (
+  AccelerometerFullScaleEnum,
+  FootSwProtocolEnum,
+  GyroscopeFullScaleEnum,
+  ImuAcqTypeEnum,
+  SamplingRateEnum,
+  SensorTypeEnum,
+)
+
+
+FSW_TRANSDUCERS = ('a', '1', '5', 't')
+
+
+def _enum_name(enum_cls: Any, value: Any) -> Optional[str]:
+  return enum_cls.coerce(value).name if value is not None else None
+
+
+class SensorProfile:
+  """单个传感器的目标配置。"""
+  __slots__ = ('sensor_type', 'accelerometer_full_scale', 'gyroscope_full_scale', 'enabled', 'detect_accelerometer_offset')
+
+  def __init__(self,
+               sensor_type: Any = SensorTypeEnum.EMG_SENSOR,
+               accelerometer_full_scale: Any = AccelerometerFullScaleEnum.G_2,
+               gyroscope_full_scale: Any = GyroscopeFullScaleEnum.DPS_250,
+               enabled: bool = True,
+               detect_accelerometer_offset: bool = False) -> None:
+    self.sensor_type = SensorTypeEnum.coerce(sensor_type)
+    self.accelerometer_full_scale = AccelerometerFullScaleEnum.coerce(accelerometer_full_scale)
+    self.gyroscope_full_scale = GyroscopeFullScaleEnum.coerce(gyroscope_full_scale)
+    self.enabled = bool(enabled)
+    self.detect_accelerometer_offset = bool(detect_accelerometer_offset)
+
+  def get_configuration_dict(self) -> Dict[str, Any]:
+    """`set_sensor_configuration` 涉及的字段。"""
+    return {
+      'sensor_type': self.sensor_type.name,
+      'accelerometer_full_scale': self.accelerometer_full_scale.name,
+      'gyroscope_full_scale': self.gyroscope_full_scale.name,
+    }
+
+  def to_dict(self) -> Dict[str, Any]:
+    d = self.get_configuration_dict()
+    d['enabled'] = self.enabled
+    d['detect_accelerometer_offset'] = self.detect_accelerometer_offset
+    return d
+
+  @classmethod
+  def from_dict(cls, d: Dict[str, Any]) -> 'SensorProfile':
+    return cls(**d)
+
+  def __eq__(self, other: Any) -> bool:
+    return isinstance(other, SensorProfile) and self.to_dict() == other.to_dict()
+
+  def __repr__(self) -> str:
+    return 'SensorProfile(%s)' % ', '.join('%s=%r' % kv for kv in self.to_dict().items())
+
+
+class CaptureProfile:
+  """采集配置的目标值。FSW 通道启用状态/阈值以 {'a'|'1'|'5'|'t': 值} 表示，None 表示不设置。"""
+  __slots__ = ('sampling_rate', 'imu_acq_type', 'external_trigger_enabled', 'external_trigger_level', 'fsw_protocol',
+               'fsw_a_enabled', 'fsw_a_threshold', 'fsw_b_enabled', 'fsw_b_threshold')
+
+  def __init__(self,
+               sampling_rate: Any = SamplingRateEnum.HZ_2000,
+               imu_acq_type: Any = ImuAcqTypeEnum.RAW_DATA,
+               external_trigger_enabled: bool = False,
+               external_trigger_level: int = 0,
+               fsw_protocol: Any = None,
+               fsw_a_enabled: Optional[Dict[str, bool]] = None,
+               fsw_a_threshold: Optional[Dict[str, float]] = None,
+               fsw_b_enabled: Optional[Dict[str, bool]] = None,
+               fsw_b_threshold: Optional[Dict[str, float]] = None) -> None:
+    self.sampling_rate = SamplingRateEnum.coerce(sampling_rate)
+    self.imu_acq_type = ImuAcqTypeEnum.coerce(imu_acq_type)
+    self.external_trigger_enabled = bool(external_trigger_enabled)
+    self.external_trigger_level = int(external_trigger_level)
+    self.fsw_protocol = FootSwProtocolEnum.coerce(fsw_protocol) if fsw_protocol is not None else None
+    self.fsw_a_enabled = self._transducers(fsw_a_enabled, bool)
+    self.fsw_a_threshold = self._transducers(fsw_a_threshold, float)
+    self.fsw_b_enabled = self._transducers(fsw_b_enabled, bool)
+    self.fsw_b_threshold = self._transducers(fsw_b_threshold, float)
+
+  @staticmethod
+  def _transducers(values: Optional[Dict[str, Any]], cast: Callable[[Any], Any]) -> Optional[Dict[str, Any]]:
+    if values is None:
+      return None
+    unknown = set(values) - set(FSW_TRANSDUCERS)
+    if unknown:
+      raise ValueError("Unknown FSW transducers: %s" % ', '.join(sorted(unknown)))
+    return {k: cast(values[k]) for k in FSW_TRANSDUCERS if k in values}
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      'sampling_rate': self.sampling_rate.name,
+      'imu_acq_type': self.imu_acq_type.name,
+      'external_trigger_enabled': self.external_trigger_enabled,
+      'external_trigger_level': self.external_trigger_level,
+      'fsw_protocol': _enum_name(FootSwProtocolEnum, self.fsw_protocol),
+      'fsw_a_enabled': self.fsw_a_enabled,
+      'fsw_a_threshold': self.fsw_a_threshold,
+      'fsw_b_enabled': self.fsw_b_enabled,
+      'fsw_b_threshold': self.fsw_b_threshold,
+    }
+
+  @classmethod
+  def from_dict(cls, d: Dict[str, Any]) -> 'CaptureProfile':
+    return cls(**d)
+
+  def __eq__(self, other: Any) -> bool:
+    return isinstance(other, CaptureProfile) and self.to_dict() == other.to_dict()
+
+  def __repr__(self) -> str:
+    return 'CaptureProfile(%s)' % ', '.join('%s=%r' % kv for kv in self.to_dict().items())
+
+
+class SetupProfile:
+  """一次会话的完整目标设备状态。
+
+  参数：
+  - capture: `CaptureProfile`。
+  - sensors: {sensor_id: SensorProfile}；未列出的传感器不做任何操作。
+  - fsw_enabled: 是否启用 FSW 传感器；None 表示不设置。
+  """
+  __slots__ = ('capture', 'sensors', 'fsw_enabled')
+
+  def __init__(self,
+               capture: Optional[CaptureProfile] = None,
+               sensors: Optional[Dict[int, SensorProfile]] = None,
+               fsw_enabled: Optional[bool] = None) -> None:
+    self.capture = capture or CaptureProfile()
+    self.sensors = {int(k): v for k, v in (sensors or {}).items()}
+    self.fsw_enabled = fsw_enabled
+
+  @classmethod
+  def uniform(cls, sensor_ids: Iterable[int], sensor: Optional[SensorProfile] = None, **kwargs: Any) -> 'SetupProfile':
+    """所有传感器使用同一配置的便捷构造。"""
+    sensor = sensor or SensorProfile()
+    return cls(sensors={i: SensorProfile.from_dict(sensor.to_dict()) for i in sensor_ids}, **kwargs)
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      'capture': self.capture.to_dict(),
+      'sensors': {str(k): v.to_dict() for k, v in sorted(self.sensors.items())},
+      'fsw_enabled': self.fsw_enabled,
+    }
+
+  @classmethod
+  def from_dict(cls, d: Dict[str, Any]) -> 'SetupProfile':
+    return cls(CaptureProfile.from_dict(d['capture']) if d.get('capture') else None,
+               {int(k): SensorProfile.from_dict(v) for k, v in d.get('sensors', {}).items()},
+               d.get('fsw_enabled'))
+
+  @classmethod
+  def load(cls, path: str) -> 'SetupProfile':
+    """从 JSON 文件读取。"""
+    with open(path) as f:
+      return cls.from_dict(json.load(f))
+
+  def save(self, path: str) -> None:
+    """保存为 JSON 文件。"""
+    with open(path, 'w') as f:
+      json.dump(self.to_dict(), f, indent=2)
+
+  def __eq__(self, other: Any) -> bool:
+    return isinstance(other, SetupProfile) and self.to_dict() == other.to_dict()
+
+
+def build_capture_configuration(capture: CaptureProfile, factory: Optional[Callable[[], Any]] = None) -> Any:
+  """由 `CaptureProfile` 构造采集配置对象（默认 `CometaCaptureConfiguration`）。"""
+  if factory is None:
+    from .capture_configuration import CometaCaptureConfiguration
+    factory = CometaCaptureConfiguration
+  config = factory()
+  config.set_sampling_rate(capture.sampling_rate)
+  config.set_imu_acq_type(capture.imu_acq_type)
+  config.set_external_trigger_status(capture.external_trigger_enabled)
+  config.set_trigger_level(capture.external_trigger_level)
+  if capture.fsw_protocol is not None:
+    config.set_fsw_protocol(capture.fsw_protocol)
+  for side in ('a', 'b'):
+    enabled = getattr(capture, 'fsw_%s_enabled' % side)
+    if enabled is not None:
+      target = getattr(config, 'get_fsw_%s_is_enabled' % side)()
+      for transducer, value in enabled.items():
+        getattr(target, 'set_transducer_%s' % transducer)(value)
+      getattr(config, 'set_fsw_%s_is_enabled' % side)(target)
+    threshold = getattr(capture, 'fsw_%s_threshold' % side)
+    if threshold is not None:
+      target = getattr(config, 'get_fsw_%s_threshold' % side)()
+      for transducer, value in threshold.items():
+        getattr(target, 'set_transducer_%s' % transducer)(value)
+      getattr(config, 'set_fsw_%s_threshold' % side)(target)
+  return config
+
+
+def build_sensor_configuration(sensor: SensorProfile, factory: Optional[Callable[[], Any]] = None) -> Any:
+  """由 `SensorProfile` 构造传感器配置对象（默认 `CometaSensorConfiguration`）。"""
+  if factory is None:
+    from .sensor_configuration import CometaSensorConfiguration
+    factory = CometaSensorConfiguration
+  config = factory()
+  config.set_sensor_type(sensor.sensor_type)
+  config.set_accelerometer_full_scale(sensor.accelerometer_full_scale)
+  config.set_gyroscope_full_scale(sensor.gyroscope_full_scale)
+  return config
+
+
+class ApplyStep(NamedTuple):
+  """`apply()` 中的一步。"""
+  command: str
+  target: Optional[int]
+  duration_s: float
+
+
+class ApplyReport:
+  """`apply()` 的结果：实际执行的命令、跳过的命令数与总耗时。"""
+  def __init__(self) -> None:
+    self.steps = [] # type: List[ApplyStep]
+    self.num_skipped = 0
+    self.duration_s = 0.0
+
+  @property
+  def num_commands(self) -> int:
+    return len(self.steps)
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      'num_commands': self.num_commands,
+      'num_skipped': self.num_skipped,
+      'duration_s': self.duration_s,
+      'steps': [step._asdict() for step in self.steps],
+    }
+
+  def __repr__(self) -> str:
+    return 'ApplyReport(num_commands=%d, num_skipped=%d, duration_s=%.3f)' % (self.num_commands, self.num_skipped, self.duration_s)
+
+
+class ProfileApplier:
+  """按差异下发 `SetupProfile` 并维护“上次下发状态”缓存。
+
+  参数：
+  - daq: 设备对象。
+  - cache_path: 缓存 JSON 文件路径；None 时仅缓存在内存中。
+  - device_key: 缓存中区分设备的键（如接收器序列号），一个缓存文件可保存多个设备。
+  - capture_factory / sensor_factory: 配置对象工厂，默认使用 .NET 包装类型；不加载 CLR 时可使用
+    `snapshots.CaptureConfigurationSnapshot.default`/`snapshots.SensorConfigurationSnapshot.default`。
+  """
+  def __init__(self,
+               daq: Any,
+               cache_path: Optional[str] = None,
+               device_key: str = 'default',
+               capture_factory: Optional[Callable[[], Any]] = None,
+               sensor_factory: Optional[Callable[[], Any]] = None) -> None:
+    self._daq = daq
+    self._cache_path = cache_path
+    self._device_key = device_key
+    self._capture_factory = capture_factory
+    self._sensor_factory = sensor_factory
+    self._cache = self._load_cache()
+
+  def _load_cache(self) -> Dict[str, Any]:
+    if self._cache_path is not None and os.path.exists(self._cache_path):
+      with open(self._cache_path) as f:
+        return json.load(f).get(self._device_key, {})
+    return {}
+
+  def _save_cache(self) -> None:
+    if self._cache_path is None:
+      return
+    caches = {}
+    if os.path.exists(self._cache_path):
+      with open(self._cache_path) as f:
+        caches = json.load(f)
+    caches[self._device_key] = self._cache
+    tmp = self._cache_path + '.tmp'
+    with open(tmp, 'w') as f:
+      json.dump(caches, f, indent=2)
+    os.replace(tmp, self._cache_path)
+
+  def get_cached_state(self) -> Dict[str, Any]:
+    """缓存的上次下发状态。"""
+    return self._cache
+
+  def invalidate(self) -> None:
+    """清空缓存（如设备重新上电后），下次 `apply()` 将下发全部命令。"""
+    self._cache = {}
+    self._save_cache()
+
+  def _run(self, report: ApplyReport, command: str, target: Optional[int], func: Callable[[], Any]) -> None:
+    t0 = time.perf_counter()
+    func()
+    report.steps.append(ApplyStep(command, target, time.perf_counter() - t0))
+
+  def apply(self, profile: SetupProfile, force: bool = False) -> ApplyReport:
+    """下发与缓存不同的配置项，返回 `ApplyReport`。每一步成功后即更新缓存。"""
+    report = ApplyReport()
+    t0 = time.perf_counter()
+    cache = {} if force else self._cache
+    self._cache = cache
+    sensors = cache.setdefault('sensors', {})
+    try:
+      capture = profile.capture.to_dict()
+      if cache.get('capture') != capture:
+        config = build_capture_configuration(profile.capture, self._capture_factory)
+        self._run(report, 'set_capture_configuration', None, lambda: self._daq.set_capture_configuration(config))
+        cache['capture'] = capture
+      else:
+        report.num_skipped += 1
+
+      for sensor_id, sensor in sorted(profile.sensors.items()):
+        cached = sensors.setdefault(str(sensor_id), {})
+        configuration = sensor.get_configuration_dict()
+        changed = cached.get('configuration') != configuration
+        if changed:
+          config = build_sensor_configuration(sensor, self._sensor_factory)
+          self._run(report, 'set_sensor_configuration', sensor_id, lambda: self._daq.set_sensor_configuration(config, sensor_id))
+          cached['configuration'] = configuration
+          cached.pop('accelerometer_offset_detected', None)
+        else:
+          report.num_skipped += 1
+        if cached.get('enabled') != sensor.enabled:
+          command = 'enable_sensor' if sensor.enabled else 'disable_sensor'
+          self._run(report, command, sensor_id, lambda: getattr(self._daq, command)(sensor_id))
+          cached['enabled'] = sensor.enabled
+        else:
+          report.num_skipped += 1
+        if sensor.detect_accelerometer_offset:
+          if not cached.get('accelerometer_offset_detected'):
+            self._run(report, 'detect_accelerometer_offset', sensor_id, lambda: self._daq.detect_accelerometer_offset(sensor_id))
+            cached['accelerometer_offset_detected'] = True
+          else:
+            report.num_skipped += 1
+
+      if profile.fsw_enabled is not None:
+        if cache.get('fsw_enabled') != profile.fsw_enabled:
+          command = 'enable_fsw_sensors' if profile.fsw_enabled else 'disable_fsw_sensors'
+          self._run(report, command, None, getattr(self._daq, command))
+          cache['fsw_enabled'] = profile.fsw_enabled
+        else:
+          report.num_skipped += 1
+    finally:
+      report.duration_s = time.perf_counter() - t0
+      self._save_cache()
+    return report
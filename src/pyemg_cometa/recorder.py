@@ -0,0 +1,354 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+流式二进制记录器。
+
+`StreamRecorder` 通过 `add_on_data_available_handler` 订阅数据事件，回调中
+只提取各模态数据块并放入队列；后台写线程以大缓冲区顺序追加写入。
+
+记录为一个目录：
+- `header.json`：格式版本、采集配置与各传感器配置、各数据流描述（类型、每样本形状、采样率）；
+- `<stream>.bin`：各数据流按样本主序（样本, 通道[, 分量]）连续追加的原始数组；
+- `chunks.bin`：每个事件一条定长记录（scan_number、触发、丢包与各数据流起始样本）。
+
+读取时 `RecordingReader` 使用 `numpy.memmap` 映射各文件，按样本序号或时间
+切片均为 O(1)，不需要读入整个文件。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+from .arrays import to_numpy_2d
+from .constants import get_modality_rates
+from .frame import FRAME_STREAMS
+from .snapshots import CaptureConfigurationSnapshot, SensorConfigurationSnapshot
+
+
+FORMAT_VERSION = 1
+HEADER_FILE = 'header.json'
+CHUNKS_FILE = 'chunks.bin'
+
+# 已为样本主序、无需转置的数据流。
+_SAMPLE_MAJOR_STREAMS = ('fsw', 'sync')
+
+# 数据流名 -> (事件参数方法, 数据类型, 是否为 [通道][样本] 布局需转置为样本主序)，由 `frame.FRAME_STREAMS` 派生。
+# NOTE: 传感器状态没有 `_as_numpy` 方法，由原始 getter 转换。
+STREAMS = {
+  name: (None if name == 'sensor_states' else getter + '_as_numpy', dtype, name not in _SAMPLE_MAJOR_STREAMS)
+  for name, (getter, _, _, dtype) in FRAME_STREAMS.items()
+}
+
+CHUNK_FLAG_START_TRIGGER = 0x1
+CHUNK_FLAG_STOP_TRIGGER = 0x2
+
+CHUNK_DTYPE = np.dtype([
+  ('scan_number', '<i8'),
+  ('start_trigger_scan', '<i8'),
+  ('stop_trigger_scan', '<i8'),
+  ('flags', '<u4'),
+  ('usb_lost_packets', '<u4'),
+  ('timestamp', '<f8'),
+] + [(name + '_start', '<i8') for name in STREAMS])
+
+
+def describe_capture_configuration(capture_config: Any) -> Optional[Dict[str, Any]]:
+  """将采集配置读取为可写入 JSON 的字典（枚举以成员名保存）。"""
+  if capture_config is None:
+    return None
+  if hasattr(capture_config, 'to_dict'):
+    return capture_config.to_dict()
+  return CaptureConfigurationSnapshot.capture(capture_config).to_dict()
+
+
+def describe_sensor_configuration(sensor_config: Any) -> Optional[Dict[str, Any]]:
+  """将单个传感器配置读取为可写入 JSON 的字典。"""
+  if sensor_config is None:
+    return None
+  if hasattr(sensor_config, 'to_dict'):
+    return sensor_config.to_dict()
+  return SensorConfigurationSnapshot.capture(sensor_config).to_dict()
+
+
+def extract_raw_streams(args: Any) -> Dict[str, np.ndarray]:
+  """从（在线或内存）事件参数中批量拷贝所有非空数据流，保持 SDK 的 [通道][样本] 布局。"""
+  blocks = {}
+  for name, (getter, dtype, _) in STREAMS.items():
+    if getter is None:
+      block = to_numpy_2d(args.get_sensor_states(), dtype)
+    elif hasattr(args, getter):
+      block = getattr(args, getter)(dtype)
+    else:
+      continue # 如内存数据事件没有同步通道
+    if block.size == 0:
+      continue
+    blocks[name] = block
+  return blocks
+
+
+def to_sample_major(blocks: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+  """将 `extract_raw_streams` 的结果转换为样本主序（样本, 通道[, 分量]）的连续数组。"""
+  return {name: np.ascontiguousarray(block.swapaxes(0, 1) if STREAMS[name][2] else block) for name, block in blocks.items()}
+
+
+def extract_streams(args: Any) -> Dict[str, np.ndarray]:
+  """从（在线或内存）事件参数中提取所有非空数据流，返回样本主序的连续数组。"""
+  return to_sample_major(extract_raw_streams(args))
+
+
+class StreamRecorder:
+  """将 `DataAvailable` 事件流式写入分块二进制记录目录。
+
+  参数：
+  - path: 记录目录（不存在时创建，已有数据流文件时拒绝覆盖）。
+  - capture_configuration: 采集配置（`CometaCaptureConfiguration` 或快照），写入头部并用于推导采样率。
+  - sensor_configurations: {sensor_id: 传感器配置}，写入头部。
+  - queue_size: 待写事件队列长度；队列满时丢弃新事件并计数，从不阻塞 SDK 线程。
+  - buffer_size: 每个文件的写缓冲区字节数。
+  """
+  def __init__(self,
+               path: str,
+               capture_configuration: Any = None,
+               sensor_configurations: Optional[Dict[int, Any]] = None,
+               queue_size: int = 1024,
+               buffer_size: int = 1 << 20) -> None:
+    self._path = path
+    self._buffer_size = buffer_size
+    os.makedirs(path, exist_ok=True)
+    if os.path.exists(os.path.join(path, CHUNKS_FILE)):
+      raise FileExistsError("Recording already exists at %r" % path)
+    capture = describe_capture_configuration(capture_configuration)
+    rates = get_modality_rates(capture['imu_acq_type'], capture['sampling_rate']) if capture else {}
+    self._header = {
+      'format_version': FORMAT_VERSION,
+      'created': time.time(),
+      'capture_configuration': capture,
+      'sensor_configurations': {str(k): describe_sensor_configuration(v) for k, v in (sensor_configurations or {}).items()},
+      'rates_hz': rates,
+      'chunk_dtype': CHUNK_DTYPE.descr,
+      'streams': {},
+    }
+    self._write_header()
+    self._files = {} # type: Dict[str, Any]
+    self._num_samples = dict.fromkeys(STREAMS, 0)
+    self._chunks = open(os.path.join(path, CHUNKS_FILE), 'ab', buffering=self._buffer_size)
+    self._queue = queue.Queue(maxsize=queue_size) # type: queue.Queue
+    self._num_events = 0
+    self._num_dropped = 0
+    self._num_bytes = 0
+    self._error = None # type: Optional[BaseException]
+    self._thread = threading.Thread(target=self._run, name='StreamRecorder', daemon=True)
+    self._thread.start()
+
+  @classmethod
+  def from_daq(cls, daq: Any, path: str, **kwargs: Any) -> 'StreamRecorder':
+    """读取 `daq` 当前的采集与传感器配置创建记录器，并注册数据回调。"""
+    sensor_configurations = {i: daq.get_sensor_configuration(i) for i in range(daq.get_num_installed_sensors())}
+    recorder = cls(path, daq.get_capture_configuration(), sensor_configurations, **kwargs)
+    recorder.attach(daq)
+    return recorder
+
+  @property
+  def path(self) -> str:
+    """记录目录。"""
+    return self._path
+
+  def attach(self, daq: Any) -> None:
+    """在 `daq` 上注册数据回调。"""
+    daq.add_on_data_available_handler(self.on_data_available)
+
+  def detach(self, daq: Any) -> None:
+    """从 `daq` 上移除数据回调。"""
+    daq.remove_on_data_available_handler(self.on_data_available)
+
+  def on_data_available(self, sender: Any, args: Any) -> None:
+    """数据回调：仅批量拷贝原始布局的数据并入队，转换为样本主序在写线程中进行。"""
+    chunk = np.zeros((), dtype=CHUNK_DTYPE)
+    chunk['scan_number'] = args.scan_number()
+    chunk['timestamp'] = time.time()
+    flags = 0
+    if args.is_start_trigger_detected():
+      flags |= CHUNK_FLAG_START_TRIGGER
+      chunk['start_trigger_scan'] = args.start_trigger_scan()
+    if args.is_stop_trigger_detected():
+      flags |= CHUNK_FLAG_STOP_TRIGGER
+      chunk['stop_trigger_scan'] = args.stop_trigger_scan()
+    chunk['flags'] = flags
+    chunk['usb_lost_packets'] = args.get_usb_lost_packets()
+    try:
+      self._queue.put_nowait((chunk, extract_raw_streams(args), True))
+    except queue.Full:
+      self._num_dropped += 1
+
+  def write(self, chunk: np.ndarray, blocks: Dict[str, np.ndarray]) -> None:
+    """直接写入一条事件（供回放/转换等非回调场景使用），由写线程异步落盘。"""
+    self._queue.put((chunk, blocks, False))
+
+  def _write_header(self) -> None:
+    tmp = os.path.join(self._path, HEADER_FILE + '.tmp')
+    with open(tmp, 'w') as f:
+      json.dump(self._header, f, indent=2)
+    os.replace(tmp, os.path.join(self._path, HEADER_FILE))
+
+  def _get_file(self, name: str, block: np.ndarray) -> Any:
+    f = self._files.get(name)
+    if f is None:
+      self._header['streams'][name] = {'dtype': block.dtype.str, 'sample_shape': list(block.shape[1:])}
+      self._write_header()
+      f = self._files[name] = open(os.path.join(self._path, name + '.bin'), 'ab', buffering=self._buffer_size)
+    elif list(block.shape[1:]) != self._header['streams'][name]['sample_shape']:
+      raise ValueError("Stream %r changed shape to %s" % (name, block.shape[1:]))
+    return f
+
+  def _run(self) -> None:
+    while True:
+      item = self._queue.get()
+      if item is None:
+        break
+      if self._error is not None:
+        continue
+      chunk, blocks, raw = item
+      try:
+        if raw:
+          blocks = to_sample_major(blocks)
+        for name in STREAMS:
+          chunk[name + '_start'] = self._num_samples[name]
+        for name, block in blocks.items():
+          self._get_file(name, block).write(block.data)
+          self._num_samples[name] += block.shape[0]
+          self._num_bytes += block.nbytes
+        self._chunks.write(chunk.tobytes())
+        self._num_events += 1
+      except BaseException as e:
+        self._error = e
+
+  def get_stats(self) -> Dict[str, Any]:
+    """返回已写事件数、丢弃事件数、队列深度、写入字节数与各流样本数。"""
+    return {
+      'num_events': self._num_events,
+      'num_dropped': self._num_dropped,
+      'queue_depth': self._queue.qsize(),
+      'num_bytes': self._num_bytes,
+      'num_samples': dict(self._num_samples),
+    }
+
+  def close(self) -> None:
+    """等待队列写完并关闭所有文件；写线程中的异常在此抛出。"""
+    if self._thread.is_alive():
+      self._queue.put(None)
+      self._thread.join()
+    for f in self._files.values():
+      f.close()
+    self._chunks.close()
+    self._header['num_events'] = self._num_events
+    self._header['num_dropped_events'] = self._num_dropped
+    self._write_header()
+    if self._error is not None:
+      raise self._error
+
+  def __enter__(self) -> 'StreamRecorder':
+    return self
+
+  def __exit__(self, *exc_info: Any) -> None:
+    self.close()
+
+
+class RecordingReader:
+  """以 `numpy.memmap` 只读方式打开 `StreamRecorder` 写出的记录目录。"""
+  def __init__(self, path: str) -> None:
+    self._path = path
+    with open(os.path.join(path, HEADER_FILE)) as f:
+      self._header = json.load(f)
+    if self._header['format_version'] != FORMAT_VERSION:
+      raise ValueError("Unsupported recording format version %r" % self._header['format_version'])
+    self._streams = {} # type: Dict[str, np.ndarray]
+    for name, desc in self._header['streams'].items():
+      self._streams[name] = self._map(name + '.bin', np.dtype(desc['dtype']), tuple(desc['sample_shape']))
+    self._chunks = self._map(CHUNKS_FILE, CHUNK_DTYPE, ())
+
+  def _map(self, file_name: str, dtype: np.dtype, sample_shape: Tuple[int, ...]) -> np.ndarray:
+    file_path = os.path.join(self._path, file_name)
+    sample_bytes = dtype.itemsize * int(np.prod(sample_shape, dtype=np.int64))
+    n = os.path.getsize(file_path) // sample_bytes if os.path.exists(file_path) else 0
+    if n == 0:
+      return np.empty((0,) + sample_shape, dtype=dtype)
+    return np.memmap(file_path, dtype=dtype, mode='r', shape=(n,) + sample_shape)
+
+  @property
+  def header(self) -> Dict[str, Any]:
+    """记录头部（配置与数据流描述）。"""
+    return self._header
+
+  @property
+  def chunks(self) -> np.ndarray:
+    """每事件索引记录（结构化数组）。"""
+    return self._chunks
+
+  def get_stream_names(self) -> List[str]:
+    """记录中存在的数据流。"""
+    return list(self._streams)
+
+  def get_rate(self, name: str) -> float:
+    """数据流采样率（Hz），头部未提供时返回 0。"""
+    if name in ('fsw', 'sync'):
+      name = 'emg'
+    return float(self._header.get('rates_hz', {}).get(name, 0.0))
+
+  def __len__(self) -> int:
+    return len(self._chunks)
+
+  def get_num_samples(self, name: str) -> int:
+    """数据流样本总数。"""
+    return self._streams[name].shape[0]
+
+  def read(self, name: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+    """按样本序号切片，返回 memmap 视图，形状 (样本, 通道[, 分量])。"""
+    return self._streams[name][start:stop]
+
+  def read_time(self, name: str, t_start: float, t_stop: float) -> np.ndarray:
+    """按相对记录起点的时间（秒）切片。"""
+    rate = self.get_rate(name)
+    if rate <= 0:
+      raise ValueError("Sampling rate of stream %r is unknown" % name)
+    return self._streams[name][int(round(t_start * rate)):int(round(t_stop * rate))]
+
+  def read_chunks(self, name: str, first: int, last: Optional[int] = None) -> np.ndarray:
+    """返回第 `first` 到 `last`（不含）个事件中该数据流的样本。"""
+    last = len(self._chunks) if last is None else last
+    start = int(self._chunks[first][name + '_start']) if first < len(self._chunks) else self.get_num_samples(name)
+    stop = int(self._chunks[last][name + '_start']) if last < len(self._chunks) else self.get_num_samples(name)
+    return self._streams[name][start:stop]
+
+  def iter_chunks(self) -> Iterable[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """逐事件迭代 (索引记录, {数据流: 样本})。"""
+    for i in range(len(self._chunks)):
+      yield self._chunks[i], {name: self.read_chunks(name, i, i + 1) for name in self._streams}
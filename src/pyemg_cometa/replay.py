@@ -0,0 +1,296 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+离线回放：将 `StreamRecorder` 的记录重新以 `DataAvailable` 事件发出。
+
+`ReplaySource` 提供与 `CometaDaqSystem` 相同的 `add_on_data_available_handler`
+注册方式与 `start_capturing()`/`stop_capturing()` 调用，发出的事件参数为
+`SimulatedDataAvailableEventArgs`（getter 与 `CometaDataAvailableEventArgs` 一致），
+因此生产环境的处理流水线无需修改即可在记录上重跑。
+
+- 速度：`speed=1.0` 为实时，`speed=N` 为 N 倍速，`speed=None` 为不限速（尽可能快）。
+- 分块：默认按记录时的事件分块；指定 `block_size`（EMG 样本数）或 `start_capturing(event_period)`
+  时重新分块，其他数据流按记录中的事件边界插值得到对应的样本区间。
+- 定位：`seek()` 按相对记录起点的时间、`seek_scan()` 按扫描序号跳转，可在回放过程中调用。
+
+NOTE: 记录中没有的信息（各传感器 RF 丢包、传输速率、FSW 原始样本与状态）以
+零值或 FSW 样本代替。
+"""
+
+from typing import Any, Callable, Iterator, List, Optional, Union
+import bisect
+import threading
+import time
+import numpy as np
+
+from .constants import EMG_SAMPLING_RATE_HZ, DeviceStateEnum, get_event_period_ms
+from .recorder import CHUNK_FLAG_START_TRIGGER, CHUNK_FLAG_STOP_TRIGGER, STREAMS, RecordingReader
+from .simulated import SimulatedDataAvailableEventArgs, SimulatedDeviceStateChangedEventArgs
+
+
+class ReplaySource:
+  """以 `DataAvailable` 事件回放记录目录的事件源。
+
+  参数：
+  - recording: 记录目录或已打开的 `RecordingReader`。
+  - speed: 回放倍速；None 表示不限速。
+  - block_size: 每个事件的 EMG 样本数；None 表示沿用记录时的分块。
+  """
+  def __init__(self,
+               recording: Union[str, RecordingReader],
+               speed: Optional[float] = 1.0,
+               block_size: Optional[int] = None) -> None:
+    self._reader = recording if isinstance(recording, RecordingReader) else RecordingReader(recording)
+    if 'emg' not in self._reader.get_stream_names():
+      raise ValueError("Recording has no EMG stream to replay")
+    if speed is not None and speed <= 0:
+      raise ValueError("`speed` must be positive or None")
+    self._speed = speed
+    self._block_size = block_size
+    self._emg_rate = self._reader.get_rate('emg') or float(EMG_SAMPLING_RATE_HZ)
+    chunks = self._reader.chunks
+    # NOTE: 逐事件的标量查找使用 Python 列表与 bisect，数据以普通 ndarray 视图访问，避免 memmap 子类开销。
+    names = self._reader.get_stream_names()
+    self._data = {name: np.asarray(self._reader.read(name)) for name in names}
+    # 事件边界（含末尾）：每个数据流在各事件开始时的样本序号。
+    self._bounds = {name: chunks[name + '_start'].tolist() + [self._reader.get_num_samples(name)] for name in names}
+    self._scans = chunks['scan_number'].tolist()
+    self._usb_lost = chunks['usb_lost_packets'].tolist()
+    self._start_triggers = self._trigger_positions(CHUNK_FLAG_START_TRIGGER, 'start_trigger_scan')
+    self._stop_triggers = self._trigger_positions(CHUNK_FLAG_STOP_TRIGGER, 'stop_trigger_scan')
+    self._num_sensors = self._reader.read('emg', 0, 1).shape[1] if self._reader.get_num_samples('emg') else 0
+    self._data_available_handlers = [] # type: List[Callable[[Any, Any], None]]
+    self._state_changed_handlers = [] # type: List[Callable[[Any, Any], None]]
+    self._state = DeviceStateEnum.IDLE
+    self._position = 0 # 下一个事件的 EMG 样本序号
+    self._pending_seek = None # type: Optional[int]
+    self._num_events = 0
+    self._lock = threading.Lock()
+    self._stop_event = threading.Event()
+    self._thread = None # type: Optional[threading.Thread]
+
+  @property
+  def reader(self) -> RecordingReader:
+    """底层的 `RecordingReader`。"""
+    return self._reader
+
+  def get_state(self) -> DeviceStateEnum:
+    """返回回放状态（IDLE 或 CAPTURING）。"""
+    return self._state
+
+  def get_duration(self) -> float:
+    """记录时长（秒，按 EMG 样本数计）。"""
+    return self._reader.get_num_samples('emg') / self._emg_rate
+
+  def get_position(self) -> float:
+    """下一个事件在记录中的时间（秒）。"""
+    return self._position / self._emg_rate
+
+  def get_num_events(self) -> int:
+    """已发出的事件数。"""
+    return self._num_events
+
+  # 回调 -------------------------------------------------------------------
+
+  def add_on_state_changed_handler(self, callback: Callable[[Any, Any], None]) -> None:
+    self._state_changed_handlers.append(callback)
+
+  def remove_on_state_changed_handler(self, callback: Callable[[Any, Any], None]) -> None:
+    self._state_changed_handlers.remove(callback)
+
+  def add_on_data_available_handler(self, callback: Callable[[Any, Any], None]) -> None:
+    self._data_available_handlers.append(callback)
+
+  def remove_on_data_available_handler(self, callback: Callable[[Any, Any], None]) -> None:
+    self._data_available_handlers.remove(callback)
+
+  def _set_state(self, state: DeviceStateEnum) -> None:
+    self._state = state
+    args = SimulatedDeviceStateChangedEventArgs(state)
+    for callback in list(self._state_changed_handlers):
+      callback(self, args)
+
+  # 定位 -------------------------------------------------------------------
+
+  def seek(self, seconds: float) -> None:
+    """跳转到相对记录起点 `seconds` 秒处（回放中调用时从下一个事件生效）。"""
+    offset = int(round(seconds * self._emg_rate))
+    self._pending_seek = min(max(offset, 0), self._reader.get_num_samples('emg'))
+
+  def seek_scan(self, scan_number: int) -> None:
+    """跳转到扫描序号 `scan_number` 所在的位置。"""
+    i = max(bisect.bisect_right(self._scans, scan_number) - 1, 0)
+    offset = self._bounds['emg'][i] + max(scan_number - self._scans[i], 0)
+    self._pending_seek = min(offset, self._bounds['emg'][i + 1])
+
+  # 回放 -------------------------------------------------------------------
+
+  def start_capturing(self, event_period: Any = None) -> None:
+    """在后台线程上开始回放；给出 `event_period` 时按该周期重新分块。"""
+    if event_period is not None:
+      self._block_size = int(round(get_event_period_ms(event_period) * self._emg_rate / 1000))
+    with self._lock:
+      if self._thread is not None:
+        raise RuntimeError("Replay is already running")
+      self._stop_event.clear()
+      thread = self._thread = threading.Thread(target=self.run, name='ReplaySource', daemon=True)
+    thread.start()
+
+  def stop_capturing(self) -> None:
+    """停止回放（位置保留，可再次开始）。"""
+    with self._lock:
+      thread, self._thread = self._thread, None
+    if thread is not None:
+      self._stop_event.set()
+      if thread is not threading.current_thread():
+        thread.join()
+
+  def wait(self, timeout: Optional[float] = None) -> bool:
+    """等待后台回放结束，返回是否已结束。"""
+    thread = self._thread
+    if thread is not None:
+      thread.join(timeout)
+      return not thread.is_alive()
+    return True
+
+  def run(self) -> int:
+    """在调用线程中回放至记录末尾（或被停止），返回本次发出的事件数。"""
+    if threading.current_thread() is not self._thread:
+      self._stop_event.clear()
+    self._set_state(DeviceStateEnum.CAPTURING)
+    num_events = 0
+    t0 = time.perf_counter()
+    origin = self._position
+    try:
+      while not self._stop_event.is_set():
+        if self._pending_seek is not None:
+          self._position, self._pending_seek = self._pending_seek, None
+          t0, origin = time.perf_counter(), self._position
+        args = self._make_args(self._position)
+        if args is None:
+          break
+        n = args.get_emg_samples().shape[1]
+        if self._speed is not None:
+          # NOTE: 按已回放的记录时长计算截止时间，避免逐事件 sleep 的误差累积。
+          delay = t0 + (self._position + n - origin) / self._emg_rate / self._speed - time.perf_counter()
+          if delay > 0 and self._stop_event.wait(delay):
+            break
+        for callback in list(self._data_available_handlers):
+          callback(self, args)
+        self._position += n
+        self._num_events += 1
+        num_events += 1
+    finally:
+      # NOTE: 后台回放自然结束时释放线程句柄，以便再次 `start_capturing`。
+      with self._lock:
+        if self._thread is threading.current_thread():
+          self._thread = None
+      self._set_state(DeviceStateEnum.IDLE)
+    return num_events
+
+  def iter_events(self, start: float = 0.0) -> Iterator[SimulatedDataAvailableEventArgs]:
+    """不经回调、不限速地逐个生成事件参数（不影响回放位置）。"""
+    position = int(round(start * self._emg_rate))
+    while True:
+      args = self._make_args(position)
+      if args is None:
+        return
+      yield args
+      position += args.get_emg_samples().shape[1]
+
+  def _chunk_index(self, offset: int) -> int:
+    return bisect.bisect_right(self._bounds['emg'], offset) - 1
+
+  def _stream_offset(self, name: str, offset: int, i: int) -> int:
+    """EMG 样本序号 `offset`（位于第 `i` 个事件内）对应的数据流样本序号，按事件内比例向下取整。"""
+    emg, bounds = self._bounds['emg'], self._bounds[name]
+    if i + 1 >= len(bounds):
+      return bounds[-1]
+    n_emg = emg[i + 1] - emg[i]
+    if offset == emg[i] or n_emg == 0:
+      return bounds[i]
+    return bounds[i] + (offset - emg[i]) * (bounds[i + 1] - bounds[i]) // n_emg
+
+  def _trigger_positions(self, flag: int, field: str) -> List[Any]:
+    """各触发应由哪个 EMG 样本序号所在的事件报告：[(样本序号, 触发扫描号)]，按样本序号排序。
+
+    触发扫描号先限制在其所在分块的扫描范围内再换算为样本序号，
+    因此重新分块时每个触发恰好由一个事件报告。
+    """
+    chunks = self._reader.chunks
+    emg = self._bounds['emg']
+    positions = []
+    for i in np.flatnonzero(chunks['flags'] & flag).tolist():
+      n = emg[i + 1] - emg[i]
+      trigger_scan = int(chunks[i][field])
+      positions.append((emg[i] + min(max(trigger_scan - self._scans[i], 0), max(n - 1, 0)), trigger_scan))
+    return positions
+
+  @staticmethod
+  def _find_trigger(positions: List[Any], offset: int, stop: int) -> Optional[int]:
+    k = bisect.bisect_left(positions, (offset,))
+    if k < len(positions) and positions[k][0] < stop:
+      return positions[k][1]
+    return None
+
+  def _make_args(self, offset: int) -> Optional[SimulatedDataAvailableEventArgs]:
+    emg_bounds = self._bounds['emg']
+    total = emg_bounds[-1]
+    if offset >= total:
+      return None
+    i = self._chunk_index(offset)
+    if self._block_size is None:
+      stop = emg_bounds[i + 1]
+      j = i + 1
+    else:
+      stop = min(offset + self._block_size, total)
+      j = self._chunk_index(stop)
+    blocks = {}
+    for name, data in self._data.items():
+      block = data[self._stream_offset(name, offset, i):self._stream_offset(name, stop, j)]
+      blocks[name] = np.ascontiguousarray(block.swapaxes(0, 1)) if STREAMS[name][2] else block.copy()
+    emg = blocks['emg']
+    fsw = blocks.get('fsw', np.zeros((emg.shape[1], 2), np.int32))
+    return SimulatedDataAvailableEventArgs(
+      scan_number=self._scans[i] + offset - emg_bounds[i],
+      emg=emg,
+      orientation=blocks.get('orientation'),
+      accelerometer=blocks.get('accelerometer'),
+      gyroscope=blocks.get('gyroscope'),
+      magnetometer=blocks.get('magnetometer'),
+      sync=blocks.get('sync', np.zeros((emg.shape[1],), np.float32)),
+      sensor_states=blocks.get('sensor_states'),
+      fsw=fsw,
+      fsw_raw=fsw,
+      fsw_sensor_states=np.zeros((0, 1), np.int16),
+      start_trigger_scan=self._find_trigger(self._start_triggers, offset, stop),
+      stop_trigger_scan=self._find_trigger(self._stop_triggers, offset, stop),
+      transfer_rate=0,
+      sensor_rf_lost_packets=[0] * self._num_sensors,
+      usb_lost_packets=self._usb_lost[min(self._chunk_index(stop - 1), len(self._usb_lost) - 1)],
+      timestamp=time.perf_counter())
@@ -0,0 +1,220 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+定长环形缓冲区（按通道、NumPy 存储）。
+
+`DataAvailable` 回调运行在 SDK 的数据传输线程上，回调中的任何耗时
+操作都会拖慢设备并导致 `SYNC_BUFFER1_OVERRUN`/`SYNC_BUFFER2_OVERRUN`。
+本模块提供预分配的环形缓冲区：回调只做一次内存拷贝写入，消费者在
+独立线程中通过 `read(n)`、`read_latest(window)`、`wait_for(n, timeout)`
+读取。
+
+NOTE: 读写指针为单调递增的样本计数，临界区仅包含指针更新与数组切片拷贝。
+这里有意没有采用无锁实现：CPython 不保证 NumPy 切片拷贝与指针更新之间的
+内存可见顺序，且 BLOCK 策略与 `wait_for` 本身就需要条件变量；在 GIL 下
+该锁的争用开销与一次切片拷贝相当。
+"""
+
+from typing import Any, Callable, Dict, Optional
+import threading
+import numpy as np
+
+
+class OverflowPolicyEnum:
+  """缓冲区写满时的处理策略。"""
+  DROP_OLDEST = 'drop_oldest' # 覆盖最旧且未读取的样本
+  BLOCK = 'block'             # 阻塞写入方直至有足够空间（或超时）
+  RAISE = 'raise'             # 抛出 `RingBufferOverflowError`
+
+
+class RingBufferOverflowError(Exception):
+  """缓冲区空间不足且策略为 RAISE（或 BLOCK 超时）时抛出。"""
+
+
+class RingBuffer:
+  """多通道定长环形缓冲区，形状为 (通道, 容量)。
+
+  单生产者（SDK 回调）/多消费者安全。`read` 会消费数据，
+  `read_latest` 只复制最新窗口而不移动读指针。
+  """
+  def __init__(self,
+               num_channels: int,
+               capacity: int,
+               dtype: Any = np.float32,
+               overflow_policy: str = OverflowPolicyEnum.DROP_OLDEST,
+               block_timeout: Optional[float] = None) -> None:
+    if capacity <= 0:
+      raise ValueError("`capacity` must be positive")
+    if overflow_policy not in (OverflowPolicyEnum.DROP_OLDEST, OverflowPolicyEnum.BLOCK, OverflowPolicyEnum.RAISE):
+      raise ValueError("Unknown overflow policy: %r" % (overflow_policy,))
+    self._buffer = np.zeros((num_channels, capacity), dtype=dtype)
+    self._capacity = capacity
+    self._overflow_policy = overflow_policy
+    self._block_timeout = block_timeout
+    self._cond = threading.Condition(threading.Lock())
+    self._head = 0 # 已写入样本总数
+    self._tail = 0 # 已消费样本总数
+    self._num_read = 0
+    self._num_dropped = 0
+    self._num_cleared = 0
+    self._num_overflows = 0
+    self._num_blocked = 0
+
+  @property
+  def num_channels(self) -> int:
+    """通道数。"""
+    return self._buffer.shape[0]
+
+  @property
+  def capacity(self) -> int:
+    """每通道容量（样本数）。"""
+    return self._capacity
+
+  @property
+  def dtype(self) -> np.dtype:
+    """存储数据类型。"""
+    return self._buffer.dtype
+
+  def available(self) -> int:
+    """当前可读（未消费）样本数。"""
+    return self._head - self._tail
+
+  def free(self) -> int:
+    """写入前无需丢弃即可容纳的样本数。"""
+    return self._capacity - (self._head - self._tail)
+
+  def get_stats(self) -> Dict[str, int]:
+    """返回计数器快照：写入/读取/丢弃/清除样本数、溢出次数与当前深度。"""
+    with self._cond:
+      return {
+        'num_written': self._head,
+        'num_read': self._num_read,
+        'num_dropped': self._num_dropped,
+        'num_cleared': self._num_cleared,
+        'num_overflows': self._num_overflows,
+        'num_blocked': self._num_blocked,
+        'depth': self._head - self._tail,
+        'capacity': self._capacity,
+      }
+
+  def write(self, block: np.ndarray) -> int:
+    """写入形状为 (通道, 样本) 的数据块，返回被丢弃的旧样本数。"""
+    n = block.shape[1]
+    if block.shape[0] != self._buffer.shape[0]:
+      raise ValueError("Expected %d channels, got %d" % (self._buffer.shape[0], block.shape[0]))
+    if n == 0:
+      return 0
+    dropped = 0
+    with self._cond:
+      if n > self._capacity:
+        if self._overflow_policy != OverflowPolicyEnum.DROP_OLDEST:
+          raise RingBufferOverflowError("Block of %d samples exceeds capacity %d" % (n, self._capacity))
+        # 仅保留块中最新的 `capacity` 个样本。
+        skipped = n - self._capacity
+        self._head += skipped
+        block = block[:, skipped:]
+        n = self._capacity
+      overflow = n - (self._capacity - (self._head - self._tail))
+      if overflow > 0:
+        self._num_overflows += 1
+        if self._overflow_policy == OverflowPolicyEnum.RAISE:
+          raise RingBufferOverflowError("Ring buffer full: %d samples over capacity" % overflow)
+        elif self._overflow_policy == OverflowPolicyEnum.BLOCK:
+          self._num_blocked += 1
+          if not self._cond.wait_for(lambda: self._capacity - (self._head - self._tail) >= n, self._block_timeout):
+            raise RingBufferOverflowError("Timed out waiting for %d free samples" % n)
+        else:
+          self._tail += overflow
+          self._num_dropped += overflow
+          dropped = overflow
+      start = self._head % self._capacity
+      first = min(n, self._capacity - start)
+      self._buffer[:, start:start + first] = block[:, :first]
+      if first < n:
+        self._buffer[:, :n - first] = block[:, first:]
+      self._head += n
+      self._cond.notify_all()
+    return dropped
+
+  def _copy_out(self, start: int, n: int, out: Optional[np.ndarray]) -> np.ndarray:
+    """从绝对样本序号 `start` 起复制 `n` 个样本（调用方持锁）。"""
+    if out is None:
+      out = np.empty((self._buffer.shape[0], n), dtype=self._buffer.dtype)
+    elif out.shape[0] != self._buffer.shape[0] or out.shape[1] < n:
+      raise ValueError("`out` is too small for %d samples" % n)
+    pos = start % self._capacity
+    first = min(n, self._capacity - pos)
+    out[:, :first] = self._buffer[:, pos:pos + first]
+    if first < n:
+      out[:, first:n] = self._buffer[:, :n - first]
+    return out[:, :n]
+
+  def read(self, n: Optional[int] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """消费并返回最多 `n` 个最旧样本（`n` 为 None 时读取全部）。"""
+    with self._cond:
+      k = self._head - self._tail
+      if n is not None:
+        k = min(k, n)
+      result = self._copy_out(self._tail, k, out)
+      self._tail += k
+      self._num_read += k
+      self._cond.notify_all()
+    return result
+
+  def read_latest(self, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """返回最新的至多 `window` 个样本，不移动读指针。"""
+    with self._cond:
+      k = min(window, self._head, self._capacity)
+      return self._copy_out(self._head - k, k, out)
+
+  def wait_for(self, n: int, timeout: Optional[float] = None) -> bool:
+    """阻塞直至至少有 `n` 个可读样本；超时返回 False。"""
+    with self._cond:
+      return self._cond.wait_for(lambda: self._head - self._tail >= n, timeout)
+
+  def clear(self) -> None:
+    """丢弃全部未读样本（计入 `num_cleared`，其余计数器保留）。"""
+    with self._cond:
+      self._num_cleared += self._head - self._tail
+      self._tail = self._head
+      self._cond.notify_all()
+
+
+def make_data_available_handler(ring: RingBuffer,
+                                extract: Optional[Callable[[Any], np.ndarray]] = None) -> Callable[[Any, Any], None]:
+  """构造可传给 `CometaDaqSystem.add_on_data_available_handler` 的回调。
+
+  回调仅调用 `extract(args)`（默认 `args.get_emg_samples_as_numpy()`）
+  并将结果写入 `ring`，不做任何其他处理。
+  """
+  if extract is None:
+    extract = lambda args: args.get_emg_samples_as_numpy(ring.dtype)
+
+  def on_data_available(sender: Any, args: Any) -> None:
+    ring.write(extract(args))
+  return on_data_available
@@ -31,45 +31,35 @@
 用于设置单个传感器的类型、加速度计/陀螺仪量程等。
 """
 
-import clr
-import os
-dir_path = os.path.dirname(__file__)
+from .constants import AccelerometerFullScaleEnum, GyroscopeFullScaleEnum, SensorTypeEnum, to_net_value
 
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSys')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSysInterface')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'CyUSB')) # type: ignore
+from ._dotnet import get_net_type
 
-from .constants import AccelerometerFullScaleEnum, GyroscopeFullScaleEnum, SensorTypeEnum
-
-from Waveplus.DaqSys import * # type: ignore
-from Waveplus.DaqSysInterface import * # type: ignore
-from Waveplus.DaqSys.Definitions import * # type: ignore
-from Waveplus.DaqSys.Exceptions import * # type: ignore
-from CyUSB import * # type: ignore
+SensorConfiguration = get_net_type('SensorConfiguration')
 
 
 class CometaSensorConfiguration(SensorConfiguration):  # type: ignore
   """单传感器配置的 Python 包装。"""
   def get_sensor_type(self) -> SensorTypeEnum:
     """读取传感器类型（EMG/IMU/FSW/模拟）。"""
-    return self.get_SensorType()
+    return SensorTypeEnum.from_net(self.get_SensorType())
 
   def set_sensor_type(self, sensor_type: SensorTypeEnum) -> None:
     """设置传感器类型。"""
-    self.set_SensorType(sensor_type)
+    self.set_SensorType(to_net_value(sensor_type))
 
   def get_accelerometer_full_scale(self) -> AccelerometerFullScaleEnum:
     """读取加速度计量程。"""
-    return self.get_AccelerometerFullScale()
+    return AccelerometerFullScaleEnum.from_net(self.get_AccelerometerFullScale())
 
   def set_accelerometer_full_scale(self, full_scale: AccelerometerFullScaleEnum) -> None:
     """设置加速度计量程。"""
-    self.set_AccelerometerFullScale(full_scale)
+    self.set_AccelerometerFullScale(to_net_value(full_scale))
 
   def get_gyroscope_full_scale(self) -> GyroscopeFullScaleEnum:
     """读取陀螺仪量程。"""
-    return self.get_GyroscopeFullScale()
+    return GyroscopeFullScaleEnum.from_net(self.get_GyroscopeFullScale())
 
   def set_gyroscope_full_scale(self, full_scale: GyroscopeFullScaleEnum) -> None:
     """设置陀螺仪量程。"""
-    self.set_GyroscopeFullScale(full_scale)
+    self.set_GyroscopeFullScale(to_net_value(full_scale))
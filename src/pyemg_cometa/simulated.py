@@ -0,0 +1,760 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+无硬件的模拟采集后端。
+
+`SimulatedDaqSystem` 以纯 Python 实现与 `CometaDaqSystem` 相同的方法集合
+（采集控制、状态/数据/内存数据回调、触发、传感器管理、丢包计数等），
+并在独立的“数据传输线程”上按真实速率产生合成的 EMG/IMU/FSW/同步数据，
+可配置事件抖动、RF/USB 丢包率与通道数，用于在 Linux 上进行吞吐与
+端到端延迟测试。
+
+NOTE: 本模块不依赖 CLR。枚举参数可为 `constants` 中的枚举、.NET 枚举或同名字符串。
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import math
+import threading
+import time
+import numpy as np
+
+from .constants import DeviceErrorEnum, DeviceStateEnum, ImuAcqTypeEnum
+from .constants import RFChannelEnum, SensorCheckReportEnum, SensorTypeEnum
+from .constants import EMG_SAMPLING_RATE_HZ, IMU_SAMPLING_RATES_HZ, get_event_period_ms
+from .snapshots import CaptureConfigurationSnapshot
+
+
+class _RateCounter:
+  """按事件累计小数样本，返回每个事件应产生的整数样本数。"""
+  def __init__(self, rate_hz: float, period_s: float) -> None:
+    self._per_event = rate_hz * period_s
+    self._k = 0
+
+  def next(self) -> int:
+    n = math.floor((self._k + 1) * self._per_event) - math.floor(self._k * self._per_event)
+    self._k += 1
+    return n
+
+
+class SimulatedDeviceStateChangedEventArgs:
+  """模拟的设备状态变化事件参数。"""
+  def __init__(self, state: DeviceStateEnum) -> None:
+    self._state = state
+
+  def get_state(self) -> DeviceStateEnum:
+    """返回新的设备状态。"""
+    return self._state
+
+
+class SimulatedDataAvailableEventArgs:
+  """模拟的数据到达事件参数，getter 与 `CometaDataAvailableEventArgs` 一致。
+
+  样本以 ndarray 形式存放；当前 IMU 模式不产生的模态返回 None。
+  """
+  def __init__(self,
+               scan_number: int,
+               emg: np.ndarray,
+               orientation: Optional[np.ndarray],
+               accelerometer: Optional[np.ndarray],
+               gyroscope: Optional[np.ndarray],
+               magnetometer: Optional[np.ndarray],
+               sync: np.ndarray,
+               sensor_states: Optional[np.ndarray],
+               fsw: np.ndarray,
+               fsw_raw: np.ndarray,
+               fsw_sensor_states: np.ndarray,
+               start_trigger_scan: Optional[int],
+               stop_trigger_scan: Optional[int],
+               transfer_rate: int,
+               sensor_rf_lost_packets: List[int],
+               usb_lost_packets: int,
+               timestamp: float) -> None:
+    self._scan_number = scan_number
+    self._emg = emg
+    self._orientation = orientation
+    self._accelerometer = accelerometer
+    self._gyroscope = gyroscope
+    self._magnetometer = magnetometer
+    self._sync = sync
+    self._sensor_states = sensor_states
+    self._fsw = fsw
+    self._fsw_raw = fsw_raw
+    self._fsw_sensor_states = fsw_sensor_states
+    self._start_trigger_scan = start_trigger_scan
+    self._stop_trigger_scan = stop_trigger_scan
+    self._transfer_rate = transfer_rate
+    self._sensor_rf_lost_packets = sensor_rf_lost_packets
+    self._usb_lost_packets = usb_lost_packets
+    self._timestamp = timestamp
+
+  def scan_number(self) -> int:
+    """本块首个 EMG 样本的扫描序号。"""
+    return self._scan_number
+
+  def get_emg_samples(self) -> np.ndarray:
+    """EMG 数据：维度为 [通道][样本]。"""
+    return self._emg
+
+  def get_orientation_samples(self) -> Optional[np.ndarray]:
+    """IMU 四元数：[通道][样本][4]。"""
+    return self._orientation
+
+  def get_accelerometer_samples(self) -> Optional[np.ndarray]:
+    """IMU 加速度计：[通道][样本][3]。"""
+    return self._accelerometer
+
+  def get_gyroscope_samples(self) -> Optional[np.ndarray]:
+    """IMU 陀螺仪：[通道][样本][3]。"""
+    return self._gyroscope
+
+  def get_magnetometer_samples(self) -> Optional[np.ndarray]:
+    """IMU 磁力计：[通道][样本][3]。"""
+    return self._magnetometer
+
+  def get_sync_samples(self) -> np.ndarray:
+    """同步通道数据。"""
+    return self._sync
+
+  def get_sensor_states(self) -> Optional[np.ndarray]:
+    """传感器电量/状态（FUSED 模式不可用）。"""
+    return self._sensor_states
+
+  def get_fsw_samples(self) -> np.ndarray:
+    """足底开关（FSW）样本。"""
+    return self._fsw
+
+  def get_fsw_raw_samples(self) -> np.ndarray:
+    """足底开关（FSW）原始样本。"""
+    return self._fsw_raw
+
+  def get_fsw_sensor_states(self) -> np.ndarray:
+    """FSW 传感器状态。"""
+    return self._fsw_sensor_states
+
+  def get_emg_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """EMG 数据的连续 ndarray，形状 (通道, 样本)。"""
+    return _as_array(self._emg, (self._emg.shape[0], 0), dtype, out)
+
+  def get_orientation_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """IMU 四元数的 ndarray，形状 (通道, 样本, 4)。"""
+    return _as_array(self._orientation, (self._emg.shape[0], 0, 4), dtype, out)
+
+  def get_accelerometer_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """加速度计数据的 ndarray，形状 (通道, 样本, 3)。"""
+    return _as_array(self._accelerometer, (self._emg.shape[0], 0, 3), dtype, out)
+
+  def get_gyroscope_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """陀螺仪数据的 ndarray，形状 (通道, 样本, 3)。"""
+    return _as_array(self._gyroscope, (self._emg.shape[0], 0, 3), dtype, out)
+
+  def get_magnetometer_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """磁力计数据的 ndarray，形状 (通道, 样本, 3)。"""
+    return _as_array(self._magnetometer, (self._emg.shape[0], 0, 3), dtype, out)
+
+  def get_fsw_samples_as_numpy(self, dtype=np.int32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """FSW 样本的 ndarray，形状 (样本, 2)。"""
+    return _as_array(self._fsw, (0, 2), dtype, out)
+
+  def get_sync_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """同步通道数据的 ndarray，形状 (样本,)。"""
+    return _as_array(self._sync, (0,), dtype, out)
+
+  def is_start_trigger_detected(self) -> bool:
+    """是否检测到开始触发。"""
+    return self._start_trigger_scan is not None
+
+  def is_stop_trigger_detected(self) -> bool:
+    """是否检测到停止触发。"""
+    return self._stop_trigger_scan is not None
+
+  def start_trigger_scan(self) -> int:
+    """开始触发对应的扫描序号。"""
+    return self._start_trigger_scan if self._start_trigger_scan is not None else 0
+
+  def stop_trigger_scan(self) -> int:
+    """停止触发对应的扫描序号。"""
+    return self._stop_trigger_scan if self._stop_trigger_scan is not None else 0
+
+  def get_transfer_rate(self) -> int:
+    """数据传输速率。"""
+    return self._transfer_rate
+
+  def get_sensor_rf_lost_packets(self) -> List[int]:
+    """各传感器 RF 丢包累计计数。"""
+    return self._sensor_rf_lost_packets
+
+  def get_usb_lost_packets(self) -> int:
+    """USB 丢包累计计数。"""
+    return self._usb_lost_packets
+
+  def get_timestamp(self) -> float:
+    """（仅模拟器）事件生成时的 `time.perf_counter()`，用于端到端延迟测量。"""
+    return self._timestamp
+
+
+class SimulatedSensorMemoryDataAvailableEventArgs:
+  """模拟的传感器内存数据事件参数，getter 与 `CometaSensorMemoryDataAvailableEventArgs` 一致。"""
+  def __init__(self,
+               emg: np.ndarray,
+               trial_end: bool,
+               num_saved_trials: int,
+               transfer_progress: int,
+               current_trial_transfer_progress: int,
+               current_trial_id: int,
+               transfer_rate: int,
+               sensor_lost_packets: List[int],
+               lost_packets: int,
+               error_code: DeviceErrorEnum = DeviceErrorEnum.SUCCESS) -> None:
+    self._emg = emg
+    self._trial_end = trial_end
+    self._num_saved_trials = num_saved_trials
+    self._transfer_progress = transfer_progress
+    self._current_trial_transfer_progress = current_trial_transfer_progress
+    self._current_trial_id = current_trial_id
+    self._transfer_rate = transfer_rate
+    self._sensor_lost_packets = sensor_lost_packets
+    self._lost_packets = lost_packets
+    self._error_code = error_code
+
+  def get_num_samples(self) -> int:
+    """本次到达的样本帧数量。"""
+    return self._emg.shape[1]
+
+  def get_emg_samples(self) -> np.ndarray:
+    """EMG 数据：维度为 [通道][样本]。"""
+    return self._emg
+
+  def get_orientation_samples(self) -> None:
+    """模拟内存数据不含 IMU。"""
+    return None
+
+  def get_accelerometer_samples(self) -> None:
+    """模拟内存数据不含 IMU。"""
+    return None
+
+  def get_gyroscope_samples(self) -> None:
+    """模拟内存数据不含 IMU。"""
+    return None
+
+  def get_magnetometer_samples(self) -> None:
+    """模拟内存数据不含 IMU。"""
+    return None
+
+  def get_sensor_states(self) -> None:
+    """模拟内存数据不含传感器状态。"""
+    return None
+
+  def get_fsw_samples(self) -> None:
+    """模拟内存数据不含 FSW。"""
+    return None
+
+  def get_fsw_raw_samples(self) -> None:
+    """模拟内存数据不含 FSW。"""
+    return None
+
+  def get_fsw_sensor_states(self) -> None:
+    """模拟内存数据不含 FSW。"""
+    return None
+
+  def get_emg_samples_as_numpy(self, dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """EMG 数据的连续 ndarray，形状 (通道, 样本)。"""
+    return _as_array(self._emg, (self._emg.shape[0], 0), dtype, out)
+
+  def is_trial_end(self) -> bool:
+    """是否为试次结束标记。"""
+    return self._trial_end
+
+  def get_num_saved_trials(self) -> int:
+    """已保存的试次数。"""
+    return self._num_saved_trials
+
+  def get_transfer_progress(self) -> int:
+    """整体传输进度（百分比）。"""
+    return self._transfer_progress
+
+  def get_current_trial_transfer_progress(self) -> int:
+    """当前试次的传输进度（百分比）。"""
+    return self._current_trial_transfer_progress
+
+  def get_current_trial_id(self) -> int:
+    """当前试次 ID。"""
+    return self._current_trial_id
+
+  def get_transfer_rate(self) -> int:
+    """数据传输速率。"""
+    return self._transfer_rate
+
+  def get_sensor_lost_packets(self) -> List[int]:
+    """各传感器丢包计数。"""
+    return self._sensor_lost_packets
+
+  def get_error_code(self) -> DeviceErrorEnum:
+    """错误码。"""
+    return self._error_code
+
+  def get_lost_packets(self) -> int:
+    """总丢包计数。"""
+    return self._lost_packets
+
+
+def _as_array(samples: Optional[np.ndarray], empty_shape: tuple, dtype: Any, out: Optional[np.ndarray]) -> np.ndarray:
+  """模拟数据已是 ndarray：按需转换类型或写入 `out`。"""
+  if samples is None:
+    samples = np.empty(empty_shape, dtype)
+  if out is None:
+    return samples.astype(dtype, copy=False)
+  np.copyto(out, samples, casting='unsafe')
+  return out
+
+
+class _SimulatedVersion:
+  """模拟版本信息（主/次/构建/修订）。"""
+  def __init__(self, major: int, minor: int, build: int = 0, revision: int = 0) -> None:
+    self._version = (major, minor, build, revision)
+
+  def get_major(self) -> int:
+    return self._version[0]
+
+  def get_minor(self) -> int:
+    return self._version[1]
+
+  def get_build(self) -> int:
+    return self._version[2]
+
+  def get_revision(self) -> int:
+    return self._version[3]
+
+
+class SimulatedDaqSystem:
+  """与 `CometaDaqSystem` 同接口的纯 Python 模拟设备。
+
+  参数：
+  - num_sensors: 已安装传感器（通道）数。
+  - num_fsw_sensors: 已安装 FSW 传感器数。
+  - imu_acq_type: 默认 IMU 模式（可被 `set_capture_configuration` 覆盖）。
+  - jitter: 事件周期抖动的标准差（秒）。
+  - packet_loss: 每个事件中单个传感器发生 RF 丢包的概率（丢包时该通道样本置零）。
+  - usb_packet_loss: 每个事件发生 USB 丢包的概率。
+  - command_latency: 阻塞命令（配置、阻抗检测等）的模拟耗时（秒）。
+  - realtime: False 时不等待，按 CPU 能力尽快产生事件（用于吞吐测试）。
+  - memory_trials: 传感器内存中的试次 {trial_id: 样本数}，用于模拟离线读取。
+  - seed: 随机种子。
+  """
+  def __init__(self,
+               num_sensors: int = 16,
+               num_fsw_sensors: int = 0,
+               imu_acq_type: Any = ImuAcqTypeEnum.RAW_DATA,
+               jitter: float = 0.0,
+               packet_loss: float = 0.0,
+               usb_packet_loss: float = 0.0,
+               command_latency: float = 0.0,
+               realtime: bool = True,
+               memory_trials: Optional[Dict[int, int]] = None,
+               seed: Optional[int] = None) -> None:
+    self._num_sensors = num_sensors
+    self._num_fsw_sensors = num_fsw_sensors
+    self._imu_acq_type = ImuAcqTypeEnum.coerce(imu_acq_type)
+    self._jitter = jitter
+    self._packet_loss = packet_loss
+    self._usb_packet_loss = usb_packet_loss
+    self._command_latency = command_latency
+    self._realtime = realtime
+    self._memory_trials = dict(memory_trials or {})
+    self._rng = np.random.default_rng(seed)
+    self._lock = threading.Lock()
+    self._state = DeviceStateEnum.IDLE
+    # 与真实设备一样始终有采集配置：默认配置，IMU 模式取自构造参数。
+    self._capture_config = CaptureConfigurationSnapshot.default() # type: Any
+    self._capture_config.set_imu_acq_type(self._imu_acq_type)
+    self._sensor_configs = {} # type: Dict[int, Any]
+    self._enabled = [True] * num_sensors
+    self._fsw_enabled = num_fsw_sensors > 0
+    self._device_rf_channels = {} # type: Dict[int, Any]
+    self._sensor_rf_channels = {} # type: Dict[int, Any]
+    self._state_changed_handlers = [] # type: List[Callable]
+    self._data_available_handlers = [] # type: List[Callable]
+    self._memory_data_available_handlers = [] # type: List[Callable]
+    self._pending_start_trigger = False
+    self._pending_stop_trigger = False
+    self._sync_value = 0.0
+    self._sensor_rf_lost_packets = [0] * num_sensors
+    self._usb_lost_packets = 0
+    self._stop_event = threading.Event()
+    self._thread = None # type: Optional[threading.Thread]
+
+  # 设备状态与错误 ---------------------------------------------------------
+
+  def get_state(self) -> DeviceStateEnum:
+    """获取当前设备状态。"""
+    return self._state
+
+  def get_initial_error(self) -> DeviceErrorEnum:
+    """模拟设备初始化总是成功。"""
+    return DeviceErrorEnum.SUCCESS
+
+  def get_type(self) -> Iterable[SensorTypeEnum]:
+    """获取已安装传感器的类型集合。"""
+    return [self._sensor_type(i) for i in range(self._num_sensors)]
+
+  def _set_state(self, state: DeviceStateEnum) -> None:
+    self._state = state
+    args = SimulatedDeviceStateChangedEventArgs(state)
+    for callback in list(self._state_changed_handlers):
+      callback(self, args)
+
+  def _command(self) -> None:
+    """模拟阻塞 SDK 命令的往返耗时。"""
+    if self._command_latency > 0:
+      time.sleep(self._command_latency)
+
+  # 采集配置与控制 ---------------------------------------------------------
+
+  def set_capture_configuration(self, capture_config: Any) -> None:
+    """设置采集配置（读取其中的 IMU 模式）。"""
+    self._command()
+    self._capture_config = capture_config
+    if hasattr(capture_config, 'get_imq_acq_type'):
+      self._imu_acq_type = ImuAcqTypeEnum.coerce(capture_config.get_imq_acq_type())
+
+  def get_capture_configuration(self) -> Any:
+    """读取当前采集配置（未设置时为与构造参数一致的默认配置快照）。"""
+    self._command()
+    return self._capture_config
+
+  def start_capturing(self, event_period: Any) -> None:
+    """按指定事件周期开始采集，在后台线程上触发 DataAvailable 事件。"""
+    period_s = get_event_period_ms(event_period) / 1000.0
+    with self._lock:
+      if self._thread is not None:
+        raise RuntimeError("Simulated device is already capturing")
+      self._stop_event.clear()
+      self._thread = threading.Thread(target=self._run_capture, args=(period_s,), name='SimulatedDaqSystem', daemon=True)
+    self._set_state(DeviceStateEnum.CAPTURING)
+    self._thread.start()
+
+  def stop_capturing(self) -> None:
+    """停止采集。"""
+    self._stop_worker()
+    self._set_state(DeviceStateEnum.IDLE)
+
+  def _stop_worker(self) -> None:
+    with self._lock:
+      thread, self._thread = self._thread, None
+    if thread is not None:
+      self._stop_event.set()
+      if thread is not threading.current_thread():
+        thread.join()
+
+  def generate_start_trigger(self) -> None:
+    """生成内部开始触发（在下一个事件中报告）。"""
+    self._pending_start_trigger = True
+
+  def generate_stop_trigger(self) -> None:
+    """生成内部停止触发（在下一个事件中报告）。"""
+    self._pending_stop_trigger = True
+
+  def write_sync_data(self, data: float, absolute_value: bool) -> None:
+    """写入同步通道数据（后续样本取该值）。"""
+    self._sync_value = float(data) if absolute_value else self._sync_value + float(data)
+
+  # 版本信息 ---------------------------------------------------------------
+
+  def get_firmware_version(self) -> Iterable[_SimulatedVersion]:
+    """获取固件版本信息。"""
+    return [_SimulatedVersion(0, 0)]
+
+  def get_hardware_version(self) -> Iterable[_SimulatedVersion]:
+    """获取硬件版本信息。"""
+    return [_SimulatedVersion(0, 0)]
+
+  def get_software_version(self) -> _SimulatedVersion:
+    """获取软件版本信息。"""
+    return _SimulatedVersion(0, 0, 0, 0)
+
+  # 传感器管理 -------------------------------------------------------------
+
+  def get_num_installed_sensors(self) -> int:
+    """读取已安装传感器数量。"""
+    return self._num_sensors
+
+  def get_num_installed_fsw_sensors(self) -> int:
+    """读取已安装足底开关（FSW）传感器数量。"""
+    return self._num_fsw_sensors
+
+  def _check_sensor_id(self, sensor_id: int) -> None:
+    if not 0 <= sensor_id < self._num_sensors:
+      raise ValueError("Wrong sensor number: %d" % sensor_id)
+
+  def enable_sensor(self, sensor_id: int) -> None:
+    """启用指定 `sensor_id` 的传感器通道。"""
+    self._command()
+    self._check_sensor_id(sensor_id)
+    self._enabled[sensor_id] = True
+
+  def disable_sensor(self, sensor_id: int) -> None:
+    """禁用指定 `sensor_id` 的传感器通道（其样本置零）。"""
+    self._command()
+    self._check_sensor_id(sensor_id)
+    self._enabled[sensor_id] = False
+
+  def enable_fsw_sensors(self) -> None:
+    """启用全部足底开关（FSW）通道。"""
+    self._command()
+    self._fsw_enabled = True
+
+  def disable_fsw_sensors(self) -> None:
+    """禁用全部足底开关（FSW）通道。"""
+    self._command()
+    self._fsw_enabled = False
+
+  def set_sensor_configuration(self, sensor_config: Any, sensor_id: int) -> None:
+    """为指定 `sensor_id` 设置传感器配置。"""
+    self._command()
+    self._check_sensor_id(sensor_id)
+    self._sensor_configs[sensor_id] = sensor_config
+
+  def get_sensor_configuration(self, sensor_id: int) -> Any:
+    """读取指定 `sensor_id` 的传感器配置（未设置时为 None）。"""
+    self._command()
+    self._check_sensor_id(sensor_id)
+    return self._sensor_configs.get(sensor_id)
+
+  def _sensor_type(self, sensor_id: int) -> SensorTypeEnum:
+    config = self._sensor_configs.get(sensor_id)
+    if config is not None and hasattr(config, 'get_sensor_type'):
+      return config.get_sensor_type()
+    return SensorTypeEnum.INERTIAL_SENSOR
+
+  def detect_accelerometer_offset(self, sensor_id: int) -> None:
+    """模拟加速度计零偏检测。"""
+    self._command()
+    self._check_sensor_id(sensor_id)
+
+  def check_impedance(self, sensor_id: int) -> Iterable[SensorCheckReportEnum]:
+    """模拟电极阻抗检测（启用的通道通过，禁用的通道未执行）。"""
+    self._command()
+    self._check_sensor_id(sensor_id)
+    return [SensorCheckReportEnum.PASSED if self._enabled[sensor_id] else SensorCheckReportEnum.NOT_EXECUTED]
+
+  def turn_led_on(self, sensor_id: int) -> None:
+    """点亮指定传感器 LED（无操作）。"""
+    self._check_sensor_id(sensor_id)
+
+  def turn_all_leds_on(self) -> None:
+    """点亮所有传感器 LED（无操作）。"""
+
+  def turn_all_leds_off(self) -> None:
+    """关闭所有传感器 LED（无操作）。"""
+
+  def get_device_dependent_functionalities(self) -> Iterable[Any]:
+    """模拟设备不报告设备依赖功能。"""
+    return []
+
+  # 事件订阅 ---------------------------------------------------------------
+
+  def add_on_state_changed_handler(self, callback: Callable[[Any, SimulatedDeviceStateChangedEventArgs], None]) -> None:
+    """注册设备状态变化回调。"""
+    self._state_changed_handlers.append(callback)
+
+  def remove_on_state_changed_handler(self, callback: Callable[[Any, SimulatedDeviceStateChangedEventArgs], None]) -> None:
+    """移除设备状态变化回调。"""
+    self._state_changed_handlers.remove(callback)
+
+  def add_on_data_available_handler(self, callback: Callable[[Any, SimulatedDataAvailableEventArgs], None]) -> None:
+    """注册数据到达回调。"""
+    self._data_available_handlers.append(callback)
+
+  def remove_on_data_available_handler(self, callback: Callable[[Any, SimulatedDataAvailableEventArgs], None]) -> None:
+    """移除数据到达回调。"""
+    self._data_available_handlers.remove(callback)
+
+  def add_on_sensor_memory_data_available_handler(self, callback: Callable[[Any, SimulatedSensorMemoryDataAvailableEventArgs], None]) -> None:
+    """注册传感器内存数据到达回调。"""
+    self._memory_data_available_handlers.append(callback)
+
+  def remove_on_sensor_memory_data_available_handler(self, callback: Callable[[Any, SimulatedSensorMemoryDataAvailableEventArgs], None]) -> None:
+    """移除传感器内存数据到达回调。"""
+    self._memory_data_available_handlers.remove(callback)
+
+  # 传感器内存读取 ---------------------------------------------------------
+
+  def start_selective_memory_reading(self, trial_id: int) -> None:
+    """按 `trial_id` 开始选择性内存读取，在后台线程上发送内存数据事件。"""
+    if trial_id not in self._memory_trials:
+      raise ValueError("Trial %d not in sensor memory" % trial_id)
+    with self._lock:
+      if self._thread is not None:
+        raise RuntimeError("Simulated device is busy")
+      self._stop_event.clear()
+      self._thread = threading.Thread(target=self._run_memory_reading, args=(trial_id,), name='SimulatedDaqSystem', daemon=True)
+    self._set_state(DeviceStateEnum.READING_SENSOR_MEMORY)
+    self._thread.start()
+
+  def stop_selective_memory_reading(self) -> None:
+    """停止传感器内存读取。"""
+    self._stop_worker()
+    self._set_state(DeviceStateEnum.IDLE)
+
+  def dispose(self) -> None:
+    """停止后台线程并释放资源。"""
+    self._stop_worker()
+    self._state_changed_handlers.clear()
+    self._data_available_handlers.clear()
+    self._memory_data_available_handlers.clear()
+
+  # RF 信道 ----------------------------------------------------------------
+
+  def get_master_device_rf_channel(self, device_id: int) -> RFChannelEnum:
+    """读取主设备 RF 信道。"""
+    return self._device_rf_channels.get(device_id, RFChannelEnum.RF_CHANNEL_0)
+
+  def set_master_device_rf_channel(self, channel: Any, device_id: int) -> None:
+    """设置主设备 RF 信道。"""
+    self._command()
+    self._device_rf_channels[device_id] = channel
+
+  def set_semsor_rf_channel(self, channel: Any, device_id) -> None:
+    """设置所有传感器 RF 信道。"""
+    self._command()
+    self._sensor_rf_channels[device_id] = channel
+
+  # 数据生成 ---------------------------------------------------------------
+
+  def _run_capture(self, period_s: float) -> None:
+    quaternion_hz, raw_hz, magnetometer_hz = IMU_SAMPLING_RATES_HZ[self._imu_acq_type]
+    has_states = raw_hz > 0 # NOTE: FUSED 模式不提供传感器状态。
+    emg_counter = _RateCounter(EMG_SAMPLING_RATE_HZ, period_s)
+    quaternion_counter = _RateCounter(quaternion_hz, period_s)
+    raw_counter = _RateCounter(raw_hz, period_s)
+    magnetometer_counter = _RateCounter(magnetometer_hz, period_s)
+    num_sensors = self._num_sensors
+    scan = 0
+    deadline = time.perf_counter()
+    while not self._stop_event.is_set():
+      deadline += period_s
+      if self._realtime:
+        delay = deadline - time.perf_counter()
+        if self._jitter > 0:
+          delay += self._rng.normal(0.0, self._jitter)
+        if delay > 0 and self._stop_event.wait(delay):
+          break
+      n_emg = emg_counter.next()
+      t = (scan + np.arange(n_emg)) / EMG_SAMPLING_RATE_HZ
+      emg = (self._rng.standard_normal((num_sensors, n_emg)) * 5e-5
+             + 1e-4 * np.sin(2 * np.pi * 50.0 * t)).astype(np.float32)
+      orientation = self._quaternions(quaternion_counter.next()) if quaternion_hz else None
+      accelerometer = gyroscope = None
+      if raw_hz:
+        n_raw = raw_counter.next()
+        accelerometer = self._rng.standard_normal((num_sensors, n_raw, 3)).astype(np.float32) * 0.01
+        accelerometer[:, :, 2] += 1.0
+        gyroscope = self._rng.standard_normal((num_sensors, n_raw, 3)).astype(np.float32)
+      magnetometer = None
+      if magnetometer_hz:
+        magnetometer = self._rng.standard_normal((num_sensors, magnetometer_counter.next(), 3)).astype(np.float32)
+      for sensor_id in range(num_sensors):
+        lost = self._packet_loss > 0 and self._rng.random() < self._packet_loss
+        if lost:
+          self._sensor_rf_lost_packets[sensor_id] += 1
+        if lost or not self._enabled[sensor_id]:
+          emg[sensor_id] = 0
+          for block in (orientation, accelerometer, gyroscope, magnetometer):
+            if block is not None:
+              block[sensor_id] = 0
+      if self._usb_packet_loss > 0 and self._rng.random() < self._usb_packet_loss:
+        self._usb_lost_packets += 1
+      fsw = np.zeros((n_emg, 2), dtype=np.int32)
+      if self._fsw_enabled and self._num_fsw_sensors:
+        fsw[:, 0] = (np.sin(2 * np.pi * 1.0 * t) > 0).astype(np.int32)
+        fsw[:, 1] = 1 - fsw[:, 0]
+      start_trigger_scan = stop_trigger_scan = None
+      if self._pending_start_trigger:
+        self._pending_start_trigger = False
+        start_trigger_scan = scan
+      if self._pending_stop_trigger:
+        self._pending_stop_trigger = False
+        stop_trigger_scan = scan
+      args = SimulatedDataAvailableEventArgs(
+        scan_number=scan,
+        emg=emg,
+        orientation=orientation,
+        accelerometer=accelerometer,
+        gyroscope=gyroscope,
+        magnetometer=magnetometer,
+        sync=np.full((n_emg,), self._sync_value, dtype=np.float32),
+        sensor_states=np.full((num_sensors, 1), 3, dtype=np.int16) if has_states else None,
+        fsw=fsw,
+        fsw_raw=fsw.copy(),
+        fsw_sensor_states=np.full((self._num_fsw_sensors, 1), 3, dtype=np.int16),
+        start_trigger_scan=start_trigger_scan,
+        stop_trigger_scan=stop_trigger_scan,
+        transfer_rate=int(emg.nbytes / period_s),
+        sensor_rf_lost_packets=list(self._sensor_rf_lost_packets),
+        usb_lost_packets=self._usb_lost_packets,
+        timestamp=time.perf_counter())
+      for callback in list(self._data_available_handlers):
+        callback(self, args)
+      scan += n_emg
+
+  def _quaternions(self, n: int) -> np.ndarray:
+    q = self._rng.standard_normal((self._num_sensors, n, 4)).astype(np.float32)
+    q /= np.linalg.norm(q, axis=2, keepdims=True)
+    return q
+
+  def _run_memory_reading(self, trial_id: int) -> None:
+    chunk = EMG_SAMPLING_RATE_HZ // 10
+    total = self._memory_trials[trial_id]
+    lost_packets = 0
+    sent = 0
+    while sent < total and not self._stop_event.is_set():
+      n = min(chunk, total - sent)
+      if self._realtime and self._stop_event.wait(n / EMG_SAMPLING_RATE_HZ / 10):
+        break
+      if self._packet_loss > 0 and self._rng.random() < self._packet_loss:
+        lost_packets += 1
+      sent += n
+      progress = int(100 * sent / total)
+      args = SimulatedSensorMemoryDataAvailableEventArgs(
+        emg=(self._rng.standard_normal((self._num_sensors, n)) * 5e-5).astype(np.float32),
+        trial_end=sent >= total,
+        num_saved_trials=len(self._memory_trials),
+        transfer_progress=progress,
+        current_trial_transfer_progress=progress,
+        current_trial_id=trial_id,
+        transfer_rate=n * self._num_sensors * 4 * 10,
+        sensor_lost_packets=[lost_packets] + [0] * (self._num_sensors - 1),
+        lost_packets=lost_packets)
+      for callback in list(self._memory_data_available_handlers):
+        callback(self, args)
+    # 读取自然结束时释放后台线程并回到空闲状态（被 `stop_selective_memory_reading` 中止时已由其处理）。
+    with self._lock:
+      finished = self._thread is threading.current_thread()
+      if finished:
+        self._thread = None
+    if finished:
+      self._set_state(DeviceStateEnum.IDLE)
@@ -0,0 +1,575 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+配置对象的纯 Python 快照。
+
+`CometaCaptureConfiguration`、`CometaSensorConfiguration`、
+`CometaFootSwTransducerEnabled`/`Threshold`、`CometaVersion` 与 `CometaExtVersion`
+都是 .NET 子类，无法跨进程传递或直接写入记录头部，且每个 getter 都是一次互操作调用。
+
+本模块为它们提供基于 `__slots__` 的 dataclass 快照：
+- `capture(obj)` 一次性读取 .NET 对象（或任何提供同名 getter 的对象）的全部字段；
+- `apply_to(obj)` 一次性写回，`to_net()` 创建新的 .NET 包装对象并写入；
+- `to_dict()`/`from_dict()` 供 JSON 使用（枚举以成员名保存），`pack()`/`unpack()`
+  为定长小端二进制格式；快照可直接 pickle；
+- 快照提供与包装类相同的 getter/setter，可在不加载 CLR 的进程中替代原对象
+  （如传给 `SimulatedDaqSystem`、记录器或 `StreamAligner.from_capture_configuration`）。
+"""
+
+from typing import Any, Dict, Optional
+from dataclasses import dataclass
+import struct
+
+from .constants import (
+  AccelerometerFullScaleEnum,
+  FootSwProtocolEnum,
+  GyroscopeFullScaleEnum,
+  ImuAcqTypeEnum,
+  SamplingRateEnum,
+  SensorTypeEnum,
+  to_net_value,
+)
+
+
+def _is_net(obj: Any, getter: str) -> bool:
+  # .NET 对象直接读写属性（每个字段一次互操作）；包装类、快照与模拟对象均提供 `getter`，使用其 getter/setter。
+  return not hasattr(obj, getter)
+
+
+@dataclass
+class FootSwTransducerEnabledSnapshot:
+  """FSW 各部位（A/1/5/T）启用状态快照。"""
+  __slots__ = ('t_a', 't_1', 't_5', 't_t')
+  t_a: bool
+  t_1: bool
+  t_5: bool
+  t_t: bool
+
+  _STRUCT = struct.Struct('<????')
+
+  @classmethod
+  def capture(cls, obj: Any) -> 'FootSwTransducerEnabledSnapshot':
+    if hasattr(obj, 'T_A'):
+      return cls(bool(obj.T_A), bool(obj.T_1), bool(obj.T_5), bool(obj.T_T))
+    return cls(bool(obj.get_transducer_a()), bool(obj.get_transducer_1()), bool(obj.get_transducer_5()), bool(obj.get_transducer_t()))
+
+  def apply_to(self, obj: Any) -> Any:
+    if hasattr(obj, 'T_A'):
+      obj.T_A, obj.T_1, obj.T_5, obj.T_T = self.t_a, self.t_1, self.t_5, self.t_t
+    else:
+      obj.set_transducer_a(self.t_a)
+      obj.set_transducer_1(self.t_1)
+      obj.set_transducer_5(self.t_5)
+      obj.set_transducer_t(self.t_t)
+    return obj
+
+  def to_net(self) -> Any:
+    from .foot_sw_transducer import CometaFootSwTransducerEnabled
+    return self.apply_to(CometaFootSwTransducerEnabled())
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {'t_a': self.t_a, 't_1': self.t_1, 't_5': self.t_5, 't_t': self.t_t}
+
+  @classmethod
+  def from_dict(cls, d: Dict[str, Any]) -> 'FootSwTransducerEnabledSnapshot':
+    return cls(bool(d['t_a']), bool(d['t_1']), bool(d['t_5']), bool(d['t_t']))
+
+  def pack(self) -> bytes:
+    return self._STRUCT.pack(self.t_a, self.t_1, self.t_5, self.t_t)
+
+  @classmethod
+  def unpack(cls, data: bytes) -> 'FootSwTransducerEnabledSnapshot':
+    return cls(*cls._STRUCT.unpack(data))
+
+  def get_transducer_a(self) -> bool:
+    return self.t_a
+
+  def set_transducer_a(self, is_enabled: bool) -> None:
+    self.t_a = bool(is_enabled)
+
+  def get_transducer_1(self) -> bool:
+    return self.t_1
+
+  def set_transducer_1(self, is_enabled: bool) -> None:
+    self.t_1 = bool(is_enabled)
+
+  def get_transducer_5(self) -> bool:
+    return self.t_5
+
+  def set_transducer_5(self, is_enabled: bool) -> None:
+    self.t_5 = bool(is_enabled)
+
+  def get_transducer_t(self) -> bool:
+    return self.t_t
+
+  def set_transducer_t(self, is_enabled: bool) -> None:
+    self.t_t = bool(is_enabled)
+
+
+@dataclass
+class FootSwTransducerThresholdSnapshot:
+  """FSW 各部位（A/1/5/T）阈值快照。"""
+  __slots__ = ('t_a', 't_1', 't_5', 't_t')
+  t_a: float
+  t_1: float
+  t_5: float
+  t_t: float
+
+  _STRUCT = struct.Struct('<dddd')
+
+  @classmethod
+  def capture(cls, obj: Any) -> 'FootSwTransducerThresholdSnapshot':
+    if hasattr(obj, 'T_A'):
+      return cls(float(obj.T_A), float(obj.T_1), float(obj.T_5), float(obj.T_T))
+    return cls(float(obj.get_transducer_a()), float(obj.get_transducer_1()), float(obj.get_transducer_5()), float(obj.get_transducer_t()))
+
+  def apply_to(self, obj: Any) -> Any:
+    if hasattr(obj, 'T_A'):
+      obj.T_A, obj.T_1, obj.T_5, obj.T_T = self.t_a, self.t_1, self.t_5, self.t_t
+    else:
+      obj.set_transducer_a(self.t_a)
+      obj.set_transducer_1(self.t_1)
+      obj.set_transducer_5(self.t_5)
+      obj.set_transducer_t(self.t_t)
+    return obj
+
+  def to_net(self) -> Any:
+    from .foot_sw_transducer import CometaFootSwTransducerThreshold
+    return self.apply_to(CometaFootSwTransducerThreshold())
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {'t_a': self.t_a, 't_1': self.t_1, 't_5': self.t_5, 't_t': self.t_t}
+
+  @classmethod
+  def from_dict(cls, d: Dict[str, Any]) -> 'FootSwTransducerThresholdSnapshot':
+    return cls(float(d['t_a']), float(d['t_1']), float(d['t_5']), float(d['t_t']))
+
+  def pack(self) -> bytes:
+    return self._STRUCT.pack(self.t_a, self.t_1, self.t_5, self.t_t)
+
+  @classmethod
+  def unpack(cls, data: bytes) -> 'FootSwTransducerThresholdSnapshot':
+    return cls(*cls._STRUCT.unpack(data))
+
+  def get_transducer_a(self) -> float:
+    return self.t_a
+
+  def set_transducer_a(self, threshold: float) -> None:
+    self.t_a = float(threshold)
+
+  def get_transducer_1(self) -> float:
+    return self.t_1
+
+  def set_transducer_1(self, threshold: float) -> None:
+    self.t_1 = float(threshold)
+
+  def get_transducer_5(self) -> float:
+    return self.t_5
+
+  def set_transducer_5(self, threshold: float) -> None:
+    self.t_5 = float(threshold)
+
+  def get_transducer_t(self) -> float:
+    return self.t_t
+
+  def set_transducer_t(self, threshold: float) -> None:
+    self.t_t = float(threshold)
+
+
+_NO_FSW_ENABLED = FootSwTransducerEnabledSnapshot(False, False, False, False)
+_NO_FSW_THRESHOLD = FootSwTransducerThresholdSnapshot(0.0, 0.0, 0.0, 0.0)
+
+
+@dataclass
+class CaptureConfigurationSnapshot:
+  """采集配置快照。FSW 字段在源对象不提供时为 None。"""
+  __slots__ = ('sampling_rate', 'imu_acq_type', 'external_trigger_enabled', 'external_trigger_level', 'fsw_protocol',
+               'fsw_a_enabled', 'fsw_a_threshold', 'fsw_b_enabled', 'fsw_b_threshold')
+  sampling_rate: SamplingRateEnum
+  imu_acq_type: ImuAcqTypeEnum
+  external_trigger_enabled: bool
+  external_trigger_level: int
+  fsw_protocol: Optional[FootSwProtocolEnum]
+  fsw_a_enabled: Optional[FootSwTransducerEnabledSnapshot]
+  fsw_a_threshold: Optional[FootSwTransducerThresholdSnapshot]
+  fsw_b_enabled: Optional[FootSwTransducerEnabledSnapshot]
+  fsw_b_threshold: Optional[FootSwTransducerThresholdSnapshot]
+
+  # 采样率、IMU 模式、外部触发、触发电平、FSW 协议（0xFF 为 None）、FSW 字段存在位
+  _STRUCT = struct.Struct('<BB?iBB')
+
+  @classmethod
+  def capture(cls, obj: Any) -> 'CaptureConfigurationSnapshot':
+    """一次性读取采集配置（.NET `CaptureConfiguration`、包装类或快照）。"""
+    if isinstance(obj, cls):
+      return cls.from_dict(obj.to_dict())
+    if _is_net(obj, 'get_sampling_rate'):
+      return cls(SamplingRateEnum.from_net(obj.SamplingRate),
+                 ImuAcqTypeEnum.from_net(obj.IMU_AcqType),
+                 bool(obj.ExternalTriggerEnabled),
+                 int(obj.ExternalTriggerActiveLevel),
+                 FootSwProtocolEnum.from_net(obj.FootSwProtocol),
+                 FootSwTransducerEnabledSnapshot.capture(obj.FootSwATransducerEnabled),
+                 FootSwTransducerThresholdSnapshot.capture(obj.FootSwATransducerThreshold),
+                 FootSwTransducerEnabledSnapshot.capture(obj.FootSwBTransducerEnabled),
+                 FootSwTransducerThresholdSnapshot.capture(obj.FootSwBTransducerThreshold))
+
+    def optional(getter: str, convert: Any) -> Any:
+      return convert(getattr(obj, getter)()) if hasattr(obj, getter) else None
+    return cls(SamplingRateEnum.coerce(obj.get_sampling_rate()),
+               ImuAcqTypeEnum.coerce(obj.get_imq_acq_type()),
+               bool(obj.get_external_trigger_status()),
+               int(obj.get_trigger_level()),
+               optional('get_fsw_protocol', FootSwProtocolEnum.coerce),
+               optional('get_fsw_a_is_enabled', FootSwTransducerEnabledSnapshot.capture),
+               optional('get_fsw_a_threshold', FootSwTransducerThresholdSnapshot.capture),
+               optional('get_fsw_b_is_enabled', FootSwTransducerEnabledSnapshot.capture),
+               optional('get_fsw_b_threshold', FootSwTransducerThresholdSnapshot.capture))
+
+  def apply_to(self, obj: Any) -> Any:
+    """一次性写入 `obj`（.NET 对象或包装类），返回 `obj`。"""
+    if _is_net(obj, 'get_sampling_rate'):
+      obj.SamplingRate = to_net_value(self.sampling_rate)
+      obj.IMU_AcqType = to_net_value(self.imu_acq_type)
+      obj.ExternalTriggerEnabled = self.external_trigger_enabled
+      obj.ExternalTriggerActiveLevel = self.external_trigger_level
+      if self.fsw_protocol is not None:
+        obj.FootSwProtocol = to_net_value(self.fsw_protocol)
+      for name, value in (('FootSwATransducerEnabled', self.fsw_a_enabled), ('FootSwATransducerThreshold', self.fsw_a_threshold),
+                          ('FootSwBTransducerEnabled', self.fsw_b_enabled), ('FootSwBTransducerThreshold', self.fsw_b_threshold)):
+        if value is not None:
+          setattr(obj, name, value.apply_to(getattr(obj, name)))
+      return obj
+    obj.set_sampling_rate(self.sampling_rate)
+    obj.set_imu_acq_type(self.imu_acq_type)
+    obj.set_external_trigger_status(self.external_trigger_enabled)
+    obj.set_trigger_level(self.external_trigger_level)
+    if self.fsw_protocol is not None:
+      obj.set_fsw_protocol(self.fsw_protocol)
+    for side in ('a', 'b'):
+      enabled = getattr(self, 'fsw_%s_enabled' % side)
+      if enabled is not None:
+        getattr(obj, 'set_fsw_%s_is_enabled' % side)(enabled.apply_to(getattr(obj, 'get_fsw_%s_is_enabled' % side)()))
+      threshold = getattr(self, 'fsw_%s_threshold' % side)
+      if threshold is not None:
+        getattr(obj, 'set_fsw_%s_threshold' % side)(threshold.apply_to(getattr(obj, 'get_fsw_%s_threshold' % side)()))
+    return obj
+
+  def to_net(self) -> Any:
+    """创建新的 `CometaCaptureConfiguration` 并写入本快照。"""
+    from .capture_configuration import CometaCaptureConfiguration
+    return self.apply_to(CometaCaptureConfiguration())
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      'sampling_rate': self.sampling_rate.name,
+      'imu_acq_type': self.imu_acq_type.name,
+      'external_trigger_enabled': self.external_trigger_enabled,
+      'external_trigger_level': self.external_trigger_level,
+      'fsw_protocol': self.fsw_protocol.name if self.fsw_protocol is not None else None,
+      'fsw_a_enabled': self.fsw_a_enabled.to_dict() if self.fsw_a_enabled is not None else None,
+      'fsw_a_threshold': self.fsw_a_threshold.to_dict() if self.fsw_a_threshold is not None else None,
+      'fsw_b_enabled': self.fsw_b_enabled.to_dict() if self.fsw_b_enabled is not None else None,
+      'fsw_b_threshold': self.fsw_b_threshold.to_dict() if self.fsw_b_threshold is not None else None,
+    }
+
+  @classmethod
+  def from_dict(cls, d: Dict[str, Any]) -> 'CaptureConfigurationSnapshot':
+    def optional(key: str, convert: Any) -> Any:
+      return convert(d[key]) if d.get(key) is not None else None
+    return cls(SamplingRateEnum.coerce(d['sampling_rate']),
+               ImuAcqTypeEnum.coerce(d['imu_acq_type']),
+               bool(d['external_trigger_enabled']),
+               int(d['external_trigger_level']),
+               optional('fsw_protocol', FootSwProtocolEnum.coerce),
+               optional('fsw_a_enabled', FootSwTransducerEnabledSnapshot.from_dict),
+               optional('fsw_a_threshold', FootSwTransducerThresholdSnapshot.from_dict),
+               optional('fsw_b_enabled', FootSwTransducerEnabledSnapshot.from_dict),
+               optional('fsw_b_threshold', FootSwTransducerThresholdSnapshot.from_dict))
+
+  def pack(self) -> bytes:
+    fsw = (self.fsw_a_enabled, self.fsw_a_threshold, self.fsw_b_enabled, self.fsw_b_threshold)
+    present = sum(1 << i for i, value in enumerate(fsw) if value is not None)
+    return b''.join((
+      self._STRUCT.pack(int(self.sampling_rate), int(self.imu_acq_type), self.external_trigger_enabled, self.external_trigger_level,
+                        int(self.fsw_protocol) if self.fsw_protocol is not None else 0xFF, present),
+      (self.fsw_a_enabled or _NO_FSW_ENABLED).pack(),
+      (self.fsw_a_threshold or _NO_FSW_THRESHOLD).pack(),
+      (self.fsw_b_enabled or _NO_FSW_ENABLED).pack(),
+      (self.fsw_b_threshold or _NO_FSW_THRESHOLD).pack(),
+    ))
+
+  @classmethod
+  def unpack(cls, data: bytes) -> 'CaptureConfigurationSnapshot':
+    sampling_rate, imu_acq_type, trigger, level, protocol, present = cls._STRUCT.unpack_from(data)
+    offset = cls._STRUCT.size
+    fsw = []
+    for i, kind in enumerate((FootSwTransducerEnabledSnapshot, FootSwTransducerThresholdSnapshot) * 2):
+      size = kind._STRUCT.size
+      fsw.append(kind.unpack(data[offset:offset + size]) if present & (1 << i) else None)
+      offset += size
+    return cls(SamplingRateEnum(sampling_rate), ImuAcqTypeEnum(imu_acq_type), trigger, level,
+               FootSwProtocolEnum(protocol) if protocol != 0xFF else None, *fsw)
+
+  # 与 `CometaCaptureConfiguration` 一致的访问方法。
+  def get_sampling_rate(self) -> SamplingRateEnum:
+    return self.sampling_rate
+
+  def set_sampling_rate(self, rate: Any) -> None:
+    self.sampling_rate = SamplingRateEnum.coerce(rate)
+
+  def get_external_trigger_status(self) -> bool:
+    return self.external_trigger_enabled
+
+  def set_external_trigger_status(self, is_enabled: bool) -> None:
+    self.external_trigger_enabled = bool(is_enabled)
+
+  def get_trigger_level(self) -> int:
+    return self.external_trigger_level
+
+  def set_trigger_level(self, level: int) -> None:
+    self.external_trigger_level = int(level)
+
+  def get_fsw_a_is_enabled(self) -> FootSwTransducerEnabledSnapshot:
+    if self.fsw_a_enabled is None:
+      self.fsw_a_enabled = FootSwTransducerEnabledSnapshot(False, False, False, False)
+    return self.fsw_a_enabled
+
+  def set_fsw_a_is_enabled(self, fsw_transducer_enabled: Any) -> None:
+    self.fsw_a_enabled = FootSwTransducerEnabledSnapshot.capture(fsw_transducer_enabled)
+
+  def get_fsw_a_threshold(self) -> FootSwTransducerThresholdSnapshot:
+    if self.fsw_a_threshold is None:
+      self.fsw_a_threshold = FootSwTransducerThresholdSnapshot(0.0, 0.0, 0.0, 0.0)
+    return self.fsw_a_threshold
+
+  def set_fsw_a_threshold(self, fsw_transducer_threshold: Any) -> None:
+    self.fsw_a_threshold = FootSwTransducerThresholdSnapshot.capture(fsw_transducer_threshold)
+
+  def get_fsw_b_is_enabled(self) -> FootSwTransducerEnabledSnapshot:
+    if self.fsw_b_enabled is None:
+      self.fsw_b_enabled = FootSwTransducerEnabledSnapshot(False, False, False, False)
+    return self.fsw_b_enabled
+
+  def set_fsw_b_is_enabled(self, fsw_transducer_enabled: Any) -> None:
+    self.fsw_b_enabled = FootSwTransducerEnabledSnapshot.capture(fsw_transducer_enabled)
+
+  def get_fsw_b_threshold(self) -> FootSwTransducerThresholdSnapshot:
+    if self.fsw_b_threshold is None:
+      self.fsw_b_threshold = FootSwTransducerThresholdSnapshot(0.0, 0.0, 0.0, 0.0)
+    return self.fsw_b_threshold
+
+  def set_fsw_b_threshold(self, fsw_transducer_threshold: Any) -> None:
+    self.fsw_b_threshold = FootSwTransducerThresholdSnapshot.capture(fsw_transducer_threshold)
+
+  def get_fsw_protocol(self) -> Optional[FootSwProtocolEnum]:
+    return self.fsw_protocol
+
+  def set_fsw_protocol(self, protocol: Any) -> None:
+    self.fsw_protocol = None if protocol is None else FootSwProtocolEnum.coerce(protocol)
+
+  def get_imq_acq_type(self) -> ImuAcqTypeEnum:
+    return self.imu_acq_type
+
+  def set_imu_acq_type(self, acq_type: Any) -> None:
+    self.imu_acq_type = ImuAcqTypeEnum.coerce(acq_type)
+
+  @classmethod
+  def default(cls) -> 'CaptureConfigurationSnapshot':
+    """2 kHz、RAW_DATA、无外部触发、不设置 FSW 的默认配置。"""
+    return cls(SamplingRateEnum.HZ_2000, ImuAcqTypeEnum.RAW_DATA, False, 0, None, None, None, None, None)
+
+
+@dataclass
+class SensorConfigurationSnapshot:
+  """单传感器配置快照。"""
+  __slots__ = ('sensor_type', 'accelerometer_full_scale', 'gyroscope_full_scale')
+  sensor_type: SensorTypeEnum
+  accelerometer_full_scale: AccelerometerFullScaleEnum
+  gyroscope_full_scale: GyroscopeFullScaleEnum
+
+  _STRUCT = struct.Struct('<BBB')
+
+  @classmethod
+  def capture(cls, obj: Any) -> 'SensorConfigurationSnapshot':
+    """一次性读取传感器配置（.NET `SensorConfiguration`、包装类或快照）。"""
+    if _is_net(obj, 'get_sensor_type'):
+      return cls(SensorTypeEnum.from_net(obj.SensorType),
+                 AccelerometerFullScaleEnum.from_net(obj.AccelerometerFullScale),
+                 GyroscopeFullScaleEnum.from_net(obj.GyroscopeFullScale))
+    return cls(SensorTypeEnum.coerce(obj.get_sensor_type()),
+               AccelerometerFullScaleEnum.coerce(obj.get_accelerometer_full_scale()),
+               GyroscopeFullScaleEnum.coerce(obj.get_gyroscope_full_scale()))
+
+  def apply_to(self, obj: Any) -> Any:
+    """一次性写入 `obj`，返回 `obj`。"""
+    if _is_net(obj, 'get_sensor_type'):
+      obj.SensorType = to_net_value(self.sensor_type)
+      obj.AccelerometerFullScale = to_net_value(self.accelerometer_full_scale)
+      obj.GyroscopeFullScale = to_net_value(self.gyroscope_full_scale)
+    else:
+      obj.set_sensor_type(self.sensor_type)
+      obj.set_accelerometer_full_scale(self.accelerometer_full_scale)
+      obj.set_gyroscope_full_scale(self.gyroscope_full_scale)
+    return obj
+
+  def to_net(self) -> Any:
+    """创建新的 `CometaSensorConfiguration` 并写入本快照。"""
+    from .sensor_configuration import CometaSensorConfiguration
+    return self.apply_to(CometaSensorConfiguration())
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      'sensor_type': self.sensor_type.name,
+      'accelerometer_full_scale': self.accelerometer_full_scale.name,
+      'gyroscope_full_scale': self.gyroscope_full_scale.name,
+    }
+
+  @classmethod
+  def from_dict(cls, d: Dict[str, Any]) -> 'SensorConfigurationSnapshot':
+    return cls(SensorTypeEnum.coerce(d['sensor_type']),
+               AccelerometerFullScaleEnum.coerce(d['accelerometer_full_scale']),
+               GyroscopeFullScaleEnum.coerce(d['gyroscope_full_scale']))
+
+  def pack(self) -> bytes:
+    return self._STRUCT.pack(int(self.sensor_type), int(self.accelerometer_full_scale), int(self.gyroscope_full_scale))
+
+  @classmethod
+  def unpack(cls, data: bytes) -> 'SensorConfigurationSnapshot':
+    sensor_type, accelerometer, gyroscope = cls._STRUCT.unpack(data)
+    return cls(SensorTypeEnum(sensor_type), AccelerometerFullScaleEnum(accelerometer), GyroscopeFullScaleEnum(gyroscope))
+
+  # 与 `CometaSensorConfiguration` 一致的访问方法。
+  def get_sensor_type(self) -> SensorTypeEnum:
+    return self.sensor_type
+
+  def set_sensor_type(self, sensor_type: Any) -> None:
+    self.sensor_type = SensorTypeEnum.coerce(sensor_type)
+
+  def get_accelerometer_full_scale(self) -> AccelerometerFullScaleEnum:
+    return self.accelerometer_full_scale
+
+  def set_accelerometer_full_scale(self, full_scale: Any) -> None:
+    self.accelerometer_full_scale = AccelerometerFullScaleEnum.coerce(full_scale)
+
+  def get_gyroscope_full_scale(self) -> GyroscopeFullScaleEnum:
+    return self.gyroscope_full_scale
+
+  def set_gyroscope_full_scale(self, full_scale: Any) -> None:
+    self.gyroscope_full_scale = GyroscopeFullScaleEnum.coerce(full_scale)
+
+  @classmethod
+  def default(cls) -> 'SensorConfigurationSnapshot':
+    """EMG 传感器、最小量程的默认配置。"""
+    return cls(SensorTypeEnum.EMG_SENSOR, AccelerometerFullScaleEnum.G_2, GyroscopeFullScaleEnum.DPS_250)
+
+
+@dataclass
+class VersionSnapshot:
+  """标准版本（主/次）快照。"""
+  __slots__ = ('major', 'minor')
+  major: int
+  minor: int
+
+  _STRUCT = struct.Struct('<ii')
+
+  @classmethod
+  def capture(cls, obj: Any) -> 'VersionSnapshot':
+    if _is_net(obj, 'get_major'):
+      return cls(int(obj.Major), int(obj.Minor))
+    return cls(int(obj.get_major()), int(obj.get_minor()))
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {'major': self.major, 'minor': self.minor}
+
+  @classmethod
+  def from_dict(cls, d: Dict[str, Any]) -> 'VersionSnapshot':
+    return cls(int(d['major']), int(d['minor']))
+
+  def pack(self) -> bytes:
+    return self._STRUCT.pack(self.major, self.minor)
+
+  @classmethod
+  def unpack(cls, data: bytes) -> 'VersionSnapshot':
+    return cls(*cls._STRUCT.unpack(data))
+
+  def get_major(self) -> int:
+    return self.major
+
+  def get_minor(self) -> int:
+    return self.minor
+
+  def __str__(self) -> str:
+    return '%d.%d' % (self.major, self.minor)
+
+
+@dataclass
+class ExtVersionSnapshot:
+  """扩展版本（主/次/构建/修订）快照。"""
+  __slots__ = ('major', 'minor', 'build', 'revision')
+  major: int
+  minor: int
+  build: int
+  revision: int
+
+  _STRUCT = struct.Struct('<iiii')
+
+  @classmethod
+  def capture(cls, obj: Any) -> 'ExtVersionSnapshot':
+    if _is_net(obj, 'get_major'):
+      return cls(int(obj.Major), int(obj.Minor), int(obj.Build), int(obj.Revision))
+    return cls(int(obj.get_major()), int(obj.get_minor()), int(obj.get_build()), int(obj.get_revision()))
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {'major': self.major, 'minor': self.minor, 'build': self.build, 'revision': self.revision}
+
+  @classmethod
+  def from_dict(cls, d: Dict[str, Any]) -> 'ExtVersionSnapshot':
+    return cls(int(d['major']), int(d['minor']), int(d['build']), int(d['revision']))
+
+  def pack(self) -> bytes:
+    return self._STRUCT.pack(self.major, self.minor, self.build, self.revision)
+
+  @classmethod
+  def unpack(cls, data: bytes) -> 'ExtVersionSnapshot':
+    return cls(*cls._STRUCT.unpack(data))
+
+  def get_major(self) -> int:
+    return self.major
+
+  def get_minor(self) -> int:
+    return self.minor
+
+  def get_build(self) -> int:
+    return self.build
+
+  def get_revision(self) -> int:
+    return self.revision
+
+  def __str__(self) -> str:
+    return '%d.%d.%d.%d' % (self.major, self.minor, self.build, self.revision)
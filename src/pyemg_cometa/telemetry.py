@@ -0,0 +1,345 @@
+############
+#
+# Copyright (c) 2024 Maxim Yudayev and KU Leuven eMedia Lab
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Created 2024-2025 for the KU Leuven AidWear, AidFOG, and RevalExo projects
+# by Maxim Yudayev [https://yudayev.com].
+#
+# ############
+
+"""
+采集遥测（可选启用）。
+
+`Telemetry` 在 SDK 回调路径上以极低开销记录：
+- 事件到达间隔与相对事件周期的抖动、各回调函数耗时（HDR 风格的对数-线性直方图，
+  计数数组预分配，记录一次为 O(1) 的整数运算）；
+- 事件数、EMG 样本数（由 `scan_number()` 差分得到）、RF/USB 丢包与
+  `get_transfer_rate()`（按 `sample_every` 抽样读取，控制互操作开销）；
+- 注册的仪表（如环形缓冲区或队列深度），仅在导出时求值。
+
+导出为 Prometheus 文本格式（`to_prometheus()`）或 JSON（`to_dict()`），
+`serve()` 在本地启动 HTTP 端点（`/metrics`、`/metrics.json`）。
+
+NOTE: 记录只在 SDK 线程中进行，导出在其它线程中读取时不加锁，得到的是近似一致的快照。
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import threading
+import time
+import numpy as np
+
+from .arrays import to_numpy_1d
+from .constants import get_event_period_ms
+
+
+class Histogram:
+  """HDR 风格直方图：在 [lowest, highest] 内以 `significant_figures` 位有效数字记录整数值。
+
+  桶按 2 的幂分段，每段内线性细分，计数数组在构造时一次性分配。
+  """
+  def __init__(self, lowest: int = 1, highest: int = 10_000_000, significant_figures: int = 2) -> None:
+    if lowest < 1 or highest < 2 * lowest or not 1 <= significant_figures <= 5:
+      raise ValueError("Invalid histogram range or precision")
+    self.lowest = lowest
+    self.highest = highest
+    self._unit_magnitude = int(math.floor(math.log2(lowest)))
+    largest_single_unit = 2 * 10 ** significant_figures
+    self._sub_bucket_count_magnitude = int(math.ceil(math.log2(largest_single_unit)))
+    self._sub_bucket_half_count_magnitude = self._sub_bucket_count_magnitude - 1
+    self._sub_bucket_count = 1 << self._sub_bucket_count_magnitude
+    self._sub_bucket_half_count = self._sub_bucket_count // 2
+    self._sub_bucket_mask = (self._sub_bucket_count - 1) << self._unit_magnitude
+    smallest_untrackable = self._sub_bucket_count << self._unit_magnitude
+    bucket_count = 1
+    while smallest_untrackable <= highest:
+      smallest_untrackable <<= 1
+      bucket_count += 1
+    self._counts = np.zeros((bucket_count + 1) * self._sub_bucket_half_count, dtype=np.int64)
+    self.reset()
+
+  def reset(self) -> None:
+    self._counts[:] = 0
+    self.count = 0
+    self.total = 0
+    self.min = 0
+    self.max = 0
+
+  def _index(self, value: int) -> int:
+    bucket = (value | self._sub_bucket_mask).bit_length() - self._unit_magnitude - self._sub_bucket_count_magnitude
+    sub_bucket = value >> (bucket + self._unit_magnitude)
+    return ((bucket + 1) << self._sub_bucket_half_count_magnitude) + sub_bucket - self._sub_bucket_half_count
+
+  def _value(self, index: int) -> int:
+    bucket = (index >> self._sub_bucket_half_count_magnitude) - 1
+    sub_bucket = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+    if bucket < 0:
+      sub_bucket -= self._sub_bucket_half_count
+      bucket = 0
+    return sub_bucket << (bucket + self._unit_magnitude)
+
+  def record(self, value: int) -> None:
+    """记录一个值（超出范围时截断到边界）。"""
+    value = int(value)
+    if value < self.lowest:
+      value = self.lowest
+    elif value > self.highest:
+      value = self.highest
+    self._counts[self._index(value)] += 1
+    if self.count == 0 or value < self.min:
+      self.min = value
+    if value > self.max:
+      self.max = value
+    self.count += 1
+    self.total += value
+
+  def get_value_at_percentile(self, percentile: float) -> int:
+    """返回百分位数对应的值（桶的下界，误差在有效数字范围内）。"""
+    if self.count == 0:
+      return 0
+    target = max(1, int(math.ceil(percentile / 100.0 * self.count)))
+    index = int(np.searchsorted(np.cumsum(self._counts), target))
+    return min(max(self._value(index), self.min), self.max)
+
+  def get_mean(self) -> float:
+    return self.total / self.count if self.count else 0.0
+
+  def merge(self, other: 'Histogram') -> None:
+    """合并相同配置的另一个直方图。"""
+    if other._counts.shape != self._counts.shape or other.lowest != self.lowest:
+      raise ValueError("Histograms have different configurations")
+    if other.count:
+      self.min = other.min if self.count == 0 else min(self.min, other.min)
+      self.max = max(self.max, other.max)
+    self._counts += other._counts
+    self.count += other.count
+    self.total += other.total
+
+  def to_dict(self, percentiles: Any = (50, 90, 99, 99.9)) -> Dict[str, Any]:
+    return {
+      'count': self.count,
+      'min': self.min,
+      'max': self.max,
+      'mean': self.get_mean(),
+      'percentiles': {str(p): self.get_value_at_percentile(p) for p in percentiles},
+    }
+
+
+class Telemetry:
+  """数据回调路径的遥测。
+
+  参数：
+  - event_period: 期望事件周期（`DataAvailableEventPeriodEnum`），用于计算抖动；None 时不记录抖动。
+  - sample_every: 每隔多少个事件读取一次丢包计数与传输速率、并测量一次回调耗时。
+  - prefix: 导出指标名前缀。
+
+  用法：
+  ```
+  telemetry = Telemetry(DataAvailableEventPeriodEnum.MS_10)
+  telemetry.attach(daq)                                        # 事件计数、到达间隔、丢包
+  daq.add_on_data_available_handler(telemetry.wrap(handler))   # 回调耗时
+  telemetry.register_gauge('ring_available', lambda: ring.available)
+  telemetry.serve(9108)
+  ```
+  """
+  def __init__(self, event_period: Any = None, sample_every: int = 1, prefix: str = 'pyemg_cometa') -> None:
+    self._period_us = int(get_event_period_ms(event_period) * 1000) if event_period is not None else None
+    self._sample_every = max(int(sample_every), 1)
+    self._prefix = prefix
+    self.inter_arrival_us = Histogram(1, 10_000_000)
+    self.jitter_us = Histogram(1, 10_000_000)
+    self._handler_latency = {} # type: Dict[str, Histogram]
+    self._handler_calls = {} # type: Dict[str, List[int]]
+    self._gauges = {} # type: Dict[str, Callable[[], float]]
+    self._server = None # type: Optional[ThreadingHTTPServer]
+    self.reset()
+
+  def reset(self) -> None:
+    """清零所有直方图与计数器。"""
+    self.inter_arrival_us.reset()
+    self.jitter_us.reset()
+    for histogram in self._handler_latency.values():
+      histogram.reset()
+    for calls in self._handler_calls.values():
+      calls[:] = [0, 0]
+    self._num_events = 0
+    self._num_samples = 0
+    self._last_arrival = None # type: Optional[int]
+    self._last_scan = None # type: Optional[int]
+    self._sensor_rf_lost = None # type: Optional[np.ndarray]
+    self._usb_lost = 0
+    self._transfer_rate = 0
+
+  # 记录 -------------------------------------------------------------------
+
+  def attach(self, daq: Any) -> None:
+    """在 `daq` 上注册事件跟踪回调（建议在其它数据回调之前注册）。"""
+    daq.add_on_data_available_handler(self.on_data_available)
+
+  def detach(self, daq: Any) -> None:
+    daq.remove_on_data_available_handler(self.on_data_available)
+
+  def on_data_available(self, sender: Any, args: Any) -> None:
+    """记录事件到达间隔、样本数，并按抽样读取丢包与传输速率。"""
+    now = time.perf_counter_ns()
+    if self._last_arrival is not None:
+      interval = (now - self._last_arrival) // 1000
+      self.inter_arrival_us.record(interval)
+      if self._period_us is not None:
+        self.jitter_us.record(abs(interval - self._period_us))
+    self._last_arrival = now
+    scan = args.scan_number()
+    if self._last_scan is not None and scan > self._last_scan:
+      self._num_samples += scan - self._last_scan
+    self._last_scan = scan
+    if self._num_events % self._sample_every == 0:
+      self._sensor_rf_lost = to_numpy_1d(args.get_sensor_rf_lost_packets(), np.int64)
+      self._usb_lost = int(args.get_usb_lost_packets())
+      self._transfer_rate = int(args.get_transfer_rate())
+    self._num_events += 1
+
+  def wrap(self, handler: Callable[[Any, Any], None], name: Optional[str] = None) -> Callable[[Any, Any], None]:
+    """包装数据回调，按抽样记录其耗时（微秒）与异常次数。"""
+    name = name or getattr(handler, '__name__', 'handler')
+    histogram = self._handler_latency[name] = Histogram(1, 10_000_000)
+    calls = self._handler_calls[name] = [0, 0] # [调用次数, 异常次数]
+    sample_every = self._sample_every
+
+    def instrumented(sender: Any, args: Any) -> None:
+      n = calls[0]
+      calls[0] = n + 1
+      if n % sample_every:
+        handler(sender, args)
+        return
+      t0 = time.perf_counter_ns()
+      try:
+        handler(sender, args)
+      except BaseException:
+        calls[1] += 1
+        raise
+      finally:
+        histogram.record((time.perf_counter_ns() - t0) // 1000)
+    return instrumented
+
+  def register_gauge(self, name: str, func: Callable[[], float]) -> None:
+    """注册仪表（如队列深度），导出时调用 `func()` 取值。"""
+    self._gauges[name] = func
+
+  # 导出 -------------------------------------------------------------------
+
+  def to_dict(self) -> Dict[str, Any]:
+    """以 JSON 兼容的字典导出全部指标。"""
+    gauges = {}
+    for name, func in self._gauges.items():
+      try:
+        gauges[name] = float(func())
+      except Exception:
+        gauges[name] = float('nan')
+    return {
+      'events_total': self._num_events,
+      'emg_samples_total': self._num_samples,
+      'usb_lost_packets_total': self._usb_lost,
+      'sensor_rf_lost_packets_total': self._sensor_rf_lost.tolist() if self._sensor_rf_lost is not None else [],
+      'transfer_rate_bytes_per_second': self._transfer_rate,
+      'inter_arrival_us': self.inter_arrival_us.to_dict(),
+      'jitter_us': self.jitter_us.to_dict(),
+      'handlers': {name: dict(histogram.to_dict(), calls=self._handler_calls[name][0], errors=self._handler_calls[name][1])
+                   for name, histogram in self._handler_latency.items()},
+      'gauges': gauges,
+    }
+
+  def to_prometheus(self) -> str:
+    """以 Prometheus 文本格式导出（直方图导出为 summary）。"""
+    p = self._prefix
+    d = self.to_dict()
+    lines = []
+
+    def metric(name: str, kind: str, help_text: str, samples: List[Any]) -> None:
+      lines.append('# HELP %s_%s %s' % (p, name, help_text))
+      lines.append('# TYPE %s_%s %s' % (p, name, kind))
+      for suffix, labels, value in samples:
+        label_text = '{%s}' % ','.join('%s="%s"' % kv for kv in labels.items()) if labels else ''
+        lines.append('%s_%s%s%s %s' % (p, name, suffix, label_text, value))
+
+    def summary(histogram: Histogram, labels: Dict[str, str]) -> List[Any]:
+      samples = [('', dict(labels, quantile=str(q / 100.0)), histogram.get_value_at_percentile(q) / 1e6) for q in (50, 90, 99, 99.9)]
+      samples.append(('_sum', labels, histogram.total / 1e6))
+      samples.append(('_count', labels, histogram.count))
+      return samples
+
+    metric('events_total', 'counter', 'DataAvailable events received.', [('', {}, d['events_total'])])
+    metric('emg_samples_total', 'counter', 'EMG samples received (from scan numbers).', [('', {}, d['emg_samples_total'])])
+    metric('usb_lost_packets_total', 'counter', 'USB lost packets reported by the device.', [('', {}, d['usb_lost_packets_total'])])
+    metric('sensor_rf_lost_packets_total', 'counter', 'RF lost packets per sensor.',
+           [('', {'sensor': str(i)}, v) for i, v in enumerate(d['sensor_rf_lost_packets_total'])])
+    metric('transfer_rate_bytes_per_second', 'gauge', 'Data transfer rate reported by the device.', [('', {}, d['transfer_rate_bytes_per_second'])])
+    metric('event_inter_arrival_seconds', 'summary', 'Time between DataAvailable events.', summary(self.inter_arrival_us, {}))
+    if self._period_us is not None:
+      metric('event_jitter_seconds', 'summary', 'Absolute deviation of the inter-arrival time from the event period.',
+             summary(self.jitter_us, {}))
+    if self._handler_latency:
+      samples = []
+      for name, histogram in self._handler_latency.items():
+        samples.extend(summary(histogram, {'handler': name}))
+      metric('handler_duration_seconds', 'summary', 'DataAvailable handler duration (sampled).', samples)
+      metric('handler_errors_total', 'counter', 'Exceptions raised by DataAvailable handlers.',
+             [('', {'handler': name}, calls[1]) for name, calls in self._handler_calls.items()])
+    for name, value in d['gauges'].items():
+      metric(name, 'gauge', 'Registered gauge.', [('', {}, value)])
+    return '\n'.join(lines) + '\n'
+
+  def serve(self, port: int = 9108, host: str = '127.0.0.1') -> None:
+    """在后台线程中启动 HTTP 端点：`/metrics`（Prometheus）与 `/metrics.json`。"""
+    telemetry = self
+
+    class _Handler(BaseHTTPRequestHandler):
+      def do_GET(self) -> None:
+        if self.path == '/metrics':
+          body, content_type = telemetry.to_prometheus().encode(), 'text/plain; version=0.0.4'
+        elif self.path == '/metrics.json':
+          body, content_type = json.dumps(telemetry.to_dict()).encode(), 'application/json'
+        else:
+          self.send_error(404)
+          return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+      def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    self._server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=self._server.serve_forever, name='TelemetryServer', daemon=True).start()
+
+  def get_server_address(self) -> Optional[Any]:
+    """HTTP 端点的 (host, port)；未启动时为 None。"""
+    return self._server.server_address if self._server is not None else None
+
+  def close(self) -> None:
+    """关闭 HTTP 端点。"""
+    if self._server is not None:
+      self._server.shutdown()
+      self._server.server_close()
+      self._server = None
@@ -31,19 +31,10 @@
 对 .NET `Version` 与 `ExtVersion` 提供 Python 化的访问方法。
 """
 
-import clr
-import os
-dir_path = os.path.dirname(__file__)
+from ._dotnet import get_net_type
 
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSys')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'Waveplus.DaqSysInterface')) # type: ignore
-clr.AddReference(os.path.join(dir_path, 'lib', 'CyUSB')) # type: ignore
-
-from Waveplus.DaqSys import * # type: ignore
-from Waveplus.DaqSysInterface import * # type: ignore
-from Waveplus.DaqSys.Definitions import * # type: ignore
-from Waveplus.DaqSys.Exceptions import * # type: ignore
-from CyUSB import * # type: ignore
+Version = get_net_type('Version')
+ExtVersion = get_net_type('ExtVersion')
 
 
 class CometaVersion(Version):  # type: ignore
@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from pyemg_cometa.arrays import to_numpy_2d
+
+
+def test_nested_rows():
+  np.testing.assert_array_equal(to_numpy_2d([[1, 2], [3, 4]]), np.array([[1, 2], [3, 4]], dtype=np.float32))
+
+
+@pytest.mark.parametrize('samples, channel', [
+  ([[1, 2], [3]], 1),
+  ([[1, 2], None], 1),
+  ([None, [1]], 0),
+])
+def test_ragged_rows_name_the_channel(samples, channel):
+  with pytest.raises(ValueError, match='Channel %d' % channel):
+    to_numpy_2d(samples)
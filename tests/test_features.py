@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from pyemg_cometa.features import FeatureExtractor
+
+
+FEATURES = ('mav', 'rms', 'wl', 'zc', 'ssc', 'activity', 'mobility', 'complexity')
+
+
+def reference_features(x: np.ndarray, threshold: float) -> np.ndarray:
+  """逐窗口直接计算的参考值，形状 (通道, 特征数)。"""
+  dx = np.diff(x, axis=1)
+  ddx = np.diff(dx, axis=1)
+  zc = ((x[:, 1:] * x[:, :-1] < 0) & (np.abs(dx) >= threshold)).sum(axis=1)
+  ssc = ((dx[:, :-1] * dx[:, 1:] < 0)
+         & ((np.abs(dx[:, :-1]) >= threshold) | (np.abs(dx[:, 1:]) >= threshold))).sum(axis=1)
+  mobility = np.sqrt(dx.var(axis=1) / x.var(axis=1))
+  complexity = np.sqrt(ddx.var(axis=1) / dx.var(axis=1)) / mobility
+  return np.stack([
+    np.abs(x).mean(axis=1),
+    np.sqrt((x * x).mean(axis=1)),
+    np.abs(dx).sum(axis=1),
+    zc,
+    ssc,
+    x.var(axis=1),
+    mobility,
+    complexity,
+  ], axis=1)
+
+
+@pytest.mark.parametrize('window, hop, block_sizes', [
+  (200, 50, [20]),
+  (64, 7, [1, 13, 0, 100, 3]),
+  (4, 1, [5, 2]),
+])
+def test_matches_brute_force(window, hop, block_sizes):
+  rng = np.random.default_rng(0)
+  num_channels, threshold = 3, 0.1
+  signal = rng.standard_normal((num_channels, 1000))
+  extractor = FeatureExtractor(num_channels, window, hop, features=FEATURES, threshold=threshold, dtype=np.float64)
+  ends, outputs = [], []
+  pos, i = 0, 0
+  while pos < signal.shape[1]:
+    n = block_sizes[i % len(block_sizes)]
+    batch = extractor.process(signal[:, pos:pos + n])
+    ends.extend(batch.sample_index.tolist())
+    outputs.extend(batch.features)
+    pos += n
+    i += 1
+  assert ends == list(range(window, signal.shape[1] + 1, hop))
+  for end, features in zip(ends, outputs):
+    expected = reference_features(signal[:, end - window:end], threshold)
+    np.testing.assert_allclose(features, expected, rtol=1e-6, atol=1e-5)
+
+
+def test_empty_first_block():
+  extractor = FeatureExtractor(2)
+  batch = extractor.process(np.zeros((2, 0)))
+  assert batch.sample_index.size == 0 and batch.features.shape == (0, 2, len(extractor.feature_names))
+  assert extractor.process(np.ones((2, 300))).sample_index.tolist() == [200, 250, 300]
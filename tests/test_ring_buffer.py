@@ -0,0 +1,13 @@
+import numpy as np
+
+from pyemg_cometa.ring_buffer import RingBuffer
+
+
+def test_stats_separate_read_dropped_and_cleared():
+  ring = RingBuffer(2, 8)
+  ring.write(np.ones((2, 6)))
+  assert ring.read(2).shape == (2, 2)
+  ring.write(np.ones((2, 6))) # 4 + 6 > 8：丢弃 2 个最旧样本
+  ring.clear()
+  stats = ring.get_stats()
+  assert (stats['num_written'], stats['num_read'], stats['num_dropped'], stats['num_cleared'], stats['depth']) == (12, 2, 2, 8, 0)